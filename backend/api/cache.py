@@ -0,0 +1,98 @@
+"""
+Per-user namespaces on the shared cache tier (JOURNAL_CACHE_ALIAS).
+
+Keys look like 'journal:<user id>:<version>:<name>'. Every write that changes
+what a user sees (journal entries, AI interactions, preferences) gives the
+user a new version via api.signals, which orphans all of their cached values
+at once instead of deleting them key by key; orphans age out with
+JOURNAL_CACHE_TIMEOUT. Versions are timestamps rather than counters so an
+evicted version key can never resurrect old values.
+
+Hit/miss counts are kept per process and per value name (the part of the
+name before the first ':') for the staff metrics endpoint.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_stats_lock = threading.Lock()
+
+
+def _version_key(user_id):
+    return f'journal:{user_id}:version'
+
+
+def _count(name, outcome):
+    with _stats_lock:
+        _stats[name.split(':', 1)[0]][outcome] += 1
+
+
+class UserCache:
+    """
+    One user's namespace, pinned to the version current when it was created.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.cache = caches[settings.JOURNAL_CACHE_ALIAS]
+        version = self.cache.get(_version_key(user_id))
+        if version is None:
+            version = time.time_ns()
+            # add(): if another request just set one, use theirs
+            if not self.cache.add(_version_key(user_id), version, None):
+                version = self.cache.get(_version_key(user_id), version)
+        self.version = version
+
+    def key(self, name):
+        return f'journal:{self.user_id}:{self.version}:{name}'
+
+    def get(self, name):
+        value = self.cache.get(self.key(name))
+        _count(name, 'misses' if value is None else 'hits')
+        return value
+
+    def set(self, name, value):
+        self.cache.set(self.key(name), value, settings.JOURNAL_CACHE_TIMEOUT)
+
+    def get_or_set(self, name, build):
+        value = self.get(name)
+        if value is None:
+            value = build()
+            self.set(name, value)
+        return value
+
+
+def invalidate_user(user_id):
+    """
+    Start a new version for the user. Runs now and again once the surrounding
+    transaction commits, so a request that reads between the write and the
+    commit can't cache pre-commit data under the new version.
+    """
+    if not settings.JOURNAL_CACHE or user_id is None:
+        return
+
+    def bump():
+        caches[settings.JOURNAL_CACHE_ALIAS].set(_version_key(user_id), time.time_ns(), None)
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def get_stats():
+    with _stats_lock:
+        return {
+            name: {**counts, 'hit_rate': round(counts['hits'] / (counts['hits'] + counts['misses']), 3)}
+            for name, counts in _stats.items()
+        }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,95 @@
+"""
+Offline text embeddings and relevance ranking for journal context.
+
+Each entry is embedded on save as a hashed bag of words: tokens are hashed
+into DIMENSIONS signed buckets, weighted by 1 + log(tf) and L2-normalized,
+then stored as float32 bytes on JournalEntry.embedding. No model download or
+network call is involved.
+
+IDF is applied at ranking time over the user's own history, so words someone
+writes every day count for less than the ones that make an entry distinctive.
+Candidates are scored by cosine similarity to the new entry blended with an
+exponential recency decay (see CONTEXT_RELEVANCE_WEIGHT and
+CONTEXT_RECENCY_HALF_LIFE_DAYS).
+"""
+
+import math
+import re
+import zlib
+
+import numpy as np
+
+DIMENSIONS = 512
+DTYPE = np.float32
+
+TOKEN = re.compile(r"[a-z][a-z']+")
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can
+could did do does doing don't down during each even feel felt for from get got had has have having
+he her here him his how i i'm i've if in into is it it's its just like me more most my myself no
+not now of off on once only or other our out over own really same she should so some still such
+than that the their them then there these they this those through to today too under until up
+very was we were what when where which while who why will with would you your
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def embed(text):
+    """
+    Returns the unit-length hashed term vector for `text` (all zeros if empty).
+    """
+    counts = {}
+    for token in tokenize(text or ''):
+        counts[token] = counts.get(token, 0) + 1
+
+    vector = np.zeros(DIMENSIONS, dtype=DTYPE)
+    for token, count in counts.items():
+        # crc32 is stable across processes, unlike hash()
+        hashed = zlib.crc32(token.encode())
+        sign = 1.0 if hashed & 0x80000000 else -1.0
+        vector[hashed % DIMENSIONS] += sign * (1.0 + math.log(count))
+
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+def to_bytes(vector):
+    return vector.astype(DTYPE, copy=False).tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(data, dtype=DTYPE)
+
+
+def rank(query, candidates, ages_days, limit, relevance_weight, half_life_days):
+    """
+    Indices of the `limit` best candidates, best first.
+
+    query: (DIMENSIONS,) vector of the entry being answered
+    candidates: (n, DIMENSIONS) matrix of earlier entries' vectors
+    ages_days: (n,) age of each candidate relative to the query entry
+    """
+    candidates = np.asarray(candidates, dtype=DTYPE)
+    n = len(candidates)
+    if n <= limit:
+        return list(range(n))
+
+    # Smoothed IDF over this user's history, per hash bucket
+    document_frequency = np.count_nonzero(candidates, axis=0)
+    idf = (np.log((1.0 + n) / (1.0 + document_frequency)) + 1.0).astype(DTYPE)
+
+    weighted = candidates * idf
+    weighted_query = query * idf
+    norms = np.linalg.norm(weighted, axis=1) * np.linalg.norm(weighted_query)
+    similarity = np.divide(weighted @ weighted_query, norms, out=np.zeros(n, dtype=DTYPE), where=norms > 0)
+
+    recency = np.exp2(-np.asarray(ages_days, dtype=DTYPE) / half_life_days)
+    score = relevance_weight * similarity + (1.0 - relevance_weight) * recency
+
+    best = np.argpartition(-score, limit - 1)[:limit]
+    return best[np.argsort(-score[best], kind='stable')].tolist()
@@ -0,0 +1,132 @@
+"""
+Memoized rendering of the history part of chronic_*/max_* prompts.
+
+With JOURNAL_CACHE on, each user's HISTORY_SIZE most recent entries are kept
+in JOURNAL_CACHE_ALIAS already rendered for the context block (newest first,
+under 'history:<user id>'). The same list serves both context windows, 7 and
+30, since they are prefixes of it.
+
+Unlike api.cache's versioned namespaces, the list is maintained rather than
+dropped on every write. When an entry is created, api.signals renders that
+one entry and puts it at the front. Edits and deletes discard the list,
+because they are rare and can reorder it. The list therefore survives the
+create that comes before each AI response, and lives for
+HISTORY_CACHE_TIMEOUT.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .llm_service import llm_service
+from .models import JournalEntry
+
+# The largest context window, plus the entry being answered: the create
+# signal has already put it at the front by the time its context is built
+HISTORY_SIZE = 31
+
+
+def _key(user_id):
+    return f'history:{user_id}'
+
+
+def _cache():
+    return caches[settings.JOURNAL_CACHE_ALIAS]
+
+
+def _rendered(row):
+    return {'id': row['id'], 'created_at': row['created_at'], 'rendered': llm_service._render_entry(row)}
+
+
+def _render_rows(queryset):
+    return [_rendered(row) for row in queryset.values('id', 'created_at', 'title', 'content')]
+
+
+def _recent(user_id):
+    """
+    {'entries': [...], 'complete': whether that's all of the user's entries}
+    """
+    history = _cache().get(_key(user_id))
+    if history is None:
+        entries = _render_rows(JournalEntry.objects.filter(user_id=user_id).order_by('-created_at')[:HISTORY_SIZE])
+        history = {'entries': entries, 'complete': len(entries) < HISTORY_SIZE}
+        _cache().set(_key(user_id), history, settings.HISTORY_CACHE_TIMEOUT)
+    return history
+
+
+def get_context_entries(journal_entry, window=None):
+    """
+    The entry's context (see JournalEntry.get_context_entries) as rendered
+    dicts, newest first. Only entries missing from the cached list are read,
+    which with CONTEXT_RANKING can be older ones that matched the new entry.
+    """
+    if window is None:
+        window = journal_entry.get_context_window_size()
+    history = _recent(journal_entry.user_id)
+    earlier = [item for item in history['entries'] if item['created_at'] < journal_entry.created_at]
+
+    previous = JournalEntry.objects.filter(
+        user_id=journal_entry.user_id, created_at__lt=journal_entry.created_at
+    ).order_by('-created_at')
+
+    if not settings.CONTEXT_RANKING:
+        if len(earlier) >= window or history['complete']:
+            return earlier[:window]
+        ids = list(previous.values_list('id', flat=True)[:window])
+    else:
+        ids = journal_entry._rank_context_ids(previous, window)
+
+    by_id = {item['id']: item for item in earlier}
+    missing = [pk for pk in ids if pk not in by_id]
+    if missing:
+        by_id.update((item['id'], item) for item in _render_rows(JournalEntry.objects.filter(pk__in=missing)))
+
+    return sorted((by_id[pk] for pk in ids), key=lambda item: item['created_at'], reverse=True)
+
+
+def add_entry(journal_entry):
+    """
+    Put a newly created entry at the front of its user's cached list, once the
+    surrounding transaction (if any) commits.
+    """
+    if not settings.JOURNAL_CACHE:
+        return
+
+    def prepend():
+        key = _key(journal_entry.user_id)
+        history = _cache().get(key)
+        if history is None:
+            return
+        entries = history['entries']
+        if entries and entries[0]['id'] == journal_entry.pk:
+            # Already loaded from the database after the commit
+            return
+        if entries and entries[0]['created_at'] > journal_entry.created_at:
+            # Not the newest (e.g. imported), so it belongs further down
+            _cache().delete(key)
+            return
+
+        entries = [_rendered({
+            'id': journal_entry.pk, 'created_at': journal_entry.created_at,
+            'title': journal_entry.title, 'content': journal_entry.content,
+        })] + entries
+        history = {'entries': entries[:HISTORY_SIZE], 'complete': history['complete'] and len(entries) <= HISTORY_SIZE}
+        _cache().set(key, history, settings.HISTORY_CACHE_TIMEOUT)
+
+    transaction.on_commit(prepend)
+
+
+def invalidate(user_id):
+    """
+    Drop a user's cached list, now and again once the surrounding transaction
+    commits (see api.cache.invalidate_user).
+    """
+    if not settings.JOURNAL_CACHE or user_id is None:
+        return
+
+    def drop():
+        _cache().delete(_key(user_id))
+
+    drop()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(drop)
@@ -1,15 +1,146 @@
 """
 LLM Service for MindfulCompanion
 Handles AI interactions using LiteLLM for multi-model support
+
+litellm (and openai, tokenizers, huggingface-hub behind it) is imported on
+first use or by warm_up(), not at module load, so non-LLM endpoints can serve
+as soon as Django is ready.
 """
 
-from litellm import completion
 from django.conf import settings
+from mindfulcompanion import log
+from mindfulcompanion.timing import current as current_timings, record, timed
+from . import overload
 from typing import List, Dict, Optional
 import logging
+import sys
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+
+
+def _completion(**kwargs):
+    """
+    Call the model. While a request is being timed (SERVER_TIMING) or load
+    shedding needs provider latency, the completion is streamed so time to
+    first chunk can be recorded, then reassembled into a regular response
+    (including usage); otherwise it's a plain completion() call.
+    """
+    from litellm import completion, stream_chunk_builder
+
+    if current_timings() is None and not settings.OVERLOAD_SHEDDING:
+        with timed('llm'), overload.controller.in_flight():
+            return completion(**kwargs)
+
+    started = time.perf_counter()
+    chunks = []
+    with timed('llm'), overload.controller.in_flight():
+        for chunk in completion(stream=True, stream_options={'include_usage': True}, **kwargs):
+            if not chunks:
+                ttfb = time.perf_counter() - started
+                record('llm_ttfb', ttfb)
+                overload.controller.observe(ttfb)
+            chunks.append(chunk)
+
+    response = stream_chunk_builder(chunks, messages=kwargs.get('messages'))
+    if response is None:
+        # No chunks at all: treat it like any other provider failure (fallback, error reply)
+        raise RuntimeError(f"Empty completion stream from {kwargs.get('model')}")
+    return response
+
+
+def warm_up(background: bool = True):
+    """
+    Import the LLM stack ahead of the first request.
+    With background=True this returns immediately and imports on a daemon thread.
+    """
+    global _warmup_thread
+
+    def _import():
+        started = time.monotonic()
+        try:
+            import litellm  # noqa: F401
+        except Exception as e:
+            logger.error("LLM warmup failed: %s", e)
+            return
+        logger.info("LLM stack imported in %.2fs", time.monotonic() - started)
+
+    if not background:
+        with _warmup_lock:
+            thread = _warmup_thread
+        if thread is not None:
+            # Already importing in the background; just wait for it
+            thread.join()
+        else:
+            _import()
+        return
+
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_import, name='llm-warmup', daemon=True)
+            _warmup_thread.start()
+
+
+def reset_after_fork():
+    """
+    Drop LLM HTTP clients inherited from the parent process (gunicorn
+    preload_app), so each worker opens its own connections to the provider.
+    The parent's copies are discarded, not closed: closing would shut
+    sockets the parent still owns.
+    """
+    litellm = sys.modules.get('litellm')
+    if litellm is not None:
+        from litellm.llms.custom_httpx.http_handler import HTTPHandler
+
+        litellm.in_memory_llm_clients_cache.flush_cache()
+        litellm.module_level_client = HTTPHandler(timeout=litellm.request_timeout)
+    # Latency and in-flight counts describe the parent, not this worker
+    overload.controller.reset()
+
+
+def get_model_pricing(model: str):
+    """
+    (input, output) USD per million tokens for a model, from settings.AI_MODEL_PRICING.
+    Accepts the model with or without its provider prefix.
+    """
+    pricing = settings.AI_MODEL_PRICING
+    if model in pricing:
+        return pricing[model]
+    for name, rates in pricing.items():
+        if name.split('/', 1)[-1] == model.split('/', 1)[-1]:
+            return rates
+    return pricing['default']
+
+
+def _is_anthropic(model: str) -> bool:
+    """
+    Whether litellm sends this model to Anthropic's own API, so it gets the
+    Anthropic key and content blocks. Claude models behind other providers
+    (openrouter/anthropic/..., bedrock/anthropic.claude-...) don't.
+    """
+    from litellm import get_llm_provider
+
+    try:
+        return get_llm_provider(model)[1] == 'anthropic'
+    except Exception:
+        return False
+
+
+def _flatten_content(messages: List[Dict]) -> List[Dict]:
+    """
+    Join content blocks back into plain text, for providers that don't take
+    Anthropic's cache_control markers.
+    """
+    return [
+        {**message, 'content': "\n".join(block['text'] for block in message['content'])}
+        if isinstance(message['content'], list) else message
+        for message in messages
+    ]
+
 
 class LLMService:
     """
@@ -26,7 +157,10 @@ class LLMService:
         current_entry_content: str,
         help_type: str,
         context_entries: List[Dict] = None,
-        user_name: Optional[str] = None
+        user_name: Optional[str] = None,
+        trend_summary: Optional[str] = None,
+        context_block: Optional[str] = None,
+        max_tokens: Optional[int] = None
     ) -> Dict:
         """
         Generate an AI response to a journal entry based on the requested help type.
@@ -36,28 +170,33 @@ class LLMService:
             help_type: Type of help requested (acute_validation, chronic_education, etc.)
             context_entries: List of previous journal entries for context (if applicable)
             user_name: User's preferred name for personalization
+            trend_summary: Short mood/theme trend over recent entries (if applicable)
+            context_block: Already rendered trend + previous entries (from the
+                prepare endpoint); used instead of context_entries/trend_summary
+            max_tokens: Cap below the route's max_tokens (load shedding, see api.overload)
             
         Returns:
-            Dict with 'response', 'tokens_used', and 'estimated_cost'
+            Dict with 'response', 'tokens_used', 'estimated_cost' and the 'model' that answered
         """
         
-        # Build the system prompt based on help type
-        system_prompt = self._build_system_prompt(help_type, user_name)
-        
-        # Build the user message with context
-        user_message = self._build_user_message(current_entry_content, context_entries)
+        with timed('prompt'):
+            # Build the system prompt based on help type
+            system_prompt = self._build_system_prompt(help_type, user_name)
+
+            # Build the user message with context
+            if context_block is None:
+                context_block = self._build_context_block(context_entries, trend_summary)
+            user_message = self._build_user_content(context_block, current_entry_content)
         
         try:
-            # Call LiteLLM with the constructed prompts
-            response = completion(
-                model=self.model,
-                messages=[
+            # Call LiteLLM with the constructed prompts, on the model routed for this help type
+            response, model = self._complete_with_fallback(
+                help_type,
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_message}
                 ],
-                api_key=self.api_key,
-                # No sampling params: Sonnet 5+ rejects non-default temperature/top_p
-                max_tokens=2048   # Shared budget for adaptive thinking + response text
+                max_tokens
             )
             
             # Extract response details
@@ -65,20 +204,63 @@ class LLMService:
             prompt_tokens = response.usage.prompt_tokens      # Input tokens
             completion_tokens = response.usage.completion_tokens  # Output tokens
             total_tokens = response.usage.total_tokens      
-            estimated_cost = self._calculate_cost(prompt_tokens, completion_tokens)
+            estimated_cost = self._calculate_cost(prompt_tokens, completion_tokens, model)
             
-            logger.info(f"Generated response for help_type={help_type}, tokens={total_tokens}")
+            logger.info(
+                "Generated response for help_type=%s, model=%s, tokens=%s", help_type, model, total_tokens,
+                extra={'help_type': help_type, 'model': model, 'prompt_tokens': prompt_tokens,
+                       'completion_tokens': completion_tokens}
+            )
             
             return {
                 'response': ai_response,
                 'tokens_used': total_tokens,
-                'estimated_cost': estimated_cost
+                'estimated_cost': estimated_cost,
+                'model': model
             }
             
         except Exception as e:
-            logger.error(f"Error generating AI response: {str(e)}")
+            logger.error("Error generating AI response: %s", e)
             raise Exception(f"Failed to generate AI response: {str(e)}")
     
+    def _get_route(self, help_type: str) -> Dict:
+        """
+        Model, max_tokens and fallback for a help type (settings.AI_MODEL_ROUTES).
+        """
+        route = {'model': self.model, 'max_tokens': 2048, 'fallback': settings.AI_FALLBACK_MODEL}
+        route.update(settings.AI_MODEL_ROUTES.get(help_type, {}))
+        return route
+
+    def _complete_with_fallback(self, help_type: str, messages: List[Dict], max_tokens: Optional[int] = None):
+        """
+        Call the routed model, then its fallback (if any) when that fails.
+        Returns (response, model that produced it).
+        """
+        route = self._get_route(help_type)
+        if max_tokens:
+            route['max_tokens'] = min(route['max_tokens'], max_tokens)
+        models = [route['model']]
+        if route['fallback'] and route['fallback'] != route['model']:
+            models.append(route['fallback'])
+
+        for attempt, model in enumerate(models, 1):
+            try:
+                response = _completion(
+                    model=model,
+                    messages=messages if _is_anthropic(model) else _flatten_content(messages),
+                    # The configured key is Anthropic's; other providers read theirs from the environment
+                    api_key=self.api_key if _is_anthropic(model) else None,
+                    # No sampling params: Sonnet 5+ rejects non-default temperature/top_p
+                    max_tokens=route['max_tokens']
+                )
+                return response, model
+            except Exception as e:
+                if attempt == len(models):
+                    raise
+                logger.warning(
+                    "Model %s failed for help_type=%s, falling back to %s: %s", model, help_type, models[attempt], e
+                )
+
     def _build_system_prompt(self, help_type: str, user_name: Optional[str] = None) -> str:
         """
         Build the system prompt that defines Claude's role and behavior.
@@ -106,6 +288,13 @@ Never:
 - Give advice that could be harmful
 """
 
+        # How the history help types' context was picked (api.history / JournalEntry.get_context_entries)
+        if settings.CONTEXT_RANKING:
+            chosen = "chosen for relevance to today's entry as well as recency"
+        else:
+            chosen = "the most recent ones"
+        context_note = f"{chosen}. There may be fewer, so don't assume they cover every recent day."
+
         # Add help-type-specific instructions
         help_type_prompts = {
             'acute_validation': """
@@ -132,7 +321,7 @@ Focus on:
 
 Keep your response practical and immediately applicable. You have no access to their history.
 """,
-            'chronic_validation': """
+            'chronic_validation': f"""
 CURRENT TASK: Validate ongoing patterns you see in their recent journal entries.
 
 Focus on:
@@ -141,9 +330,9 @@ Focus on:
 - Acknowledging progress or struggles
 - Normalizing patterns in their experience using elements of common humanity
 
-You have access to their last 7 journal entries for context.
+You have up to 7 of their previous journal entries for context, {context_note}
 """,
-            'chronic_education': """
+            'chronic_education': f"""
 CURRENT TASK: Help them understand patterns in their mental health over time.
 
 Focus on:
@@ -153,9 +342,9 @@ Focus on:
 - Offering frameworks for understanding their patterns
 - Suggesting therapy or a particular therapeutic style that might suit them considering their specific context if necessary
 
-You have access to their last 7 journal entries for context.
+You have up to 7 of their previous journal entries for context, {context_note}
 """,
-            'max_validation': """
+            'max_validation': f"""
 CURRENT TASK: Provide deep validation based on comprehensive understanding of their journey.
 
 Focus on:
@@ -164,9 +353,9 @@ Focus on:
 - Acknowledging growth, setbacks, and resilience
 - Reflecting on major themes in their experience
 
-You have access to their last 30 journal entries for comprehensive context.
+You have up to 30 of their previous journal entries for comprehensive context, {context_note}
 """,
-            'max_assessment': """
+            'max_assessment': f"""
 CURRENT TASK: Provide a thoughtful assessment of their mental health patterns over time.
 
 Focus on:
@@ -175,7 +364,7 @@ Focus on:
 - Offering insights about their mental health journey
 - Suggesting areas they might want to explore further (with a professional if needed) and what therapeutic modality may suit them
 
-You have access to their last 30 journal entries for comprehensive context.
+You have up to 30 of their previous journal entries for comprehensive context, {context_note}
 
 IMPORTANT: This is an assessment for self-reflection, not a clinical diagnosis. Encourage professional support if you see concerning patterns.
 """
@@ -183,10 +372,43 @@ IMPORTANT: This is an assessment for self-reflection, not a clinical diagnosis.
         
         return base_prompt + help_type_prompts.get(help_type, '')
     
+    def prewarm(self, help_type: str, context_block: str, user_name: Optional[str] = None):
+        """
+        Send the system prompt and context block on a background thread with
+        max_tokens=1, so the provider has the prefix in its prompt cache before
+        the entry is submitted. Anthropic models only; a no-op otherwise.
+        """
+        route = self._get_route(help_type)
+        if not (settings.LLM_PROMPT_CACHE and context_block):
+            return
+
+        messages = [
+            {"role": "system", "content": self._build_system_prompt(help_type, user_name)},
+            {"role": "user", "content": self._build_user_content(context_block, "(still writing)")}
+        ]
+
+        request_id = log.get_request_id()
+
+        def _send():
+            # Logged under the request that prepared it
+            log.bind_request_id(request_id)
+            # Checked here: it imports litellm, which the prepare request shouldn't wait on
+            if not _is_anthropic(route['model']):
+                return
+            try:
+                # Holds no request thread, so it doesn't count towards load shedding
+                with overload.untracked():
+                    _completion(model=route['model'], messages=messages, api_key=self.api_key, max_tokens=1)
+            except Exception as e:
+                logger.warning("Prompt cache prewarm failed for help_type=%s: %s", help_type, e)
+
+        threading.Thread(target=_send, name='llm-prewarm', daemon=True).start()
+
     def _build_user_message(
         self,
         current_entry: str,
-        context_entries: List[Dict] = None
+        context_entries: List[Dict] = None,
+        trend_summary: Optional[str] = None
     ) -> str:
         """
         Build the user message that includes the current entry and any historical context.
@@ -194,40 +416,80 @@ IMPORTANT: This is an assessment for self-reflection, not a clinical diagnosis.
         Args:
             current_entry: The current journal entry text
             context_entries: List of dicts with 'created_at', 'title', 'content' keys
+            trend_summary: Mood/theme trend computed from the entries' lexicon scores
+        """
+        context_block = self._build_context_block(context_entries, trend_summary)
+        return self._join_user_message(context_block, current_entry)
+
+    def _build_user_content(self, context_block: str, current_entry: str):
+        """
+        The user message as plain text, or with LLM_PROMPT_CACHE as two content
+        blocks with a cache breakpoint after the history, which stays the same
+        across requests while today's entry doesn't.
+        """
+        if not (settings.LLM_PROMPT_CACHE and context_block):
+            return self._join_user_message(context_block, current_entry)
+
+        return [
+            {"type": "text", "text": context_block, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": self._join_user_message('', current_entry)}
+        ]
+
+    def _join_user_message(self, context_block: str, current_entry: str) -> str:
+        today = "\n".join(["=== TODAY'S JOURNAL ENTRY ===\n", current_entry])
+        return f"{context_block}\n{today}" if context_block else today
+
+    def _build_context_block(
+        self,
+        context_entries: List[Dict] = None,
+        trend_summary: Optional[str] = None
+    ) -> str:
+        """
+        The part of the user message before today's entry: mood trend and
+        previous entries. Empty when there is neither.
         """
         
         message_parts = []
+
+        if trend_summary:
+            message_parts.append("=== MOOD TREND (automated estimate from word choice) ===\n")
+            message_parts.append(f"{trend_summary}\n")
         
         # Add context entries if provided
         if context_entries:
             message_parts.append("=== PREVIOUS JOURNAL ENTRIES (for context) ===\n")
             
             for idx, entry in enumerate(context_entries, 1):
-                date = entry['created_at'].strftime('%B %d, %Y')
-                title = entry.get('title', 'Untitled')
-                content = entry['content']
-                
-                message_parts.append(f"Entry {idx} - {date}")
-                if title:
-                    message_parts.append(f"Title: {title}")
-                message_parts.append(f"{content}\n")
-                message_parts.append("---\n")
-        
-        # Add current entry
-        message_parts.append("=== TODAY'S JOURNAL ENTRY ===\n")
-        message_parts.append(current_entry)
+                # api.history hands over entries it has already rendered
+                rendered = entry.get('rendered') or self._render_entry(entry)
+                message_parts.append(f"Entry {idx} - {rendered}")
         
         return "\n".join(message_parts)
+
+    def _render_entry(self, entry: Dict) -> str:
+        """
+        One previous entry as it appears in the context block, without its
+        "Entry N - " prefix (the number depends on where it lands).
+        """
+        date = entry['created_at'].strftime('%B %d, %Y')
+        title = entry.get('title', 'Untitled')
+
+        lines = [date]
+        if title:
+            lines.append(f"Title: {title}")
+        lines.append(f"{entry['content']}\n")
+        lines.append("---\n")
+        return "\n".join(lines)
     
-    def _calculate_cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+    def _calculate_cost(self, prompt_tokens: int, completion_tokens: int, model: Optional[str] = None) -> float:
         """
         Calculate estimated API cost based on token usage.
         
-        Currently set for Anthropic Sonnet 5 ($3/$15 per MTok list price)
+        Rates per million tokens come from settings.AI_MODEL_PRICING for the
+        model that answered (AI_MODEL if not given), or its 'default' entry.
         """
         
-        input_cost_per_million = 3.00   # $3 per million input tokens
-        output_cost_per_million = 15.00  # $15 per million output tokens
+        input_cost_per_million, output_cost_per_million = get_model_pricing(model or self.model)
         
         # Calculates each separately, then sums them
         input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million
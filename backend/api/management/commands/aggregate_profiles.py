@@ -0,0 +1,104 @@
+"""
+Merge request profiles written by ProfilingMiddleware.
+
+    python manage.py aggregate_profiles
+    python manage.py aggregate_profiles --view journal-entry-list --out list.folded
+    python manage.py aggregate_profiles --help-type max_assessment --top 30
+"""
+
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from mindfulcompanion.profiling import label_slug
+
+
+class Command(BaseCommand):
+    help = 'Aggregate captured request profiles into one flamegraph file and a hot-spot report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='Profile directory (default: PROFILING_DIR)')
+        parser.add_argument('--view', default=None, help='Only include this view name')
+        parser.add_argument('--help-type', default=None, help='Only include this help type')
+        parser.add_argument('--out', default=None, help='Write merged folded stacks here')
+        parser.add_argument('--top', type=int, default=20, help='Number of hot frames/allocation sites to list')
+
+    def handle(self, *args, **options):
+        directory = Path(options['dir'] or settings.PROFILING_DIR)
+        if not directory.is_dir():
+            raise CommandError(f'No profile directory at {directory}')
+
+        stacks = Counter()
+        requests_by_label = Counter()
+        for path in sorted(directory.glob('*.folded')):
+            labels = self._labels(path)
+            if not self._wanted(labels, options):
+                continue
+            requests_by_label[labels] += 1
+            for line in path.read_text().splitlines():
+                stack, _, count = line.rpartition(' ')
+                if stack:
+                    stacks[stack] += int(count)
+
+        if not stacks:
+            self.stdout.write('No matching profiles.')
+            return
+
+        if options['out']:
+            Path(options['out']).write_text(''.join(f'{stack} {count}\n' for stack, count in stacks.most_common()))
+            self.stdout.write(f"Wrote merged stacks to {options['out']}")
+
+        self._print_summary(stacks, requests_by_label, options['top'])
+        self._print_allocations(directory, options)
+
+    def _labels(self, path):
+        # <view>__<help_type>__<timestamp>_<pid>_<seq>.folded
+        parts = path.name.split('__')
+        return (parts[0], parts[1]) if len(parts) == 3 else (path.stem, 'none')
+
+    def _wanted(self, labels, options):
+        view, help_type = labels
+        return (
+            (options['view'] is None or view == label_slug(options['view']))
+            and (options['help_type'] is None or help_type == label_slug(options['help_type']))
+        )
+
+    def _print_summary(self, stacks, requests_by_label, top):
+        total = sum(stacks.values())
+        self.stdout.write(f'{sum(requests_by_label.values())} requests, {total} samples')
+        for (view, help_type), count in requests_by_label.most_common():
+            self.stdout.write(f'  {count:5d}  {view} [{help_type}]')
+
+        self_time = Counter()
+        inclusive = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(';')
+            self_time[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        self.stdout.write(f'\nTop {top} frames by self samples:')
+        for frame, count in self_time.most_common(top):
+            self.stdout.write(f'  {count / total:6.1%}  {frame}')
+
+        self.stdout.write(f'\nTop {top} frames by inclusive samples:')
+        for frame, count in inclusive.most_common(top):
+            self.stdout.write(f'  {count / total:6.1%}  {frame}')
+
+    def _print_allocations(self, directory, options):
+        sites = defaultdict(int)
+        for path in directory.glob('*.alloc.json'):
+            report = json.loads(path.read_text())
+            labels = (report['labels']['view'], report['labels']['help_type'])
+            if not self._wanted(labels, options):
+                continue
+            for stat in report['top']:
+                sites[stat['location']] += stat['size_diff']
+
+        if sites:
+            self.stdout.write(f"\nTop {options['top']} allocation sites (net bytes):")
+            for location, size in sorted(sites.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+                self.stdout.write(f'  {size:12,d}  {location}')
@@ -0,0 +1,46 @@
+"""
+Compute JournalEntry.embedding for entries saved before embeddings existed
+(or loaded with raw SQL).
+
+    python manage.py backfill_embeddings
+    python manage.py backfill_embeddings --all    # after changing api.embeddings
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import embeddings
+from api.models import JournalEntry
+
+
+class Command(BaseCommand):
+    help = 'Fill in missing journal entry embeddings used for context ranking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--all', action='store_true', help='Recompute every embedding, not just missing ones')
+
+    def handle(self, *args, **options):
+        queryset = JournalEntry.objects.order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(embedding__isnull=True)
+
+        done = 0
+        last_pk = 0
+        started = time.monotonic()
+        while True:
+            # Keyset pagination: rows filled in by the previous batch drop out of the filter
+            rows = list(queryset.filter(pk__gt=last_pk).values_list('pk', 'content')[:options['batch_size']])
+            if not rows:
+                break
+
+            JournalEntry.objects.bulk_update(
+                [JournalEntry(pk=pk, embedding=embeddings.to_bytes(embeddings.embed(content))) for pk, content in rows],
+                ['embedding']
+            )
+            done += len(rows)
+            last_pk = rows[-1][0]
+            self.stdout.write(f'{done} entries ({done / max(time.monotonic() - started, 1e-6):,.0f}/s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Embedded {done} entries'))
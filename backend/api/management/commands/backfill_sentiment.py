@@ -0,0 +1,49 @@
+"""
+Score mood and themes for entries saved before api.sentiment existed.
+
+    python manage.py backfill_sentiment
+    python manage.py backfill_sentiment --all    # after editing the lexicon
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import sentiment
+from api.models import JournalEntry
+
+
+class Command(BaseCommand):
+    help = 'Fill in journal entry sentiment scores and themes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--all', action='store_true', help='Rescore every entry, not just unscored ones')
+
+    def handle(self, *args, **options):
+        queryset = JournalEntry.objects.order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(sentiment__isnull=True)
+
+        done = 0
+        last_pk = 0
+        started = time.monotonic()
+        while True:
+            rows = list(queryset.filter(pk__gt=last_pk).values_list('pk', 'content')[:options['batch_size']])
+            if not rows:
+                break
+
+            # One vectorized pass per batch
+            scores = sentiment.score_many(content for _, content in rows)
+            JournalEntry.objects.bulk_update(
+                [
+                    JournalEntry(pk=pk, sentiment=mood, themes=themes)
+                    for (pk, _), (mood, themes) in zip(rows, scores)
+                ],
+                ['sentiment', 'themes']
+            )
+            done += len(rows)
+            last_pk = rows[-1][0]
+            self.stdout.write(f'{done} entries ({done / max(time.monotonic() - started, 1e-6):,.0f}/s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Scored {done} entries'))
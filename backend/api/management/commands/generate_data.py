@@ -0,0 +1,271 @@
+"""
+Bulk-generate synthetic users, preferences, journal entries and AI interactions.
+
+    python manage.py generate_data --users 1000 --entries-per-user 100
+    python manage.py generate_data --users 100000 --entries-per-user 1000 --batch-size 50000
+    python manage.py generate_data --clear
+
+Rows are streamed with COPY ... FROM STDIN on PostgreSQL and a single
+executemany() per batch elsewhere. Both write raw rows, so model signals
+(journal_updated_at, cached users) don't fire: journal_updated_at is set
+directly, and each user's cached history and journal namespace are dropped
+after their batch, since ids freed by --clear are handed out again. Primary
+keys are allocated up front from the current maximum, so don't run this
+against a database taking writes.
+"""
+
+import math
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api import cache, embeddings, history, sentiment
+from api.llm_service import get_model_pricing
+from api.models import AIInteraction, JournalEntry, User, UserPreferences
+
+HELP_TYPE_WEIGHTS = {
+    'acute_validation': 25,
+    'acute_skills': 20,
+    'chronic_validation': 15,
+    'chronic_education': 10,
+    'max_validation': 8,
+    'max_assessment': 7,
+    None: 15,   # save_only
+}
+CONTEXT_WINDOWS = {
+    'chronic_education': 7, 'chronic_validation': 7,
+    'max_validation': 30, 'max_assessment': 30,
+}
+TIMEZONES = ['UTC', 'America/New_York', 'America/Los_Angeles', 'Europe/London', 'Europe/Athens', 'Asia/Tokyo']
+NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Riley', 'Morgan', 'Casey', 'Jamie', 'Avery', 'Quinn']
+
+OPENERS = [
+    'Today started rough.', 'I woke up feeling lighter than usual.', 'Work was overwhelming again.',
+    'I had a long talk with my sister.', 'Couldn\'t sleep much last night.', 'The weekend felt too short.',
+    'I finally went for a run.', 'My therapist asked me something that stuck with me.',
+]
+MIDDLES = [
+    'I keep replaying the conversation in my head and wondering what I should have said.',
+    'My chest felt tight during the meeting and I noticed my thoughts racing ahead.',
+    'I tried the breathing exercise and it helped a little, at least for a few minutes.',
+    'It is hard to tell whether I am tired or just avoiding things I care about.',
+    'I noticed I was much kinder to a friend than I ever am to myself.',
+    'Everything felt like too much, even small tasks like answering messages.',
+    'I spent an hour outside and it was the first time all week my mind felt quiet.',
+    'There is a familiar heaviness that shows up on Sunday evenings.',
+]
+CLOSERS = [
+    'Tomorrow I want to be gentler with myself.', 'I am not sure what to make of it yet.',
+    'Writing this down already helps.', 'I hope next week is calmer.',
+    'Maybe I need to ask for help more often.', 'At least I showed up today.',
+]
+TITLES = ['Rough day', 'Small win', 'Sunday thoughts', 'After therapy', 'Tired', 'Better today', 'Racing mind']
+RESPONSE = (
+    'Thank you for sharing this. It makes sense that you feel this way given everything you described. '
+    'Noticing these patterns is an important step, and the care you show others is something you deserve too. '
+)
+
+
+def _entry_content(rng):
+    sentences = [rng.choice(OPENERS)]
+    sentences += rng.choices(MIDDLES, k=rng.randint(2, 8))
+    sentences.append(rng.choice(CLOSERS))
+    return ' '.join(sentences)
+
+
+def _next_id(model):
+    return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+
+def _write_rows(model, fields, rows):
+    """
+    Insert rows (tuples in `fields` order, attnames) without model.save().
+    """
+    opts = model._meta
+    model_fields = [opts.get_field(name) for name in fields]
+    table = connection.ops.quote_name(opts.db_table)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in model_fields)
+
+    # Backend-specific adaptation, e.g. JSONField values to Jsonb/JSON text
+    prepared = (
+        [field.get_db_prep_save(value, connection) for field, value in zip(model_fields, row)]
+        for row in rows
+    )
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            with cursor.cursor.copy(f'COPY {table} ({columns}) FROM STDIN') as copy:
+                for row in prepared:
+                    copy.write_row(row)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', list(prepared))
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate synthetic users, journal entries and AI interactions for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--entries-per-user', type=int, default=30,
+                            help='Entries per user, one per day going back from today')
+        parser.add_argument('--ai-ratio', type=float, default=0.8,
+                            help='Share of entries with a help type that get an AIInteraction')
+        parser.add_argument('--batch-size', type=int, default=20_000,
+                            help='Approximate journal entries written per transaction')
+        parser.add_argument('--prefix', default='synthetic', help='Username/email prefix of generated users')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete previously generated users (matching --prefix) first')
+
+    def handle(self, *args, **options):
+        if options['users'] < 0 or options['entries_per_user'] < 0:
+            raise CommandError('--users and --entries-per-user must not be negative')
+        if not 0 <= options['ai_ratio'] <= 1:
+            raise CommandError('--ai-ratio must be between 0 and 1')
+
+        prefix = options['prefix']
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=f'{prefix}-').delete()
+            self.stdout.write(f'Deleted {deleted} rows from earlier runs')
+
+        users = options['users']
+        per_user = options['entries_per_user']
+        if not users:
+            return
+
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.today = self.now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.seconds_today = int((self.now - self.today).total_seconds())
+        self.ai_ratio = options['ai_ratio']
+        # Unusable password: synthetic users can't log in, and hashing is skipped
+        self.password = make_password(None)
+        self.help_types = list(HELP_TYPE_WEIGHTS)
+        self.help_type_weights = list(HELP_TYPE_WEIGHTS.values())
+
+        ids = {model: _next_id(model) for model in (User, JournalEntry, AIInteraction, UserPreferences)}
+        users_per_batch = max(1, math.ceil(options['batch_size'] / max(per_user, 1)))
+        totals = dict.fromkeys(('users', 'entries', 'ai'), 0)
+        started = time.monotonic()
+
+        for batch_start in range(0, users, users_per_batch):
+            batch_users = min(users_per_batch, users - batch_start)
+            with transaction.atomic():
+                written = self._write_batch(prefix, ids, batch_users, per_user)
+            for key, count in written.items():
+                totals[key] += count
+
+            elapsed = time.monotonic() - started
+            rows = sum(totals.values())
+            self.stdout.write(
+                f'{totals["users"]}/{users} users, {totals["entries"]} entries, '
+                f'{totals["ai"]} AI interactions ({rows / max(elapsed, 1e-6):,.0f} rows/s)'
+            )
+
+        self._reset_sequences()
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {totals["users"]} users, {totals["entries"]} entries and '
+            f'{totals["ai"]} AI interactions in {time.monotonic() - started:.1f}s'
+        ))
+
+    def _write_batch(self, prefix, ids, user_count, per_user):
+        rng = self.rng
+        first_user = ids[User]
+        user_ids = range(first_user, first_user + user_count)
+        ids[User] += user_count
+
+        _write_rows(User, (
+            'id', 'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+            'is_staff', 'is_active', 'date_joined', 'journal_updated_at',
+        ), [
+            (
+                user_id, self.password, False, f'{prefix}-{user_id}', rng.choice(NAMES), '',
+                f'{prefix}-{user_id}@example.com', False, True,
+                self.now - timedelta(days=per_user + rng.randint(0, 30)), self.now,
+            )
+            for user_id in user_ids
+        ])
+
+        first_preferences = ids[UserPreferences]
+        ids[UserPreferences] += user_count
+        _write_rows(UserPreferences, (
+            'id', 'user_id', 'user_timezone', 'preferred_name', 'created_at', 'updated_at',
+        ), [
+            (first_preferences + offset, user_id, rng.choice(TIMEZONES), rng.choice(NAMES), self.now, self.now)
+            for offset, user_id in enumerate(user_ids)
+        ])
+
+        # Entries stream straight into the database; their AI rows are collected
+        # on the way and written afterwards, since only one COPY can run at a time
+        interactions = []
+
+        def entries():
+            for user_id in user_ids:
+                for day in range(per_user):
+                    entry_id = ids[JournalEntry]
+                    ids[JournalEntry] += 1
+                    help_type = rng.choices(self.help_types, self.help_type_weights)[0]
+                    # Random time of day, never in the future
+                    latest = self.seconds_today if day == 0 else 86_399
+                    created_at = self.today - timedelta(days=day) + timedelta(seconds=rng.randint(0, latest))
+
+                    if help_type and rng.random() < self.ai_ratio:
+                        context_count = min(CONTEXT_WINDOWS.get(help_type, 0), per_user - day - 1)
+                        prompt_tokens = 400 + context_count * 250
+                        completion_tokens = rng.randint(150, 900)
+                        model = settings.AI_MODEL_ROUTES.get(help_type, {}).get('model', settings.AI_MODEL)
+                        input_rate, output_rate = get_model_pricing(model)
+                        interactions.append((
+                            ids[AIInteraction], entry_id, RESPONSE * rng.randint(1, 4), context_count,
+                            prompt_tokens + completion_tokens,
+                            round(Decimal(prompt_tokens * input_rate + completion_tokens * output_rate) / 1_000_000, 4),
+                            model, created_at + timedelta(seconds=rng.randint(2, 20)),
+                        ))
+                        ids[AIInteraction] += 1
+
+                    content = _entry_content(rng)
+                    mood, themes = sentiment.score(content)
+                    yield (
+                        entry_id, user_id,
+                        rng.choice(TITLES) if rng.random() < 0.6 else None,
+                        content, help_type,
+                        rng.random() < 0.2, rng.random() < 0.1, created_at,
+                        embeddings.to_bytes(embeddings.embed(content)), mood, themes,
+                    )
+
+        entry_rows = entries() if connection.vendor == 'postgresql' else list(entries())
+        _write_rows(JournalEntry, (
+            'id', 'user_id', 'title', 'content', 'requested_help_type',
+            'is_continuation', 'references_past_entries', 'created_at', 'embedding', 'sentiment', 'themes',
+        ), entry_rows)
+
+        _write_rows(AIInteraction, (
+            'id', 'journal_entry_id', 'claude_response', 'context_entries_count',
+            'tokens_used', 'api_cost', 'model', 'created_at',
+        ), interactions)
+
+        # What the signals would have done for rows written through the ORM
+        for user_id in user_ids:
+            history.invalidate(user_id)
+            cache.invalidate_user(user_id)
+
+        return {'users': user_count, 'entries': user_count * per_user, 'ai': len(interactions)}
+
+    def _reset_sequences(self):
+        # Explicit ids don't advance PostgreSQL sequences
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, UserPreferences, JournalEntry, AIInteraction]
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,49 @@
+"""
+Generate the AI responses that load shedding deferred (api.overload) but no
+process got to, e.g. because it restarted with them still queued.
+
+    python manage.py generate_deferred
+    python manage.py generate_deferred --older-than 0    # include ones deferred just now
+
+Entries deferred within the last --older-than seconds are skipped by default:
+a running process may still be about to answer them.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import JournalEntry
+from api.views import JournalEntryViewSet
+
+
+class Command(BaseCommand):
+    help = 'Generate AI responses for deferred journal entries that never got one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=float, default=600,
+                            help='Only entries deferred at least this many seconds ago')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=options['older_than'])
+        entries = (
+            JournalEntry.objects
+            .filter(ai_deferred_at__lte=cutoff, ai_interaction__isnull=True, requested_help_type__isnull=False)
+            .select_related('user')
+            .order_by('ai_deferred_at')
+        )
+
+        done = failed = 0
+        view = JournalEntryViewSet()
+        for entry in entries:
+            try:
+                view._generate_ai_interaction(entry, entry.requested_help_type, entry.user)
+                done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Entry {entry.pk}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated {done} deferred response(s)'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} failed; run again to retry'))
@@ -0,0 +1,122 @@
+"""
+Container-start migrations: a fast no-op when nothing is pending, and only
+one instance at a time applies them on Postgres.
+
+    python manage.py migrate_on_start && gunicorn ...
+    python manage.py migrate_on_start --no-wait      # start serving if another instance is migrating
+    python manage.py migrate_on_start --timeout 600
+
+The check compares migration files on disk with django_migrations in one
+query, without importing the migrations or building the graph that
+`migrate` needs. Anything it can't account for (a squashed migration,
+say) counts as pending and goes through `migrate`, which decides for real.
+
+Pending migrations run under a session-level Postgres advisory lock.
+Instances that start together wait for it (up to --timeout) and then
+re-check, so they normally find nothing left to do. The lock needs a
+session, so point DATABASE_URL at a direct connection rather than a
+transaction-mode pooler (Neon's -pooler host) for this step.
+"""
+
+import pkgutil
+import time
+from importlib import import_module
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+# pg_advisory_lock key shared by every instance ('migr')
+LOCK_ID = 0x6D696772
+
+
+def migrations_on_disk():
+    """
+    (app_label, migration_name) for every migration file of installed apps.
+    """
+    found = set()
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            module = import_module(module_name)
+        except ImportError:
+            continue
+        if not hasattr(module, '__path__'):
+            continue
+        # Same names MigrationLoader.load_disk() considers
+        found.update(
+            (app_config.label, name) for _, name, is_pkg in pkgutil.iter_modules(module.__path__)
+            if not is_pkg and name[0] not in '_~'
+        )
+    return found
+
+
+def pending_migrations(connection):
+    return migrations_on_disk() - set(MigrationRecorder(connection).applied_migrations())
+
+
+class Command(BaseCommand):
+    help = 'Apply pending migrations at container start, skipping fast when there are none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--no-wait', action='store_false', dest='wait',
+                            help="Don't wait while another instance holds the migration lock")
+        parser.add_argument('--timeout', type=float, default=300,
+                            help='Seconds to wait for the migration lock')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        started = time.monotonic()
+
+        pending = pending_migrations(connection)
+        if not pending:
+            self.stdout.write(f'No migrations to apply (checked in {(time.monotonic() - started) * 1000:.0f} ms)')
+            return
+        names = sorted(f'{app_label}.{name}' for app_label, name in pending)
+        self.stdout.write(f'{len(pending)} migration(s) pending: {", ".join(names[:5])}{", ..." if len(names) > 5 else ""}')
+
+        if connection.vendor != 'postgresql':
+            # SQLite installs are single-node; nothing to race with
+            self._migrate(options)
+            return
+
+        if not self._lock(connection, options['wait'], options['timeout']):
+            self.stdout.write('Another instance is applying migrations; continuing without waiting')
+            return
+        try:
+            # Whoever held the lock before us has probably applied them already
+            if pending_migrations(connection):
+                self._migrate(options)
+            else:
+                self.stdout.write('Applied by another instance')
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [LOCK_ID])
+
+    def _lock(self, connection, wait, timeout):
+        deadline = time.monotonic() + timeout
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [LOCK_ID])
+                if cursor.fetchone()[0]:
+                    return True
+                if not wait:
+                    return False
+                if time.monotonic() >= deadline:
+                    raise CommandError(f'Timed out after {timeout:.0f}s waiting for the migration lock')
+                self.stdout.write('Waiting for another instance to finish migrating...')
+                time.sleep(1)
+
+    def _migrate(self, options):
+        started = time.monotonic()
+        call_command(
+            'migrate', database=options['database'], interactive=False, verbosity=options['verbosity'],
+            stdout=self.stdout
+        )
+        self.stdout.write(self.style.SUCCESS(f'Migrated in {time.monotonic() - started:.1f}s'))
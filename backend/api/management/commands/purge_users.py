@@ -0,0 +1,71 @@
+"""
+Delete users and all of their data in throttled batches (see api.purge).
+
+    python manage.py purge_users --user 42 --user someone@example.com
+    python manage.py purge_users --pending              # finish interrupted account deletions
+    python manage.py purge_users --user 42 --rate 0     # unthrottled, e.g. off-peak
+
+Safe to interrupt: running it again carries on where it stopped.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import User
+from api.purge import purge_user
+
+
+class Command(BaseCommand):
+    help = 'Delete users and their journal data in throttled, resumable batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', default=[], help='User id or email (repeatable)')
+        parser.add_argument('--pending', action='store_true',
+                            help='Purge every account whose deletion was requested but not finished')
+        parser.add_argument('--batch-size', type=int, default=settings.PURGE_BATCH_SIZE)
+        parser.add_argument('--rate', type=int, default=settings.PURGE_MAX_ROWS_PER_SECOND,
+                            help='Maximum rows deleted per second (0 = unthrottled)')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Do not ask for confirmation')
+
+    def handle(self, *args, **options):
+        if not options['user'] and not options['pending']:
+            raise CommandError('Pass --user and/or --pending')
+
+        users = {user.pk: user for user in self._resolve(options['user'])}
+        if options['pending']:
+            users.update((user.pk, user) for user in User.objects.filter(purge_requested_at__isnull=False))
+        if not users:
+            self.stdout.write('Nothing to purge')
+            return
+
+        if options['interactive']:
+            listed = ', '.join(user.email for user in users.values())
+            if input(f'Permanently delete {len(users)} user(s) and their data ({listed})? [y/N] ').lower() != 'y':
+                raise CommandError('Purge cancelled')
+
+        for user in users.values():
+            self._purge(user, options['batch_size'], options['rate'])
+
+    def _resolve(self, identifiers):
+        for identifier in identifiers:
+            lookup = {'pk': int(identifier)} if identifier.isdigit() else {'email__iexact': identifier}
+            user = User.objects.filter(**lookup).first()
+            if user is None:
+                raise CommandError(f'No user matches {identifier!r}')
+            yield user
+
+    def _purge(self, user, batch_size, rate):
+        started = time.monotonic()
+
+        def report(model_name, deleted):
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(f'  {user.email}: {deleted} {model_name} rows ({deleted / elapsed:,.0f}/s)')
+
+        counts = purge_user(user.pk, batch_size=batch_size, max_rate=rate, report=report)
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items() if count)
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {user.email} in {time.monotonic() - started:.1f}s ({summary})'
+        ))
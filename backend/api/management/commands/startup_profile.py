@@ -0,0 +1,116 @@
+"""
+Profile a cold start: per-module import time and time to first response.
+
+    python manage.py startup_profile
+    python manage.py startup_profile --path /api/user/ --top 40 --json
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter under -X importtime, so nothing is imported yet
+PROBE_SCRIPT = r'''
+import io, json, sys, time
+started = time.perf_counter()
+from mindfulcompanion.wsgi import application
+ready = time.perf_counter()
+
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'QUERY_STRING': '',
+    'SERVER_NAME': sys.argv[2], 'SERVER_PORT': '80', 'HTTP_HOST': sys.argv[2],
+    'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http',
+    'wsgi.input': io.BytesIO(b''), 'wsgi.errors': sys.stderr,
+    'wsgi.multithread': True, 'wsgi.multiprocess': True, 'wsgi.run_once': False,
+}
+status = []
+body = b''.join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+responded = time.perf_counter()
+
+print(json.dumps({
+    'ready_s': ready - started,
+    'first_response_s': responded - started,
+    'status': status[0] if status else None,
+    'llm_loaded_before_response': 'litellm' in sys.modules,
+}))
+'''
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = 'Report import time per module and time to first response for a cold process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/csrf/', help='URL path to request (default: /api/csrf/)')
+        parser.add_argument('--top', type=int, default=25, help='Number of modules to list')
+        parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+
+    def handle(self, *args, **options):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'mindfulcompanion.settings'),
+            # Measure the lazy path itself, not the background warmup racing it
+            'LLM_WARMUP': 'False',
+        }
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE_SCRIPT, options['path'], self._host()],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Startup probe failed:\n{result.stderr[-2000:]}')
+
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        modules = self._parse_importtime(result.stderr)
+        report['modules'] = sorted(modules, key=lambda m: m['cumulative_ms'], reverse=True)
+        report['packages'] = self._by_package(modules)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self._print_report(report, options['top'])
+
+    def _host(self):
+        for host in settings.ALLOWED_HOSTS:
+            if host != '*':
+                return ('x' + host) if host.startswith('.') else host
+        return 'localhost'
+
+    def _parse_importtime(self, stderr):
+        modules = []
+        for line in stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append({
+                    'module': name,
+                    'self_ms': int(self_us) / 1000,
+                    'cumulative_ms': int(cumulative_us) / 1000,
+                    'depth': len(indent) // 2,
+                })
+        return modules
+
+    def _by_package(self, modules):
+        totals = defaultdict(float)
+        for module in modules:
+            totals[module['module'].split('.')[0]] += module['self_ms']
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def _print_report(self, report, top):
+        self.stdout.write(f"Django ready:          {report['ready_s'] * 1000:8.1f} ms")
+        self.stdout.write(f"First response:        {report['first_response_s'] * 1000:8.1f} ms  ({report['status']})")
+        self.stdout.write(f"litellm loaded by then: {report['llm_loaded_before_response']}")
+
+        self.stdout.write(f'\nTop {top} modules by cumulative import time:')
+        for module in report['modules'][:top]:
+            self.stdout.write(f"  {module['cumulative_ms']:8.1f} ms  (self {module['self_ms']:6.1f})  {module['module']}")
+
+        self.stdout.write(f'\nTop {top} packages by self import time:')
+        for package, ms in list(report['packages'].items())[:top]:
+            self.stdout.write(f'  {ms:8.1f} ms  {package}')
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_journalentry_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='journal_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
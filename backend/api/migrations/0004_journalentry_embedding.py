@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_user_journal_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='embedding',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
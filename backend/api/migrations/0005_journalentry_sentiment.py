@@ -0,0 +1,23 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_journalentry_embedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='sentiment',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='journalentry',
+            name='themes',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
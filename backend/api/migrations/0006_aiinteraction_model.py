@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_journalentry_sentiment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiinteraction',
+            name='model',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_aiinteraction_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='purge_requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_user_purge_requested_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='ai_deferred_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
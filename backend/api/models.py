@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
@@ -14,6 +15,11 @@ class User(AbstractUser):
 
     date_joined = models.DateTimeField(auto_now_add=True)
 
+    # Bumped by api.signals on any journal write; validator for conditional GETs
+    journal_updated_at = models.DateTimeField(null=True, blank=True)
+    # Set when the account is deleted; api.purge removes the rows in the background
+    purge_requested_at = models.DateTimeField(null=True, blank=True)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
@@ -61,6 +67,16 @@ class JournalEntry(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # float32 hashed term vector (api.embeddings), set by api.signals on save
+    embedding = models.BinaryField(null=True, blank=True, editable=False)
+
+    # Lexicon mood score in [-1, 1] and top themes (api.sentiment), set by api.signals on save
+    sentiment = models.FloatField(null=True, blank=True, editable=False)
+    themes = models.JSONField(default=list, blank=True, editable=False)
+
+    # Set when load shedding (api.overload) deferred the AI response; pending until ai_interaction exists
+    ai_deferred_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'Journal Entries'
@@ -87,14 +103,49 @@ class JournalEntry(models.Model):
 
         return base_context
 
-    def get_context_entries(self):
+    def get_context_entries(self, window=None):
 
-        context_size = self.get_context_window_size()
+        # window overrides the help type's size (e.g. shrunk under load)
+        context_size = self.get_context_window_size() if window is None else window
 
         if context_size == 0:
-            return []
+            return JournalEntry.objects.none()
+
+        previous = JournalEntry.objects.filter(user=self.user, created_at__lt=self.created_at).order_by('-created_at')
+
+        if not settings.CONTEXT_RANKING:
+            return previous[:context_size]
+
+        # Still newest first, but chosen by relevance to this entry as well as recency
+        return previous.filter(pk__in=self._rank_context_ids(previous, context_size))
+
+    def _rank_context_ids(self, previous, limit):
+        """
+        Ids of the `limit` previous entries that best match this one, see api.embeddings.
+        """
+        # Imported here so numpy only loads once an entry actually needs ranking
+        from . import embeddings
+
+        candidates = list(previous.values_list('id', 'created_at', 'embedding')[:settings.CONTEXT_CANDIDATES])
+        if len(candidates) <= limit:
+            return [pk for pk, _, _ in candidates]
+
+        # Entries saved before embeddings existed (or not yet backfilled)
+        missing = [pk for pk, _, embedding in candidates if embedding is None]
+        contents = dict(JournalEntry.objects.filter(pk__in=missing).values_list('id', 'content')) if missing else {}
+
+        vectors = [
+            embeddings.from_bytes(embedding) if embedding is not None else embeddings.embed(contents[pk])
+            for pk, _, embedding in candidates
+        ]
+        query = embeddings.from_bytes(self.embedding) if self.embedding is not None else embeddings.embed(self.content)
+        ages_days = [(self.created_at - created_at).total_seconds() / 86400 for _, created_at, _ in candidates]
 
-        return JournalEntry.objects.filter(user=self.user, created_at__lt=self.created_at).order_by('-created_at')[:context_size]
+        best = embeddings.rank(
+            query, vectors, ages_days, limit,
+            settings.CONTEXT_RELEVANCE_WEIGHT, settings.CONTEXT_RECENCY_HALF_LIFE_DAYS
+        )
+        return [candidates[index][0] for index in best]
 
 
 class AIInteraction(models.Model):
@@ -108,6 +159,8 @@ class AIInteraction(models.Model):
     context_entries_count = models.IntegerField(default=0)
     tokens_used = models.IntegerField(null=True, blank=True)
     api_cost = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True)
+    # Model that actually answered (the routed model or its fallback)
+    model = models.CharField(max_length=100, blank=True, default='')
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -0,0 +1,181 @@
+"""
+Load shedding for AI responses during provider slowdowns.
+
+The controller watches two signals in this process: the median time to first
+chunk of LLM calls over the last OVERLOAD_WINDOW seconds, and the number of
+LLM calls in flight on request threads (prompt-cache prewarms and deferred
+generation run untracked(), since they don't hold one). Each one is compared with its three steps
+(OVERLOAD_LATENCY_STEPS, OVERLOAD_INFLIGHT_STEPS) and the worse of the two
+gives the level. Every level adds one degradation for chronic_*/max_* help
+types:
+
+    1  SHRINK_CONTEXT   context window cut to OVERLOAD_CONTEXT_FACTOR of its size
+    2  LOWER_MAX_TOKENS max_tokens capped at OVERLOAD_MAX_TOKENS
+    3  DEFER            the entry is saved and its response generated later
+
+Acute help types are never degraded; shedding the others is what keeps
+threads and provider capacity free for them. Deferred responses are
+generated one at a time on a background thread once the level drops below
+DEFER, and appear as the entry's ai_interaction, which the client polls
+for. The queue is held in memory, but deferred entries are marked
+(JournalEntry.ai_deferred_at), so `manage.py generate_deferred` can answer
+the ones a restart dropped.
+"""
+
+import contextvars
+import logging
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+from mindfulcompanion import log
+
+logger = logging.getLogger(__name__)
+
+SHRINK_CONTEXT, LOWER_MAX_TOKENS, DEFER = 1, 2, 3
+
+ACUTE_HELP_TYPES = ('acute_validation', 'acute_skills')
+
+_untracked = contextvars.ContextVar('overload_untracked', default=False)
+
+
+def _step(value, steps):
+    return sum(value >= threshold for threshold in steps)
+
+
+class OverloadController:
+    """
+    Per-process LLM latency and concurrency, and the degradation they call for.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latencies = deque(maxlen=100)
+
+    @contextmanager
+    def in_flight(self):
+        if _untracked.get():
+            yield
+            return
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def observe(self, seconds):
+        """
+        Record one call's time to first chunk.
+        """
+        with self._lock:
+            self._latencies.append((time.monotonic(), seconds))
+
+    def snapshot(self):
+        """
+        (median recent latency in seconds, LLM calls in flight).
+        """
+        cutoff = time.monotonic() - settings.OVERLOAD_WINDOW
+        with self._lock:
+            recent = [seconds for at, seconds in self._latencies if at >= cutoff]
+            in_flight = self._in_flight
+        return (statistics.median(recent) if recent else 0.0), in_flight
+
+    def level(self):
+        latency, in_flight = self.snapshot()
+        return max(
+            _step(latency, settings.OVERLOAD_LATENCY_STEPS),
+            _step(in_flight, settings.OVERLOAD_INFLIGHT_STEPS),
+        )
+
+    def plan(self, help_type):
+        """
+        The degradation to apply to a response of this help type right now,
+        or None when there is none (normal load, acute help type, shedding off).
+        """
+        if not settings.OVERLOAD_SHEDDING or help_type in ACUTE_HELP_TYPES:
+            return None
+
+        level = self.level()
+        if not level:
+            return None
+        return {
+            'level': level,
+            'context_factor': settings.OVERLOAD_CONTEXT_FACTOR,
+            'max_tokens': settings.OVERLOAD_MAX_TOKENS if level >= LOWER_MAX_TOKENS else None,
+            'deferred': level >= DEFER,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._in_flight = 0
+            self._latencies.clear()
+
+
+controller = OverloadController()
+
+_deferred = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+@contextmanager
+def untracked():
+    """
+    LLM calls made inside don't count as in flight.
+    """
+    token = _untracked.set(True)
+    try:
+        yield
+    finally:
+        _untracked.reset(token)
+
+
+def shrink_window(size, degradation):
+    """
+    Context window under a degradation plan; at least one entry is kept.
+    """
+    if not size or not degradation:
+        return size
+    return max(1, int(size * degradation['context_factor']))
+
+
+def _run_deferred():
+    while True:
+        task, label, request_id = _deferred.get()
+        while controller.level() >= DEFER:
+            time.sleep(settings.OVERLOAD_DEFER_POLL)
+
+        log.bind_request_id(request_id)
+        try:
+            with untracked():
+                task()
+            logger.info("Generated deferred response for %s", label)
+        except Exception as e:
+            logger.error("Deferred response for %s failed: %s", label, e)
+        finally:
+            # This thread's own connection
+            connection.close()
+            _deferred.task_done()
+
+
+def defer(task, label):
+    """
+    Run task() on the deferred-generation thread once pressure drops.
+    """
+    global _worker
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_deferred, name='llm-deferred', daemon=True)
+            _worker.start()
+    _deferred.put((task, label, log.get_request_id()))
+    logger.warning("Deferred AI response for %s (%s queued)", label, _deferred.qsize())
@@ -0,0 +1,105 @@
+"""
+Batched deletion of a user and everything they wrote.
+
+User.delete() goes through Django's collector, which loads every journal
+entry and AI interaction into memory before issuing its deletes, in one
+long transaction. purge_user() instead deletes the bulky child rows
+directly, PURGE_BATCH_SIZE primary keys at a time (AI interactions, then
+journal entries), each batch committed on its own and paced to
+PURGE_MAX_ROWS_PER_SECOND. Only then is the user row deleted through the
+ORM, at which point the collector has nothing large left to load.
+
+Each batch deletes whatever is still there, so an interrupted purge resumes
+by simply running again. Accounts deleted from the app are marked with
+User.purge_requested_at first, and `manage.py purge_users --pending`
+finishes any that were cut short.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from mindfulcompanion import log
+
+from . import history
+from .cache import invalidate_user
+from .models import AIInteraction, JournalEntry, User
+
+logger = logging.getLogger(__name__)
+
+
+def _delete_batches(model, queryset, batch_size, max_rate, report):
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    deleted = 0
+
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+
+        started = time.monotonic()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE {pk} IN ({", ".join(["%s"] * len(ids))})', ids)
+            deleted += cursor.rowcount
+        report(model._meta.model_name, deleted)
+
+        # Pace the deletes so replication and other queries keep up
+        if max_rate:
+            time.sleep(max(0.0, len(ids) / max_rate - (time.monotonic() - started)))
+
+
+def purge_user(user_id, batch_size=None, max_rate=None, report=None):
+    """
+    Delete a user and all of their data. Returns rows deleted per model.
+
+    report(model_name, deleted_so_far) is called after every batch.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    max_rate = settings.PURGE_MAX_ROWS_PER_SECOND if max_rate is None else max_rate
+    report = report or (lambda model_name, deleted: None)
+
+    counts = {
+        'aiinteraction': _delete_batches(
+            AIInteraction, AIInteraction.objects.filter(journal_entry__user_id=user_id), batch_size, max_rate, report
+        ),
+        'journalentry': _delete_batches(
+            JournalEntry, JournalEntry.objects.filter(user_id=user_id), batch_size, max_rate, report
+        ),
+    }
+
+    # The raw deletes skipped the post_delete handlers
+    invalidate_user(user_id)
+    history.invalidate(user_id)
+
+    # Preferences, email addresses, social accounts and the user row itself
+    _, remaining = User.objects.filter(pk=user_id).delete()
+    for label, count in remaining.items():
+        name = label.rsplit('.', 1)[-1].lower()
+        counts[name] = counts.get(name, 0) + count
+    return counts
+
+
+def start_purge(user_id):
+    """
+    Purge on a daemon thread so account deletion returns immediately.
+    If the process dies first, `manage.py purge_users --pending` picks it up.
+    """
+    request_id = log.get_request_id()
+
+    def _purge():
+        log.bind_request_id(request_id)
+        started = time.monotonic()
+        try:
+            counts = purge_user(user_id)
+            logger.info("Purged user=%s in %.1fs: %s", user_id, time.monotonic() - started, counts)
+        except Exception as e:
+            logger.error("Purge of user=%s failed, will resume with purge_users --pending: %s", user_id, e)
+        finally:
+            # This thread's own connection
+            connection.close()
+
+    threading.Thread(target=_purge, name=f'purge-user-{user_id}', daemon=True).start()
@@ -0,0 +1,52 @@
+"""
+orjson-backed renderer that produces the same bytes as DRF's JSONRenderer.
+"""
+
+import json
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from mindfulcompanion.timing import timed
+
+_encoder = JSONEncoder()
+
+# Non-str keys mirror json.dumps; datetimes go through DRF's encoder for the 'Z' suffix
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _as_python_float(value):
+    """
+    orjson and json.dumps disagree on small/large floats (0.00001 vs 1e-05),
+    so floats anywhere in the data (estimated_cost, mood_trend points) are
+    pre-rendered with json and spliced in.
+    """
+    if isinstance(value, float):
+        return orjson.Fragment(json.dumps(value))
+    if isinstance(value, dict):
+        return {key: _as_python_float(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_as_python_float(item) for item in value]
+    return value
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for JSONRenderer using orjson for compact output.
+    Indented output (browsable API, ?indent=) still goes through json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        with timed('serialize'):
+            ret = orjson.dumps(_as_python_float(data), default=_encoder.default, option=ORJSON_OPTIONS)
+
+        # Same JavaScript-subset escaping as JSONRenderer (U+2028 / U+2029)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,152 @@
+"""
+Lexicon-based mood and theme scoring for journal entries.
+
+score_many() scores a batch of texts at once: tokens are looked up in a
+small hand-written lexicon (with simple negation, "not happy" counts as
+negative), and the per-entry sums are done with NumPy over the flat list of
+hits. score() is the single-entry case used on save; backfill_sentiment uses
+score_many() in batches.
+
+Sentiment is squashed into [-1, 1] with x / sqrt(x^2 + 15), as VADER does,
+so a long entry doesn't score more extreme just for being long. Themes are
+the (up to) MAX_THEMES topics with the most keyword hits.
+"""
+
+import re
+
+import numpy as np
+
+MAX_THEMES = 3
+TREND_ENTRIES = 14   # entries summarized for the prompt
+
+POSITIVE = {
+    1.0: 'fine okay ok good nice relaxed rested calm steady hopeful helped helpful better '
+         'glad productive peaceful content comfortable safe supported patient gentle kind',
+    2.0: 'happy grateful thankful proud excited joy joyful relieved hope accomplished '
+         'confident energized motivated connected loved lovely beautiful fun laughed enjoyed',
+    3.0: 'amazing wonderful fantastic great thrilled ecstatic elated blessed overjoyed',
+}
+NEGATIVE = {
+    1.0: 'tired bored meh annoyed awkward uneasy restless distracted confused unsure '
+         'bad busy slow low off stuck behind',
+    2.0: 'sad anxious anxiety worried worry stressed stress nervous frustrated upset lonely '
+         'alone angry irritated guilty ashamed overwhelmed exhausted drained tense scared '
+         'afraid hurt crying cried insomnia panic numb empty lost',
+    3.0: 'hopeless worthless miserable devastated depressed depression terrible awful '
+         'horrible unbearable hate despair broken suicidal',
+}
+NEGATORS = frozenset("not no never nothing cannot can't don't didn't isn't wasn't won't hardly barely".split())
+NEGATION_SCOPE = 3   # negation flips the next few words
+
+THEMES = {
+    'work': 'work job boss meeting meetings deadline deadlines office coworker coworkers colleague '
+            'colleagues project career shift manager',
+    'school': 'school class exam exams test homework study studying teacher professor grades university college',
+    'sleep': 'sleep slept insomnia nap tired exhausted bed awake nightmare nightmares rest',
+    'relationships': 'partner boyfriend girlfriend husband wife date dating breakup relationship friend '
+                     'friends lonely',
+    'family': 'mom mum dad mother father sister brother parents family kids son daughter grandma grandpa',
+    'health': 'sick pain headache doctor health therapy therapist medication exercise run gym walk ate eating',
+    'anxiety': 'anxious anxiety panic worried worry nervous racing overthinking fear scared afraid',
+    'self_worth': 'worthless failure ashamed guilty proud enough confidence confident myself self',
+}
+
+TOKEN = re.compile(r"[a-z][a-z']*")
+
+_words = {}
+for _polarity, _lexicon in ((1.0, POSITIVE), (-1.0, NEGATIVE)):
+    for _weight, _text in _lexicon.items():
+        for _word in _text.split():
+            _words[_word] = _polarity * _weight
+LEXICON_INDEX = {word: index for index, word in enumerate(_words)}
+LEXICON_WEIGHTS = np.array(list(_words.values()), dtype=np.float32)
+
+THEME_NAMES = list(THEMES)
+THEME_INDEX = {}
+for _theme, _text in enumerate(THEMES.values()):
+    for _word in _text.split():
+        THEME_INDEX.setdefault(_word, []).append(_theme)
+
+
+def _hits(texts):
+    """
+    Flat (row, lexicon index, sign) and (row, theme) arrays for a batch of texts.
+    """
+    sentiment_rows, sentiment_words, signs = [], [], []
+    theme_rows, theme_ids = [], []
+
+    for row, text in enumerate(texts):
+        negated_for = 0
+        for token in TOKEN.findall((text or '').lower()):
+            if token in NEGATORS:
+                negated_for = NEGATION_SCOPE
+                continue
+            index = LEXICON_INDEX.get(token)
+            if index is not None:
+                sentiment_rows.append(row)
+                sentiment_words.append(index)
+                signs.append(-1.0 if negated_for else 1.0)
+            for theme in THEME_INDEX.get(token, ()):
+                theme_rows.append(row)
+                theme_ids.append(theme)
+            negated_for = max(negated_for - 1, 0)
+
+    return (
+        np.array(sentiment_rows, dtype=np.intp), np.array(sentiment_words, dtype=np.intp),
+        np.array(signs, dtype=np.float32), np.array(theme_rows, dtype=np.intp), np.array(theme_ids, dtype=np.intp),
+    )
+
+
+def score_many(texts):
+    """
+    Returns [(sentiment, themes), ...] in the same order as `texts`.
+    """
+    texts = list(texts)
+    count = len(texts)
+    sentiment_rows, sentiment_words, signs, theme_rows, theme_ids = _hits(texts)
+
+    raw = np.bincount(sentiment_rows, weights=LEXICON_WEIGHTS[sentiment_words] * signs, minlength=count)
+    sentiment = np.round(raw / np.sqrt(raw * raw + 15.0), 3)
+
+    theme_counts = np.zeros((count, len(THEME_NAMES)), dtype=np.int32)
+    np.add.at(theme_counts, (theme_rows, theme_ids), 1)
+    # Stable sort keeps THEMES order between ties
+    ranked = np.argsort(-theme_counts, axis=1, kind='stable')[:, :MAX_THEMES]
+
+    return [
+        (float(sentiment[row]), [THEME_NAMES[theme] for theme in ranked[row] if theme_counts[row, theme]])
+        for row in range(count)
+    ]
+
+
+def score(text):
+    return score_many([text])[0]
+
+
+def describe_trend(points):
+    """
+    One or two sentences summarizing [(sentiment, themes), ...] oldest first,
+    or None if there's too little to say anything.
+    """
+    scored = [sentiment for sentiment, _ in points if sentiment is not None]
+    if len(scored) < 3:
+        return None
+
+    values = np.array(scored, dtype=np.float32)
+    average = float(values.mean())
+    mood = 'mostly positive' if average > 0.2 else 'mostly negative' if average < -0.2 else 'mixed'
+
+    half = len(values) // 2
+    change = float(values[half:].mean() - values[:half].mean())
+    direction = 'improving' if change > 0.15 else 'declining' if change < -0.15 else 'fairly steady'
+
+    summary = f'Across the last {len(values)} entries their mood has been {mood} (average {average:+.2f}) and {direction}.'
+
+    theme_totals = {}
+    for _, themes in points:
+        for theme in themes or ():
+            theme_totals[theme] = theme_totals.get(theme, 0) + 1
+    recurring = [theme.replace('_', ' ') for theme, hits in sorted(theme_totals.items(), key=lambda item: -item[1]) if hits >= 2]
+    if recurring:
+        summary += f' Recurring themes: {", ".join(recurring[:MAX_THEMES])}.'
+    return summary
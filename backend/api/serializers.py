@@ -1,6 +1,11 @@
+from django.db.models.functions import Substr
+from django.utils import timezone
 from rest_framework import serializers
+from mindfulcompanion.timing import timed
 from .models import JournalEntry, AIInteraction
 
+CONTENT_PREVIEW_LENGTH = 150
+
 
 class AIInteractionSerializer(serializers.ModelSerializer):
     """
@@ -15,6 +20,7 @@ class AIInteractionSerializer(serializers.ModelSerializer):
             'context_entries_count',
             'tokens_used',
             'api_cost',
+            'model',
             'created_at'
         ]
         read_only_fields = ['id', 'created_at']
@@ -47,6 +53,11 @@ class JournalEntrySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at']
 
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
     def get_context_window_size(self, obj):
         """
         Custom method to include the calculated context window size.
@@ -89,6 +100,56 @@ class JournalEntryListSerializer(serializers.ModelSerializer):
         """
         Returns first 150 characters of content with ellipsis if truncated.
         """
-        if len(obj.content) > 150:
-            return obj.content[:150] + '...'
-        return obj.content
+        return _content_preview(obj.content)
+
+
+def _content_preview(content):
+    if len(content) > CONTENT_PREVIEW_LENGTH:
+        return content[:CONTENT_PREVIEW_LENGTH] + '...'
+    return content
+
+
+def _iso_datetime(value, tz):
+    """
+    Same output as DRF's DateTimeField with the default ISO 8601 format.
+    """
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def serialize_entry_list(queryset):
+    """
+    Fast read path equivalent to JournalEntryListSerializer(queryset, many=True).data.
+
+    Builds plain dicts from .values() rows instead of model instances and
+    per-field serializer calls, and only fetches the first
+    CONTENT_PREVIEW_LENGTH + 1 characters of content (enough to tell whether
+    the preview needs an ellipsis). Key order and formatting match the
+    serializer so the rendered JSON is identical.
+    """
+    rows = list(queryset.values(
+        'id', 'title', 'requested_help_type', 'created_at',
+        content_head=Substr('content', 1, CONTENT_PREVIEW_LENGTH + 1)
+    ))
+    return serialize_entry_rows(rows)
+
+
+def serialize_entry_rows(rows):
+    """
+    Turns rows with id/title/content_head/requested_help_type/created_at keys
+    into list-serializer dicts.
+    """
+    tz = timezone.get_current_timezone()
+    with timed('serialize'):
+        return [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'content_preview': _content_preview(row['content_head']),
+                'requested_help_type': row['requested_help_type'],
+                'created_at': _iso_datetime(row['created_at'], tz),
+            }
+            for row in rows
+        ]
@@ -0,0 +1,105 @@
+"""
+Model signal handlers for the api app.
+"""
+
+from allauth.socialaccount.signals import social_account_added, social_account_updated
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from mindfulcompanion.middleware import invalidate_cached_user
+from . import history
+from .cache import invalidate_user
+from .models import User, UserPreferences, JournalEntry, AIInteraction
+
+
+def touch_journal(**user_filter):
+    """
+    Mark a user's journal as changed so cached list/detail responses revalidate.
+    A single UPDATE, so no user object needs to be loaded. This deliberately
+    skips the auth cache: the stamp is always read fresh from the database.
+    """
+    User.objects.filter(**user_filter).update(journal_updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=JournalEntry)
+def embed_journal_entry(sender, instance, update_fields=None, **kwargs):
+    # Stored even with CONTEXT_RANKING off, so turning it on needs no backfill
+    if update_fields is not None and 'content' not in update_fields:
+        return
+    from . import embeddings
+
+    instance.embedding = embeddings.to_bytes(embeddings.embed(instance.content))
+
+
+@receiver(pre_save, sender=JournalEntry)
+def score_journal_entry(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'content' not in update_fields:
+        return
+    from . import sentiment
+
+    instance.sentiment, instance.themes = sentiment.score(instance.content)
+
+
+@receiver(post_save, sender=JournalEntry)
+@receiver(post_delete, sender=JournalEntry)
+def journal_entry_changed(sender, instance, **kwargs):
+    touch_journal(pk=instance.user_id)
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=JournalEntry)
+def journal_entry_history(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        history.add_entry(instance)
+    elif update_fields is None or {'title', 'content', 'created_at'} & set(update_fields):
+        history.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=JournalEntry)
+def journal_entry_history_deleted(sender, instance, **kwargs):
+    history.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=AIInteraction)
+@receiver(post_delete, sender=AIInteraction)
+def ai_interaction_changed(sender, instance, **kwargs):
+    touch_journal(journal_entries=instance.journal_entry_id)
+    if not settings.JOURNAL_CACHE:
+        return
+    if AIInteraction.journal_entry.is_cached(instance):
+        invalidate_user(instance.journal_entry.user_id)
+    else:
+        invalidate_user(
+            JournalEntry.objects.filter(pk=instance.journal_entry_id).values_list('user_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=UserPreferences)
+@receiver(post_delete, sender=UserPreferences)
+def preferences_changed(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Covers password changes, deactivation and profile edits
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(user_logged_in)
+@receiver(user_logged_out)
+def user_session_changed(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_cached_user(user.pk)
+
+
+@receiver(social_account_added)
+@receiver(social_account_updated)
+def social_account_changed(sender, request, sociallogin, **kwargs):
+    # allauth may refresh the user's details from the provider on social login
+    if sociallogin.user.pk is not None:
+        invalidate_cached_user(sociallogin.user.pk)
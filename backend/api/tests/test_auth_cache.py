@@ -0,0 +1,74 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from mindfulcompanion.middleware import _user_cache_key
+
+
+@pytest.fixture
+def cached_auth_client(settings, user):
+    """
+    A logged-in Django test client with the cached session/user layer enabled.
+    """
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    settings.MIDDLEWARE = [
+        'mindfulcompanion.middleware.CachedAuthenticationMiddleware'
+        if path == 'django.contrib.auth.middleware.AuthenticationMiddleware' else path
+        for path in settings.MIDDLEWARE
+    ]
+    caches[settings.AUTH_CACHE_ALIAS].clear()
+
+    client = Client()
+    client.login(email='test@example.com', password='testpass123')
+    return client
+
+
+@pytest.mark.django_db
+class TestCachedAuthentication:
+    """
+    Tests for the cached session + user lookup.
+    """
+
+    def test_warm_request_runs_no_queries(self, cached_auth_client, user):
+        """
+        After the first request, neither the session nor the user hits the DB.
+        """
+        cached_auth_client.get('/api/user/')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = cached_auth_client.get('/api/user/')
+
+        assert response.status_code == 200
+        assert response.json()['user']['email'] == user.email
+        assert len(queries) == 0
+
+    def test_logout_invalidates_user(self, cached_auth_client, settings, user):
+        cached_auth_client.get('/api/user/')
+        cache = caches[settings.AUTH_CACHE_ALIAS]
+        assert cache.get(_user_cache_key(user.pk)) is not None
+
+        cached_auth_client.post('/api/logout/')
+
+        assert cache.get(_user_cache_key(user.pk)) is None
+        assert cached_auth_client.get('/api/user/').status_code == 401
+
+    def test_password_change_ends_other_sessions(self, cached_auth_client, user):
+        """
+        A cached user with the old password hash must not keep sessions alive.
+        """
+        cached_auth_client.get('/api/user/')
+
+        user.set_password('a-new-password-456')
+        user.save()
+
+        assert cached_auth_client.get('/api/user/').status_code == 401
+
+    def test_user_edit_refreshes_cache(self, cached_auth_client, user):
+        cached_auth_client.get('/api/user/')
+
+        user.first_name = 'Renamed'
+        user.save()
+
+        assert cached_auth_client.get('/api/user/').json()['user']['first_name'] == 'Renamed'
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.models import JournalEntry
+
+
+@pytest.mark.django_db
+class TestBootstrap:
+    """
+    Tests for the single SPA bootstrap endpoint.
+    """
+
+    def test_anonymous(self, api_client):
+        """
+        Anonymous visitors still get a CSRF token and cookie.
+        """
+        response = api_client.get('/api/bootstrap/')
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data['csrfToken']
+        assert 'csrftoken' in response.cookies
+        assert data['user'] is None
+        assert data['calendar'] is None
+
+    def test_authenticated(self, api_client, user_with_preferences, journal_entry):
+        api_client.force_login(user_with_preferences)
+
+        data = api_client.get('/api/bootstrap/').json()
+
+        assert data['user']['email'] == 'test@example.com'
+        assert data['preferences'] == {'user_timezone': 'America/New_York', 'preferred_name': 'SadBoi'}
+        assert data['today_entry_exists'] is True
+        assert [e['id'] for e in data['calendar']['entries']] == [journal_entry.id]
+
+    def test_without_preferences(self, api_client, user):
+        api_client.force_login(user)
+
+        data = api_client.get('/api/bootstrap/').json()
+
+        assert data['preferences'] is None
+        assert data['today_entry_exists'] is False
+        assert data['calendar']['entries'] == []
+
+    def test_query_count_is_fixed(self, api_client, user, multiple_journal_entries):
+        """
+        The number of queries does not grow with the number of entries.
+        """
+        api_client.force_login(user)
+        api_client.get('/api/bootstrap/')
+
+        with CaptureQueriesContext(connection) as few:
+            api_client.get('/api/bootstrap/')
+
+        for i in range(20):
+            JournalEntry.objects.create(user=user, content=f'More {i}')
+        with CaptureQueriesContext(connection) as many:
+            api_client.get('/api/bootstrap/')
+
+        assert len(few) == len(many)
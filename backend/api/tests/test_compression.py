@@ -0,0 +1,97 @@
+import gzip
+import json
+import zlib
+
+import brotli
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from mindfulcompanion.middleware import CompressionMiddleware, _negotiate_encoding
+
+
+class TestNegotiation:
+    """
+    Tests for Accept-Encoding parsing.
+    """
+
+    @pytest.mark.parametrize('header, expected', [
+        ('gzip, deflate, br', 'br'),
+        ('gzip', 'gzip'),
+        ('br;q=0.5, gzip', 'gzip'),
+        ('br;q=0, gzip;q=0', None),
+        ('*', 'br'),
+        ('identity', None),
+        ('', None),
+    ])
+    def test_negotiate(self, header, expected):
+        assert _negotiate_encoding(header) == expected
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+    """
+    Tests for compressed API responses.
+    """
+
+    def test_brotli(self, authenticated_client, multiple_journal_entries):
+        plain = authenticated_client.get('/api/journal-entries/')
+        response = authenticated_client.get('/api/journal-entries/', HTTP_ACCEPT_ENCODING='gzip, br')
+
+        assert response['Content-Encoding'] == 'br'
+        assert 'Accept-Encoding' in response['Vary']
+        assert json.loads(brotli.decompress(response.content)) == plain.json()
+        assert int(response['Content-Length']) == len(response.content) < len(plain.content)
+
+    def test_gzip(self, authenticated_client, multiple_journal_entries):
+        response = authenticated_client.get('/api/journal-entries/', HTTP_ACCEPT_ENCODING='gzip')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert len(json.loads(gzip.decompress(response.content))) == 10
+
+    def test_small_responses_left_alone(self, authenticated_client):
+        response = authenticated_client.get('/api/journal-entries/', HTTP_ACCEPT_ENCODING='br')
+
+        assert not response.has_header('Content-Encoding')
+        assert response.json() == []
+
+    def test_csrf_token_responses_not_compressed(self, settings, api_client):
+        settings.COMPRESSION_MIN_SIZE = 0
+
+        response = api_client.get('/api/csrf/', HTTP_ACCEPT_ENCODING='br')
+
+        assert not response.has_header('Content-Encoding')
+        assert 'csrfToken' in response.json()
+
+    def test_etag_weakened_and_still_validates(self, authenticated_client, multiple_journal_entries):
+        response = authenticated_client.get('/api/journal-entries/', HTTP_ACCEPT_ENCODING='br')
+        assert response['ETag'].startswith('W/"')
+
+        revalidated = authenticated_client.get(
+            '/api/journal-entries/', HTTP_ACCEPT_ENCODING='br', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert revalidated.status_code == 304
+
+    def test_streaming_is_flushed_per_chunk(self, settings):
+        events = [f'data: {{"n": {i}}}\n\n'.encode() for i in range(3)]
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter(events), content_type='text/event-stream')
+        )
+
+        response = middleware(RequestFactory().get('/api/stream/', HTTP_ACCEPT_ENCODING='gzip'))
+
+        assert response['Content-Encoding'] == 'gzip'
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = iter(response.streaming_content)
+        for event in events:
+            # Each event is readable as soon as its chunk arrives
+            assert decompressor.decompress(next(chunks)) == event
+        assert decompressor.decompress(b''.join(chunks)) + decompressor.flush() == b''
+
+    def test_other_paths_untouched(self):
+        middleware = CompressionMiddleware(lambda request: HttpResponse('x' * 5000, content_type='text/html'))
+
+        response = middleware(RequestFactory().get('/profile', HTTP_ACCEPT_ENCODING='br'))
+
+        assert not response.has_header('Content-Encoding')
+        assert not response.has_header('Vary')
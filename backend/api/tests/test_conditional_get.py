@@ -0,0 +1,123 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from api.models import JournalEntry, AIInteraction
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """
+    Tests for ETag / Last-Modified handling on read endpoints.
+    """
+
+    def test_list_returns_validators(self, authenticated_client, journal_entry):
+        """
+        List responses carry ETag, Last-Modified and a revalidate-always policy.
+        """
+        response = authenticated_client.get('/api/journal-entries/')
+
+        assert response.status_code == 200
+        assert response['ETag']
+        assert response['Last-Modified']
+        assert 'no-cache' in response['Cache-Control']
+        assert 'private' in response['Cache-Control']
+
+    def test_list_not_modified_skips_query(self, authenticated_client, journal_entry):
+        """
+        A matching If-None-Match returns 304 after only the validator lookup.
+        """
+        etag = authenticated_client.get('/api/journal-entries/')['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get('/api/journal-entries/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert len(queries) == 1
+
+    def test_write_changes_etag(self, authenticated_client, user, journal_entry):
+        """
+        Creating, editing or deleting entries invalidates the list ETag.
+        """
+        first = authenticated_client.get('/api/journal-entries/')['ETag']
+
+        journal_entry.title = 'Edited'
+        journal_entry.save()
+        second = authenticated_client.get('/api/journal-entries/')['ETag']
+
+        journal_entry.delete()
+        third = authenticated_client.get('/api/journal-entries/')['ETag']
+
+        assert len({first, second, third}) == 3
+
+    def test_ai_interaction_changes_detail_etag(self, authenticated_client, journal_entry):
+        """
+        The detail ETag changes when the AI response is attached.
+        """
+        url = f'/api/journal-entries/{journal_entry.id}/'
+        etag = authenticated_client.get(url)['ETag']
+
+        AIInteraction.objects.create(journal_entry=journal_entry, claude_response='Hi')
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.data['ai_interaction']['claude_response'] == 'Hi'
+
+    def test_context_entries_not_modified(self, authenticated_client, multiple_journal_entries):
+        """
+        context_entries supports If-None-Match too.
+        """
+        url = f'/api/journal-entries/{multiple_journal_entries[0].id}/context_entries/'
+        etag = authenticated_client.get(url)['ETag']
+
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+
+    def test_mood_trend_etag_changes_with_the_date(self, authenticated_client, journal_entry):
+        """
+        The trend window moves at midnight, so yesterday's ETag no longer matches.
+        """
+        etag = authenticated_client.get('/api/journal-entries/mood_trend/')['ETag']
+
+        with patch('api.views.timezone.now', return_value=timezone.now() + timedelta(days=1)):
+            response = authenticated_client.get('/api/journal-entries/mood_trend/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_mood_trend_body_and_etag_agree_within_the_day(self, authenticated_client, user):
+        """
+        The window starts at a day boundary, so an entry near its start stays
+        in the body for the whole day and a 304 later that day is still right.
+        """
+        start_of_today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        entry = JournalEntry.objects.create(user=user, content='A calm and grateful day')
+        JournalEntry.objects.filter(pk=entry.pk).update(created_at=start_of_today - timedelta(days=7, hours=-1))
+        url = '/api/journal-entries/mood_trend/?days=7'
+
+        with patch('api.views.timezone.now', return_value=start_of_today + timedelta(minutes=30)):
+            early = authenticated_client.get(url)
+        with patch('api.views.timezone.now', return_value=start_of_today + timedelta(hours=23, minutes=30)):
+            late = authenticated_client.get(url)
+            revalidated = authenticated_client.get(url, HTTP_IF_NONE_MATCH=early['ETag'])
+
+        assert [point['id'] for point in early.data['points']] == [entry.id]
+        assert late.data == early.data
+        assert late['ETag'] == early['ETag']
+        assert revalidated.status_code == 304
+
+    def test_other_users_entry_still_404(self, authenticated_client, django_user_model):
+        """
+        Validators never bypass the ownership check on a fresh request.
+        """
+        other = django_user_model.objects.create_user(username='o', email='o@example.com', password='x')
+        entry = JournalEntry.objects.create(user=other, content='private')
+
+        response = authenticated_client.get(f'/api/journal-entries/{entry.id}/')
+
+        assert response.status_code == 404
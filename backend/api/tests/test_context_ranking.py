@@ -0,0 +1,109 @@
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from api import embeddings
+from api.models import JournalEntry
+
+
+@pytest.fixture
+def mixed_history(user, backdated_entry):
+    """
+    Eight recent entries about work and one older entry about the user's dog.
+    """
+    work = [
+        backdated_entry(user, f'Deadline at work again, meeting ran late number {i}.', days_ago=i + 1)
+        for i in range(8)
+    ]
+    dog = backdated_entry(user, 'Walked my dog Biscuit by the river; the dog always calms me down.', days_ago=12)
+    return work, dog
+
+
+class TestEmbeddings:
+    """
+    Tests for the hashed term vectors.
+    """
+
+    def test_embedding_is_unit_length_and_deterministic(self):
+        vector = embeddings.embed('Anxious about the exam, anxious about everything')
+
+        assert vector.dtype == np.float32
+        assert vector.shape == (embeddings.DIMENSIONS,)
+        assert np.isclose(np.linalg.norm(vector), 1.0)
+        assert np.array_equal(vector, embeddings.from_bytes(embeddings.to_bytes(vector)))
+        assert np.array_equal(vector, embeddings.embed('anxious about EVERYTHING, anxious about the exam'))
+
+    def test_empty_text_embeds_to_zeros(self):
+        assert not embeddings.embed('').any()
+
+    def test_rank_blends_similarity_and_recency(self):
+        query = embeddings.embed('sleep insomnia tired')
+        candidates = [embeddings.embed(text) for text in ('work meeting', 'insomnia again', 'work deadline')]
+
+        assert embeddings.rank(query, candidates, [1, 30, 2], 1, 1.0, 14) == [1]
+        assert embeddings.rank(query, candidates, [1, 30, 2], 1, 0.0, 14) == [0]
+
+
+@pytest.mark.django_db
+class TestContextRanking:
+    """
+    Tests for relevance-ranked context entries.
+    """
+
+    def test_embedding_stored_on_save(self, journal_entry):
+        journal_entry.refresh_from_db()
+
+        stored = embeddings.from_bytes(journal_entry.embedding)
+        assert np.array_equal(stored, embeddings.embed(journal_entry.content))
+
+    def test_relevant_older_entry_is_included(self, user, mixed_history):
+        work, dog = mixed_history
+        new_entry = JournalEntry.objects.create(
+            user=user, content='Took the dog to the river with Biscuit', requested_help_type='chronic_validation'
+        )
+
+        context = list(new_entry.get_context_entries())
+
+        assert len(context) == 7
+        assert dog in context
+        assert [e.created_at for e in context] == sorted((e.created_at for e in context), reverse=True)
+
+    def test_recency_only_when_disabled(self, settings, user, mixed_history):
+        settings.CONTEXT_RANKING = False
+        work, dog = mixed_history
+        new_entry = JournalEntry.objects.create(
+            user=user, content='Took the dog to the river with Biscuit', requested_help_type='chronic_validation'
+        )
+
+        assert list(new_entry.get_context_entries()) == work[:7]
+
+    def test_missing_embeddings_are_computed_on_the_fly(self, user, mixed_history):
+        work, dog = mixed_history
+        JournalEntry.objects.update(embedding=None)
+        new_entry = JournalEntry.objects.create(
+            user=user, content='Took the dog to the river with Biscuit', requested_help_type='chronic_validation'
+        )
+
+        assert dog in new_entry.get_context_entries()
+
+    def test_backfill_command(self, user, mixed_history):
+        JournalEntry.objects.update(embedding=None)
+
+        call_command('backfill_embeddings', '--batch-size', '4', stdout=StringIO())
+
+        assert not JournalEntry.objects.filter(embedding__isnull=True).exists()
+
+    @pytest.mark.parametrize('ranking, described', [
+        (True, "chosen for relevance to today's entry as well as recency"),
+        (False, 'the most recent ones'),
+    ])
+    def test_system_prompt_describes_selection(self, settings, ranking, described):
+        from api.llm_service import LLMService
+        settings.CONTEXT_RANKING = ranking
+
+        for help_type in ('chronic_validation', 'max_assessment'):
+            prompt = LLMService()._build_system_prompt(help_type)
+            assert 'previous journal entries for' in prompt
+            assert described in prompt
@@ -0,0 +1,165 @@
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from api.models import User
+from mindfulcompanion.db.postgresql_pool import base as pool_base
+
+
+@pytest.mark.django_db
+class TestDbPoolMetrics:
+    """
+    Tests for the staff-only connection pool metrics endpoint.
+    """
+
+    def test_requires_staff(self, authenticated_client):
+        """
+        Regular users cannot read pool metrics.
+        """
+        response = authenticated_client.get('/api/metrics/db-pool/')
+
+        assert response.status_code == 403
+
+    def test_staff_gets_pool_stats(self, api_client):
+        """
+        Staff users get a 'pools' mapping (empty when pooling is off).
+        """
+        staff = User.objects.create_user(
+            username='staff',
+            email='staff@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+        api_client.force_login(staff)
+
+        response = api_client.get('/api/metrics/db-pool/')
+
+        assert response.status_code == 200
+        assert response.json() == {'pools': {}}
+
+
+class FakePool:
+    """
+    Stands in for psycopg_pool.ConnectionPool: hands out mocks, records returns.
+    """
+
+    def __init__(self, kwargs=None, name=None, open=True, **options):
+        self.kwargs = kwargs
+        self.options = options
+        self.returned = []
+        self.closed = False
+        self.check_error = None
+
+    def getconn(self):
+        return MagicMock()
+
+    def putconn(self, conn):
+        self.returned.append(conn)
+
+    def check(self):
+        if self.check_error:
+            raise self.check_error
+
+    def close(self):
+        self.closed = True
+
+    def get_stats(self):
+        return {'pool_size': 1}
+
+
+@pytest.fixture
+def pools():
+    """
+    The pooled backend with FakePool, and no pools left over between tests.
+    """
+    with patch.object(pool_base, 'ConnectionPool', FakePool):
+        yield pool_base._pools
+        for pooled in pool_base._pools.values():
+            pooled._stop.set()
+        pool_base._pools.clear()
+
+
+def make_wrapper(alias='pooled'):
+    return pool_base.DatabaseWrapper({
+        'ENGINE': 'mindfulcompanion.db.postgresql_pool', 'NAME': 'app', 'USER': 'app', 'PASSWORD': '',
+        'HOST': 'localhost', 'PORT': '', 'OPTIONS': {'pool': {'max_size': 2, 'check_interval': 3600}},
+        'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+        'TIME_ZONE': None, 'TEST': {},
+    }, alias)
+
+
+class TestPooledBackend:
+    """
+    Tests for pool keying, borrowing/returning and fork safety, with a fake pool.
+    """
+
+    def test_connection_returned_on_close(self, pools):
+        wrapper = make_wrapper()
+
+        wrapper.connection = wrapper.get_new_connection(wrapper.get_connection_params())
+        pool = wrapper._pool
+        conn = wrapper.connection
+        wrapper._close()
+
+        assert pool.returned == [conn]
+        assert pool.options['max_size'] == 2
+        assert 'pool' not in pool.kwargs
+        assert wrapper._pool is None
+
+    def test_one_pool_per_alias_and_database(self, pools):
+        first = make_wrapper()
+        first.get_new_connection(first.get_connection_params())
+        second = make_wrapper()
+        second.get_new_connection(second.get_connection_params())
+        other = make_wrapper('replica')
+        other.get_new_connection(other.get_connection_params())
+
+        assert first._pool is second._pool
+        assert other._pool is not first._pool
+        assert set(pool_base.get_pool_stats()) == {'pooled', 'replica'}
+
+    def test_new_pool_after_fork(self, pools):
+        wrapper = make_wrapper()
+        params = wrapper.get_connection_params()
+        wrapper.get_new_connection(params)
+        parent_pool = wrapper._pool
+
+        with patch.object(pool_base.os, 'getpid', return_value=os.getpid() + 1):
+            wrapper.get_new_connection(params)
+            # The child doesn't report the parent's pool
+            assert list(pool_base.get_pool_stats()) == ['pooled']
+
+        assert wrapper._pool is not parent_pool
+        assert len(pools) == 2
+
+    def test_close_pools_drops_inherited_pools(self, pools):
+        wrapper = make_wrapper()
+        wrapper.get_new_connection(wrapper.get_connection_params())
+        inherited = wrapper._pool
+
+        with patch.object(pool_base.os, 'getpid', return_value=os.getpid() + 1):
+            wrapper.get_new_connection(wrapper.get_connection_params())
+            own = wrapper._pool
+            pool_base.close_pools()
+
+        assert own.closed
+        # Its sockets belong to the parent: forgotten, not closed
+        assert not inherited.closed
+        assert pools == {}
+
+    def test_health_check_errors_are_counted(self, pools):
+        pooled = pool_base._PooledConnections('pooled', {'dbname': 'app'}, {'check_interval': 0.01})
+        pooled.pool.check_error = OSError('server closed the connection')
+        try:
+            deadline = time.monotonic() + 5
+            while pooled.health_check_errors < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            pooled.close()
+
+        stats = pooled.get_stats()
+        assert stats['health_check_errors'] >= 2
+        assert stats['health_checks'] >= stats['health_check_errors']
+        assert stats['last_health_check_ms'] is not None
+        assert pooled.pool.closed
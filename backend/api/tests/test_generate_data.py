@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+
+from api import history
+from api.models import AIInteraction, JournalEntry, User, UserPreferences
+
+
+def generate(**options):
+    call_command('generate_data', stdout=StringIO(), **options)
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+    """
+    Tests for the generate_data management command.
+    """
+
+    def test_generates_requested_scale(self):
+        generate(users=3, entries_per_user=5, ai_ratio=1.0, batch_size=4)
+
+        users = User.objects.filter(username__startswith='synthetic-')
+        assert users.count() == 3
+        assert UserPreferences.objects.filter(user__in=users).count() == 3
+        assert JournalEntry.objects.filter(user__in=users).count() == 15
+        with_help = JournalEntry.objects.filter(user__in=users, requested_help_type__isnull=False)
+        assert AIInteraction.objects.filter(journal_entry__in=with_help).count() == with_help.count()
+
+    def test_entries_are_one_per_day(self):
+        generate(users=1, entries_per_user=10)
+
+        dates = JournalEntry.objects.values_list('created_at__date', flat=True)
+        assert len(set(dates)) == 10
+
+    def test_context_counts_match_available_history(self):
+        generate(users=2, entries_per_user=4, ai_ratio=1.0)
+
+        assert not AIInteraction.objects.filter(context_entries_count__gt=3).exists()
+
+    def test_orm_writes_continue_after_generated_ids(self, user):
+        generate(users=2, entries_per_user=3)
+
+        entry = JournalEntry.objects.create(user=user, content='After generation')
+        assert entry.pk > JournalEntry.objects.exclude(pk=entry.pk).order_by('-pk')[0].pk
+
+    def test_clear_removes_previous_run(self, user):
+        generate(users=2, entries_per_user=3)
+        generate(users=0, clear=True)
+
+        assert list(User.objects.all()) == [user]
+        assert not JournalEntry.objects.exists()
+
+    def test_drops_cached_history_of_reused_ids(self, user, settings):
+        settings.JOURNAL_CACHE = True
+        journal_cache = caches[settings.JOURNAL_CACHE_ALIAS]
+        # Left over from a user deleted by an earlier --clear
+        journal_cache.set(history._key(user.pk + 1), ['stale'])
+
+        generate(users=2, entries_per_user=3)
+
+        assert journal_cache.get(history._key(user.pk + 1)) is None
@@ -0,0 +1,79 @@
+import os
+import runpy
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+CONF = Path(__file__).resolve().parents[2] / 'gunicorn.conf.py'
+
+
+def load_conf(monkeypatch, **env):
+    for name in ('WEB_CONCURRENCY', 'GUNICORN_THREADS', 'GUNICORN_PRELOAD', 'DATABASE_URL'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(CONF))
+
+
+class TestGunicornConf:
+    """
+    Tests for worker/thread sizing and the preload hooks.
+    """
+
+    def test_sizing_follows_cpu_and_memory(self, monkeypatch):
+        conf = load_conf(monkeypatch)
+
+        assert conf['worker_count'](1, None) == 2
+        assert conf['worker_count'](2, 2048) == 4
+        # 512 MB fits two workers next to the shared pages, 256 MB only one
+        assert conf['worker_count'](4, 512) == 2
+        assert conf['worker_count'](4, 256) == 1
+        assert conf['thread_count'](1, 2) == 4
+        assert conf['thread_count'](0.5, 1) == 4
+
+    def test_sqlite_gets_one_worker(self, monkeypatch):
+        conf = load_conf(monkeypatch, DATABASE_URL='sqlite:////data/db.sqlite3')
+
+        assert conf['workers'] == 1
+        assert conf['threads'] >= 8
+        assert conf['preload_app'] is True
+
+    def test_env_overrides(self, monkeypatch):
+        conf = load_conf(monkeypatch, WEB_CONCURRENCY='3', GUNICORN_THREADS='6', GUNICORN_PRELOAD='False')
+
+        assert (conf['workers'], conf['threads'], conf['preload_app']) == (3, 6, False)
+        # Load shedding sizes its in-flight steps from this
+        assert conf['raw_env'] == ['GUNICORN_WORKER_THREADS=6']
+
+    @pytest.mark.parametrize('files, expected', [
+        ({'/sys/fs/cgroup/cpu.max': '150000 100000'}, 1.5),
+        ({'/sys/fs/cgroup/cpu.max': 'max 100000', '/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '-1'}, None),
+        ({'/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '200000', '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000'}, 2.0),
+    ])
+    def test_cpu_limit_from_cgroups(self, monkeypatch, files, expected):
+        conf = load_conf(monkeypatch)
+
+        with patch.dict(conf['cpu_limit'].__globals__, _read=files.get):
+            cpus = conf['cpu_limit']()
+
+        assert cpus == (expected if expected is not None else len(os.sched_getaffinity(0)))
+
+    def test_memory_limit_ignores_unlimited(self, monkeypatch):
+        conf = load_conf(monkeypatch)
+        read = conf['memory_limit_mb'].__globals__
+
+        with patch.dict(read, _read={'/sys/fs/cgroup/memory.max': '536870912'}.get):
+            assert conf['memory_limit_mb']() == 512
+        with patch.dict(read, _read={'/sys/fs/cgroup/memory.max': 'max',
+                                     '/sys/fs/cgroup/memory/memory.limit_in_bytes': str(2 ** 63 - 4096)}.get):
+            assert conf['memory_limit_mb']() is None
+
+    def test_post_fork_resets_llm_clients(self, monkeypatch):
+        conf = load_conf(monkeypatch)
+        server = type('Server', (), {'cfg': type('Cfg', (), {'preload_app': True})()})()
+
+        with patch('api.llm_service.reset_after_fork') as mock_reset:
+            conf['post_fork'](server, None)
+
+        assert mock_reset.called
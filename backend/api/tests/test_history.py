@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from api import history
+from api.llm_service import llm_service
+from api.models import JournalEntry
+
+
+@pytest.fixture(autouse=True)
+def history_cache(settings):
+    settings.JOURNAL_CACHE = True
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def new_entry(user, help_type='max_validation', content='Another heavy day at work'):
+    return JournalEntry.objects.create(user=user, content=content, requested_help_type=help_type)
+
+
+def uncached_block(entry):
+    return llm_service._build_context_block([
+        {'created_at': e.created_at, 'title': e.title, 'content': e.content} for e in entry.get_context_entries()
+    ])
+
+
+@pytest.mark.django_db
+class TestHistoryCache:
+    """
+    Tests for the memoized, write-maintained context history.
+    """
+
+    @pytest.mark.parametrize('ranking', [True, False])
+    def test_same_block_as_uncached(self, user, multiple_journal_entries, settings, ranking):
+        settings.CONTEXT_RANKING = ranking
+        entry = new_entry(user, help_type='chronic_validation')
+
+        cached = llm_service._build_context_block(history.get_context_entries(entry))
+
+        assert cached == uncached_block(entry)
+        assert cached.count('---\n') == 7
+
+    def test_second_build_skips_the_database(self, user, multiple_journal_entries, settings, django_assert_num_queries):
+        settings.CONTEXT_RANKING = False
+        entry = new_entry(user)
+        history.get_context_entries(entry)
+
+        with django_assert_num_queries(0):
+            context = history.get_context_entries(entry)
+
+        assert len(context) == 10
+
+    def test_create_prepends_the_new_entry(self, user, multiple_journal_entries, settings,
+                                           django_capture_on_commit_callbacks, django_assert_num_queries):
+        settings.CONTEXT_RANKING = False
+        history.get_context_entries(JournalEntry(user=user, requested_help_type='chronic_validation',
+                                                 created_at=timezone.now()))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            today = new_entry(user, content='Finally slept well')
+        tomorrow = JournalEntry(user=user, requested_help_type='chronic_validation',
+                                created_at=today.created_at + timedelta(days=1))
+
+        with django_assert_num_queries(0):
+            context = history.get_context_entries(tomorrow)
+
+        assert [item['id'] for item in context] == [today.pk] + [e.pk for e in multiple_journal_entries[:6]]
+
+    def test_edit_and_delete_drop_the_list(self, user, multiple_journal_entries):
+        history.get_context_entries(new_entry(user))
+        assert cache.get(history._key(user.pk)) is not None
+
+        entry = multiple_journal_entries[3]
+        entry.content = 'Rewritten'
+        entry.save()
+        assert cache.get(history._key(user.pk)) is None
+
+        history.get_context_entries(JournalEntry.objects.latest('created_at'))
+        entry.delete()
+        assert cache.get(history._key(user.pk)) is None
+
+    def test_untouched_fields_keep_the_list(self, user, multiple_journal_entries):
+        history.get_context_entries(new_entry(user))
+
+        multiple_journal_entries[3].save(update_fields=['requested_help_type'])
+
+        assert cache.get(history._key(user.pk)) is not None
+
+    def test_create_view_passes_rendered_entries(self, authenticated_client, multiple_journal_entries):
+        with patch('api.views.llm_service.generate_journal_response') as mock_llm:
+            mock_llm.return_value = {'response': 'Thanks', 'tokens_used': 10, 'estimated_cost': 0.0, 'model': 'm'}
+            authenticated_client.post(
+                '/api/journal-entries/', {'content': 'Tired again', 'requested_help_type': 'chronic_validation'},
+                format='json'
+            )
+
+        context_entries = mock_llm.call_args.kwargs['context_entries']
+        assert len(context_entries) == 7
+        assert all(item['rendered'].endswith('---\n') for item in context_entries)
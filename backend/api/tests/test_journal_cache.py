@@ -0,0 +1,135 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import cache as user_cache
+from api.cache import UserCache
+from api.models import AIInteraction, JournalEntry, User, UserPreferences
+
+
+@pytest.fixture
+def journal_cache(settings):
+    """
+    Turns on the per-user journal cache (local memory stands in for Redis).
+    """
+    settings.JOURNAL_CACHE = True
+    caches[settings.JOURNAL_CACHE_ALIAS].clear()
+    user_cache.reset_stats()
+
+
+@pytest.fixture
+def session_client(api_client, user):
+    """
+    Logged in through a real session, which plain Django views (bootstrap,
+    metrics) need; DRF's force_authenticate only reaches DRF views.
+    """
+    api_client.force_login(user)
+    return api_client
+
+
+@pytest.mark.django_db
+class TestJournalCache:
+    """
+    Tests for per-user cached journal reads and their invalidation.
+    """
+
+    def test_list_served_from_cache(self, journal_cache, authenticated_client, multiple_journal_entries):
+        first = authenticated_client.get('/api/journal-entries/')
+
+        with CaptureQueriesContext(connection) as queries:
+            second = authenticated_client.get('/api/journal-entries/')
+
+        assert second.json() == first.json()
+        # Only the journal_updated_at stamp for the ETag
+        assert len(queries) == 1
+        assert user_cache.get_stats()['list'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    def test_new_entry_invalidates(self, journal_cache, authenticated_client, user, multiple_journal_entries):
+        authenticated_client.get('/api/journal-entries/')
+
+        JournalEntry.objects.create(user=user, content='Fresh entry')
+
+        response = authenticated_client.get('/api/journal-entries/')
+        assert len(response.json()) == 11
+
+    def test_ai_interaction_invalidates_retrieve(self, journal_cache, authenticated_client, journal_entry):
+        authenticated_client.get(f'/api/journal-entries/{journal_entry.pk}/')
+
+        AIInteraction.objects.create(journal_entry=JournalEntry.objects.get(pk=journal_entry.pk), claude_response='Hi')
+
+        response = authenticated_client.get(f'/api/journal-entries/{journal_entry.pk}/')
+        assert response.json()['ai_interaction']['claude_response'] == 'Hi'
+
+    def test_mood_trend_cached_per_day(self, journal_cache, authenticated_client, user, journal_entry):
+        tomorrow = timezone.now() + timedelta(days=1)
+
+        authenticated_client.get('/api/journal-entries/mood_trend/?days=7')
+        with patch('api.views.timezone.now', return_value=tomorrow):
+            authenticated_client.get('/api/journal-entries/mood_trend/?days=7')
+
+        assert user_cache.get_stats()['trend'] == {'hits': 0, 'misses': 2, 'hit_rate': 0.0}
+        assert UserCache(user.pk).get(f'trend:7:{tomorrow.date()}') is not None
+
+    def test_preferences_invalidate_bootstrap(self, journal_cache, session_client, user):
+        assert session_client.get('/api/bootstrap/').json()['preferences'] is None
+
+        UserPreferences.objects.create(user=user, preferred_name='Sam')
+
+        assert session_client.get('/api/bootstrap/').json()['preferences']['preferred_name'] == 'Sam'
+
+    def test_bootstrap_cached(self, journal_cache, session_client, journal_entry):
+        first = session_client.get('/api/bootstrap/').json()
+
+        with CaptureQueriesContext(connection) as queries:
+            second = session_client.get('/api/bootstrap/').json()
+
+        assert second == {**first, 'csrfToken': second['csrfToken']}
+        assert second['today_entry_exists'] is True
+        # Session and user lookups only
+        assert len(queries) == 2
+
+    def test_namespaces_are_per_user(self, journal_cache, api_client, user, journal_entry):
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        api_client.force_authenticate(user=user)
+        api_client.get('/api/journal-entries/')
+
+        api_client.force_authenticate(user=other)
+        assert api_client.get('/api/journal-entries/').json() == []
+
+    def test_not_found_is_not_cached(self, journal_cache, authenticated_client):
+        authenticated_client.get('/api/journal-entries/999/')
+
+        assert 'entry' not in user_cache.get_stats() or user_cache.get_stats()['entry']['hits'] == 0
+        assert authenticated_client.get('/api/journal-entries/999/').status_code == 404
+
+    def test_disabled_by_default(self, authenticated_client, journal_entry):
+        user_cache.reset_stats()
+        authenticated_client.get('/api/journal-entries/')
+
+        assert user_cache.get_stats() == {}
+
+
+@pytest.mark.django_db
+class TestCacheMetrics:
+    """
+    Tests for the staff cache metrics endpoint.
+    """
+
+    def test_requires_staff(self, session_client):
+        response = session_client.get('/api/metrics/cache/')
+
+        assert response.status_code == 403
+
+    def test_reports_stats(self, journal_cache, session_client, user):
+        User.objects.filter(pk=user.pk).update(is_staff=True)
+        session_client.get('/api/journal-entries/')
+
+        data = session_client.get('/api/metrics/cache/').json()
+
+        assert data['enabled'] is True
+        assert data['stats']['list']['misses'] == 1
@@ -0,0 +1,158 @@
+import io
+import json
+import logging
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from mindfulcompanion import log
+
+
+def make_record(name='api.views', level=logging.INFO, msg='hello %s', args=('there',), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestFormattingAndFilters:
+    """
+    Tests for the JSON formatter and the request id / sampling filters.
+    """
+
+    def test_json_line_has_request_id_and_extras(self):
+        token = log.bind_request_id('req-1')
+        try:
+            record = make_record(model='haiku', tokens=120)
+            log.RequestIdFilter().filter(record)
+        finally:
+            log.unbind_request_id(token)
+
+        line = json.loads(log.JsonFormatter().format(record))
+
+        assert line['request_id'] == 'req-1'
+        assert line['message'] == 'hello there'
+        assert line['logger'] == 'api.views'
+        assert (line['model'], line['tokens']) == ('haiku', 120)
+
+    def test_sampling_applies_to_logger_and_children(self):
+        sampling = log.SamplingFilter({'mindfulcompanion.middleware': 0.0})
+
+        assert not sampling.filter(make_record(name='mindfulcompanion.middleware'))
+        assert not sampling.filter(make_record(name='mindfulcompanion.middleware.child'))
+        assert sampling.filter(make_record(name='mindfulcompanion.middleware', level=logging.WARNING))
+        assert sampling.filter(make_record(name='api.views'))
+
+
+class TestAsyncHandler:
+    """
+    Tests for the queue handler and its listener thread.
+    """
+
+    def test_message_resolved_before_the_listener_writes(self):
+        stream = io.StringIO()
+        handler = log.AsyncHandler(stream=stream)
+        handler.setFormatter(log.JsonFormatter())
+        handler.listener.stop()
+        state = ['before']
+
+        handler.handle(make_record(args=(state,)))
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            handler.handle(make_record(level=logging.ERROR, msg='failed', args=(), exc_info=sys.exc_info()))
+        # Changes after the call don't reach the line
+        state[0] = 'after'
+
+        queued = [handler.queue.get_nowait(), handler.queue.get_nowait()]
+        assert all(record.args is None and record.exc_info is None for record in queued)
+
+        handler.listener.start()
+        for record in queued:
+            handler.queue.put_nowait(record)
+        handler.close()
+
+        first, second = (json.loads(line) for line in stream.getvalue().splitlines())
+        assert first['message'] == "hello ['before']"
+        assert second['exc'].startswith('Traceback') and 'ValueError: boom' in second['exc']
+
+    def test_plain_formatter_keeps_traceback(self):
+        handler = log.AsyncHandler(stream=io.StringIO())
+        handler.listener.stop()
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = handler.prepare(make_record(exc_info=sys.exc_info()))
+        handler.target.close()
+
+        assert log.PlainFormatter().format(record).endswith('ValueError: boom')
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = log.AsyncHandler(stream=io.StringIO(), maxsize=1)
+        handler.listener.stop()
+
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        assert handler.dropped == 1
+        assert {'queued': 1, 'maxsize': 1, 'dropped': 1} in log.get_stats()
+        handler.target.close()
+
+
+@pytest.mark.django_db
+class TestRequestId:
+    """
+    Tests for request id binding and correlation into LLMService.
+    """
+
+    def test_generated_and_echoed(self, api_client):
+        response = api_client.get('/api/csrf/')
+
+        assert len(response['X-Request-ID']) == 32
+
+    def test_incoming_id_is_kept_if_sane(self, api_client):
+        assert api_client.get('/api/csrf/', HTTP_X_REQUEST_ID='lb-1234')['X-Request-ID'] == 'lb-1234'
+        assert api_client.get('/api/csrf/', HTTP_X_REQUEST_ID='bad id\n')['X-Request-ID'] != 'bad id\n'
+
+    def test_llm_service_sees_the_request_id(self, api_client, fake_response):
+        seen = []
+
+        def completion(**kwargs):
+            seen.append(log.get_request_id())
+            return fake_response(text='Hi', prompt_tokens=100, completion_tokens=20)
+
+        with patch('api.llm_service._completion', side_effect=completion):
+            response = api_client.post(
+                '/api/journal-entries/', {'content': 'Rough day', 'requested_help_type': 'acute_validation'},
+                format='json', HTTP_X_REQUEST_ID='trace-42'
+            )
+
+        assert response.status_code == 200
+        assert seen == ['trace-42']
+        assert log.get_request_id() == '-'
+
+
+@pytest.mark.django_db
+class TestLogMetrics:
+    """
+    Tests for the staff logging metrics endpoint.
+    """
+
+    def test_requires_staff(self, api_client, user):
+        api_client.force_login(user)
+
+        assert api_client.get('/api/metrics/logging/').status_code == 403
+
+    def test_reports_dropped_records(self, api_client, user):
+        user.is_staff = True
+        user.save()
+        api_client.force_login(user)
+        handler = log.AsyncHandler(stream=io.StringIO(), maxsize=1)
+        handler.listener.stop()
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        handlers = api_client.get('/api/metrics/logging/').json()['handlers']
+        handler.target.close()
+
+        assert {'queued': 1, 'maxsize': 1, 'dropped': 1} in handlers
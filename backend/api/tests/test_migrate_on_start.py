@@ -0,0 +1,59 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+from api.management.commands import migrate_on_start
+
+
+def run(**options):
+    out = StringIO()
+    with patch('api.management.commands.migrate_on_start.call_command') as mock_migrate:
+        call_command('migrate_on_start', stdout=out, **options)
+    return out.getvalue(), mock_migrate
+
+
+@pytest.mark.django_db
+class TestMigrateOnStart:
+    """
+    Tests for the container-start migration fast path.
+    """
+
+    def test_disk_scan_matches_the_loader(self):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+
+        assert migrate_on_start.migrations_on_disk() == set(loader.disk_migrations)
+
+    def test_up_to_date_skips_migrate(self):
+        output, mock_migrate = run()
+
+        assert output.startswith('No migrations to apply')
+        assert not mock_migrate.called
+
+    def test_pending_migration_is_applied(self):
+        MigrationRecorder.Migration.objects.filter(app='api', name='0007_user_purge_requested_at').delete()
+
+        output, mock_migrate = run()
+
+        assert '1 migration(s) pending: api.0007_user_purge_requested_at' in output
+        assert mock_migrate.call_args.args == ('migrate',)
+        assert mock_migrate.call_args.kwargs['interactive'] is False
+
+    @pytest.mark.skipif(connection.vendor != 'postgresql', reason='Advisory locks are Postgres only')
+    def test_no_wait_continues_while_locked(self):
+        MigrationRecorder.Migration.objects.filter(app='api', name='0007_user_purge_requested_at').delete()
+        other = connection.copy()
+        try:
+            with other.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_lock(%s)', [migrate_on_start.LOCK_ID])
+
+            output, mock_migrate = run(wait=False)
+
+            assert 'Another instance is applying migrations' in output
+            assert not mock_migrate.called
+        finally:
+            other.close()
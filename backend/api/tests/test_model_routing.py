@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+import pytest
+
+from api.llm_service import LLMService, get_model_pricing
+from api.models import AIInteraction
+
+
+@pytest.fixture
+def routes(settings):
+    settings.AI_MODEL_ROUTES = {
+        'acute_skills': {'model': 'anthropic/claude-3-haiku-20240307', 'max_tokens': 512, 'fallback': None},
+        'max_assessment': {
+            'model': 'anthropic/claude-3-opus-20240229', 'max_tokens': 4096,
+            'fallback': 'anthropic/claude-3-sonnet-20240229',
+        },
+    }
+    return settings.AI_MODEL_ROUTES
+
+
+class TestModelRouting:
+    """
+    Tests for per-help-type model routing and fallback.
+    """
+
+    def test_routed_model_and_max_tokens(self, routes, fake_response):
+        with patch('api.llm_service._completion', return_value=fake_response()) as completion:
+            result = LLMService().generate_journal_response('Panicking', 'acute_skills')
+
+        assert completion.call_args.kwargs['model'] == 'anthropic/claude-3-haiku-20240307'
+        assert completion.call_args.kwargs['max_tokens'] == 512
+        assert result['model'] == 'anthropic/claude-3-haiku-20240307'
+
+    def test_unlisted_help_type_uses_ai_model(self, routes, settings):
+        route = LLMService()._get_route('chronic_validation')
+
+        assert route == {'model': settings.AI_MODEL, 'max_tokens': 2048, 'fallback': settings.AI_FALLBACK_MODEL}
+
+    def test_fallback_after_failure(self, routes, fake_response):
+        with patch('api.llm_service._completion', side_effect=[Exception('overloaded'), fake_response()]) as completion:
+            result = LLMService().generate_journal_response('Reflecting', 'max_assessment')
+
+        assert [call.kwargs['model'] for call in completion.call_args_list] == [
+            'anthropic/claude-3-opus-20240229', 'anthropic/claude-3-sonnet-20240229'
+        ]
+        assert result['model'] == 'anthropic/claude-3-sonnet-20240229'
+        # Priced at the fallback's rates: 1000 * $3 + 200 * $15 per million
+        assert result['estimated_cost'] == 0.006
+
+    def test_error_when_fallback_fails_too(self, routes):
+        with patch('api.llm_service._completion', side_effect=Exception('down')):
+            with pytest.raises(Exception, match='Failed to generate AI response: down'):
+                LLMService().generate_journal_response('Reflecting', 'max_assessment')
+
+
+class TestPricing:
+    """
+    Tests for the per-model pricing table.
+    """
+
+    def test_cost_uses_model_rates(self):
+        service = LLMService()
+
+        assert service._calculate_cost(1_000_000, 1_000_000, 'anthropic/claude-3-haiku-20240307') == 1.5
+        assert service._calculate_cost(1_000_000, 0, 'anthropic/claude-3-opus-20240229') == 15.0
+
+    def test_lookup_without_provider_prefix(self):
+        assert get_model_pricing('claude-3-haiku-20240307') == (0.25, 1.25)
+
+    def test_unknown_model_uses_default(self, settings):
+        settings.AI_MODEL_PRICING = {**settings.AI_MODEL_PRICING, 'default': (2.0, 8.0)}
+
+        assert get_model_pricing('someprovider/unknown-model') == (2.0, 8.0)
+
+
+@pytest.mark.django_db
+class TestServedModelRecorded:
+    """
+    The AIInteraction row records which model answered.
+    """
+
+    def test_model_saved_and_serialized(self, authenticated_client):
+        with patch('api.views.llm_service.generate_journal_response') as mock_llm:
+            mock_llm.return_value = {
+                'response': 'Try box breathing.', 'tokens_used': 300, 'estimated_cost': 0.001,
+                'model': 'anthropic/claude-3-haiku-20240307',
+            }
+            response = authenticated_client.post('/api/journal-entries/', {
+                'content': 'Panicking before my exam', 'requested_help_type': 'acute_skills'
+            })
+
+        assert AIInteraction.objects.get().model == 'anthropic/claude-3-haiku-20240307'
+        entry = authenticated_client.get(f"/api/journal-entries/{response.json()['id']}/").json()
+        assert entry['ai_interaction']['model'] == 'anthropic/claude-3-haiku-20240307'
@@ -0,0 +1,220 @@
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api import overload
+from api.models import AIInteraction, JournalEntry
+
+AI_RESULT = {'response': 'Thank you for sharing', 'tokens_used': 900, 'estimated_cost': 0.01, 'model': 'test-model'}
+
+
+@pytest.fixture(autouse=True)
+def controller(settings):
+    settings.OVERLOAD_SHEDDING = True
+    overload.controller.reset()
+    yield overload.controller
+    overload.controller.reset()
+
+
+def at_level(level):
+    return patch.object(overload.controller, 'level', return_value=level)
+
+
+def create(client, help_type='chronic_validation'):
+    with patch('api.views.llm_service.generate_journal_response', return_value=AI_RESULT) as mock_llm:
+        response = client.post(
+            '/api/journal-entries/', {'content': 'Work was heavy again today', 'requested_help_type': help_type},
+            format='json'
+        )
+    return response, mock_llm
+
+
+class TestOverloadController:
+    """
+    Tests for the pressure level and the degradation plan.
+    """
+
+    def test_level_from_latency_and_in_flight(self, controller, settings):
+        settings.OVERLOAD_LATENCY_STEPS = [1.0, 2.0, 3.0]
+        settings.OVERLOAD_INFLIGHT_STEPS = [2, 3, 4]
+
+        assert controller.level() == 0
+
+        for seconds in (2.5, 2.1, 0.5):
+            controller.observe(seconds)
+        assert controller.level() == 2
+
+        with controller.in_flight(), controller.in_flight(), controller.in_flight(), controller.in_flight():
+            assert controller.level() == 3
+        assert controller.snapshot() == (2.1, 0)
+
+    def test_old_latencies_age_out(self, controller, settings):
+        settings.OVERLOAD_LATENCY_STEPS = [1.0, 2.0, 3.0]
+        controller.observe(5.0)
+
+        settings.OVERLOAD_WINDOW = 0
+        with patch('api.overload.time.monotonic', return_value=overload.time.monotonic() + 1):
+            assert controller.level() == 0
+
+    def test_plan_steps(self, controller):
+        with at_level(1):
+            assert controller.plan('chronic_validation') == {
+                'level': 1, 'context_factor': 0.5, 'max_tokens': None, 'deferred': False
+            }
+        with at_level(2):
+            assert controller.plan('max_assessment')['max_tokens'] == 1024
+        with at_level(3):
+            assert controller.plan('chronic_education')['deferred'] is True
+
+    def test_acute_never_degraded(self, controller):
+        with at_level(3):
+            assert controller.plan('acute_validation') is None
+            assert controller.plan('acute_skills') is None
+
+    def test_shedding_off(self, controller, settings):
+        settings.OVERLOAD_SHEDDING = False
+
+        with at_level(3):
+            assert controller.plan('chronic_validation') is None
+
+    def test_llm_calls_are_tracked(self, controller):
+        chunk = SimpleNamespace()
+        seen = []
+
+        def completion(**kwargs):
+            seen.append(controller.snapshot()[1])
+            yield chunk
+
+        with patch('litellm.completion', side_effect=completion), \
+                patch('litellm.stream_chunk_builder', return_value='built'):
+            from api.llm_service import _completion
+            assert _completion(model='m', messages=[]) == 'built'
+
+        assert seen == [1]
+        assert controller.snapshot()[1] == 0
+        assert len(controller._latencies) == 1
+
+    def test_untracked_calls_are_not_in_flight(self, controller):
+        with overload.untracked(), controller.in_flight():
+            assert controller.snapshot()[1] == 0
+
+    def test_prewarm_is_untracked(self, controller, settings):
+        settings.LLM_PROMPT_CACHE = True
+        settings.AI_MODEL_ROUTES = {'chronic_validation': {'model': 'anthropic/claude-3-haiku-20240307'}}
+        seen = []
+
+        def completion(**kwargs):
+            with controller.in_flight():
+                seen.append(controller.snapshot()[1])
+
+        from api.llm_service import LLMService
+        with patch('api.llm_service._completion', side_effect=completion), \
+                patch('api.llm_service.threading.Thread', side_effect=lambda target, **kwargs: SimpleNamespace(start=target)):
+            LLMService().prewarm('chronic_validation', 'History')
+
+        assert seen == [0]
+
+    def test_shedding_off_by_default(self, controller, settings):
+        settings.OVERLOAD_SHEDDING = False
+
+        with at_level(3):
+            assert controller.plan('chronic_validation') is None
+
+
+@pytest.mark.django_db
+class TestDegradedResponses:
+    """
+    Tests for load shedding on journal entry creation.
+    """
+
+    def test_normal_load_is_untouched(self, authenticated_client, multiple_journal_entries):
+        response, mock_llm = create(authenticated_client)
+
+        assert 'degraded' not in response.data
+        assert len(mock_llm.call_args.kwargs['context_entries']) == 7
+        assert mock_llm.call_args.kwargs['max_tokens'] is None
+
+    def test_context_shrinks_first(self, authenticated_client, multiple_journal_entries):
+        with at_level(1):
+            response, mock_llm = create(authenticated_client)
+
+        assert response.status_code == 201
+        assert response.data['degraded']['level'] == 1
+        assert len(mock_llm.call_args.kwargs['context_entries']) == 3
+        assert mock_llm.call_args.kwargs['max_tokens'] is None
+        assert AIInteraction.objects.get().context_entries_count == 3
+
+    def test_then_max_tokens(self, authenticated_client, multiple_journal_entries):
+        with at_level(2):
+            response, mock_llm = create(authenticated_client, help_type='max_assessment')
+
+        assert response.data['degraded']['max_tokens'] == 1024
+        assert len(mock_llm.call_args.kwargs['context_entries']) == 10
+        assert mock_llm.call_args.kwargs['max_tokens'] == 1024
+
+    def test_max_tokens_only_lowers_the_route(self):
+        from api.llm_service import LLMService
+
+        with patch('api.llm_service._completion', return_value='ok') as mock_completion:
+            LLMService()._complete_with_fallback('acute_validation', [], max_tokens=1024)
+            LLMService()._complete_with_fallback('acute_validation', [], max_tokens=100_000)
+
+        limits = [call.kwargs['max_tokens'] for call in mock_completion.call_args_list]
+        assert limits[0] == 1024
+        assert limits[1] < 100_000
+
+    def test_then_deferred(self, authenticated_client, multiple_journal_entries):
+        with at_level(3), patch('api.overload.defer') as mock_defer:
+            response, mock_llm = create(authenticated_client)
+
+        assert response.status_code == 201
+        assert response.data['ai_deferred'] is True
+        assert response.data['degraded']['deferred'] is True
+        assert not mock_llm.called
+        assert not AIInteraction.objects.exists()
+        assert JournalEntry.objects.get(pk=response.data['id']).ai_deferred_at is not None
+
+        # Once pressure drops the deferred task generates and saves the response
+        task, label = mock_defer.call_args.args
+        entry = JournalEntry.objects.get(pk=response.data['id'])
+        assert label == f'entry={entry.id}'
+        with patch('api.views.llm_service.generate_journal_response', return_value=AI_RESULT):
+            task()
+        assert entry.ai_interaction.claude_response == AI_RESULT['response']
+
+    def test_acute_stays_full(self, authenticated_client):
+        with at_level(3):
+            response, mock_llm = create(authenticated_client, help_type='acute_validation')
+
+        assert response.data['ai_response'] == AI_RESULT['response']
+        assert 'degraded' not in response.data
+        assert mock_llm.call_args.kwargs['max_tokens'] is None
+
+
+@pytest.mark.django_db
+class TestGenerateDeferred:
+    """
+    Tests for answering deferred entries a restart dropped.
+    """
+
+    def test_generates_pending_entries_only(self, user, multiple_journal_entries):
+        deferred_at = timezone.now() - timedelta(hours=1)
+        pending = JournalEntry.objects.create(user=user, content='Heavy week', requested_help_type='chronic_validation')
+        answered = JournalEntry.objects.create(user=user, content='Lighter', requested_help_type='chronic_validation')
+        recent = JournalEntry.objects.create(user=user, content='Just now', requested_help_type='max_validation')
+        AIInteraction.objects.create(journal_entry=answered, claude_response='Already here')
+        JournalEntry.objects.filter(pk__in=[pending.pk, answered.pk]).update(ai_deferred_at=deferred_at)
+        JournalEntry.objects.filter(pk=recent.pk).update(ai_deferred_at=timezone.now())
+
+        with patch('api.views.llm_service.generate_journal_response', return_value=AI_RESULT) as mock_llm:
+            call_command('generate_deferred', stdout=StringIO())
+
+        assert mock_llm.call_count == 1
+        assert len(mock_llm.call_args.kwargs['context_entries']) == 7
+        assert JournalEntry.objects.get(pk=pending.pk).ai_interaction.claude_response == AI_RESULT['response']
+        assert not AIInteraction.objects.filter(journal_entry=recent).exists()
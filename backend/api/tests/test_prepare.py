@@ -0,0 +1,156 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from api.llm_service import LLMService
+from api.models import AIInteraction, JournalEntry
+AI_RESULT = {'response': 'Thank you for sharing', 'tokens_used': 900, 'estimated_cost': 0.01, 'model': 'test-model'}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def prepare(client, help_type='chronic_validation', content='Work was heavy again'):
+    return client.post(
+        '/api/journal-entries/prepare/', {'requested_help_type': help_type, 'content': content}, format='json'
+    )
+
+
+def create(client, help_type='chronic_validation'):
+    with patch('api.views.llm_service.generate_journal_response', return_value=AI_RESULT) as mock_llm:
+        response = client.post(
+            '/api/journal-entries/', {'content': 'Work was heavy again today', 'requested_help_type': help_type},
+            format='json'
+        )
+    return response, mock_llm
+
+
+@pytest.mark.django_db
+class TestPrepare:
+    """
+    Tests for the pre-submit context endpoint and its use on create.
+    """
+
+    def test_prepare_reports_context(self, authenticated_client, multiple_journal_entries):
+        response = prepare(authenticated_client)
+
+        assert response.status_code == 200
+        assert response.data == {'help_type': 'chronic_validation', 'context_entries_count': 7, 'expires_in': 300}
+
+    def test_acute_help_types_are_rejected(self, authenticated_client):
+        response = prepare(authenticated_client, help_type='acute_validation')
+
+        assert response.status_code == 400
+        assert 'requested_help_type' in response.data
+
+    def test_requires_login(self, api_client):
+        assert prepare(api_client).status_code in (401, 403)
+
+    def test_create_uses_prepared_block(self, authenticated_client, multiple_journal_entries):
+        prepare(authenticated_client)
+        expected = LLMService()._build_context_block(
+            [{'created_at': e.created_at, 'title': e.title, 'content': e.content} for e in multiple_journal_entries[:7]],
+            None,
+        )
+
+        response, mock_llm = create(authenticated_client)
+
+        assert response.status_code == 201
+        kwargs = mock_llm.call_args.kwargs
+        assert kwargs['context_block'].endswith(expected)
+        assert 'context_entries' not in kwargs
+        assert AIInteraction.objects.get(journal_entry_id=response.data['id']).context_entries_count == 7
+
+    def test_prepared_block_is_used_once(self, authenticated_client, multiple_journal_entries):
+        prepare(authenticated_client)
+        create(authenticated_client)
+        JournalEntry.objects.filter(content='Work was heavy again today').delete()
+
+        _, mock_llm = create(authenticated_client)
+
+        assert 'context_block' not in mock_llm.call_args.kwargs
+        assert len(mock_llm.call_args.kwargs['context_entries']) == 7
+
+    def test_journal_change_discards_prepared_block(self, authenticated_client, multiple_journal_entries):
+        prepare(authenticated_client)
+        multiple_journal_entries[0].delete()
+
+        _, mock_llm = create(authenticated_client)
+
+        assert 'context_block' not in mock_llm.call_args.kwargs
+        assert len(mock_llm.call_args.kwargs['context_entries']) == 7
+
+    def test_other_help_type_is_not_reused(self, authenticated_client, multiple_journal_entries):
+        prepare(authenticated_client, help_type='max_validation')
+
+        _, mock_llm = create(authenticated_client)
+
+        assert 'context_block' not in mock_llm.call_args.kwargs
+
+    def test_prewarm_runs_when_enabled(self, authenticated_client, multiple_journal_entries, settings):
+        settings.LLM_PROMPT_CACHE_PREWARM = True
+
+        with patch('api.views.llm_service.prewarm') as prewarm:
+            prepare(authenticated_client)
+
+        help_type, context_block, _ = prewarm.call_args.args
+        assert help_type == 'chronic_validation'
+        assert 'PREVIOUS JOURNAL ENTRIES' in context_block
+
+
+class TestPromptCache:
+    """
+    Tests for splitting the user message around the provider cache breakpoint.
+    """
+
+    def test_user_message_unchanged_by_split(self):
+        service = LLMService()
+        context = [{'created_at': datetime(2026, 1, 5), 'title': 'Monday', 'content': 'Tired'}]
+
+        joined = service._join_user_message(service._build_context_block(context, 'Mostly steady.'), 'Today')
+
+        assert joined == service._build_user_message('Today', context, 'Mostly steady.')
+        assert service._build_user_message('Today') == "=== TODAY'S JOURNAL ENTRY ===\n\nToday"
+
+    def test_context_block_marked_for_anthropic(self, settings, fake_response):
+        settings.LLM_PROMPT_CACHE = True
+        settings.AI_MODEL_ROUTES = {'chronic_validation': {'model': 'anthropic/claude-3-haiku-20240307'}}
+
+        with patch('api.llm_service._completion', return_value=fake_response()) as completion:
+            LLMService().generate_journal_response('Today', 'chronic_validation', context_block='History')
+
+        blocks = completion.call_args.kwargs['messages'][1]['content']
+        assert blocks[0] == {'type': 'text', 'text': 'History', 'cache_control': {'type': 'ephemeral'}}
+        assert blocks[1]['text'].endswith('Today')
+
+    def test_blocks_flattened_for_other_providers(self, settings, fake_response):
+        settings.LLM_PROMPT_CACHE = True
+        settings.AI_MODEL_ROUTES = {'chronic_validation': {'model': 'openai/gpt-4o-mini'}}
+
+        with patch('api.llm_service._completion', return_value=fake_response()) as completion:
+            LLMService().generate_journal_response('Today', 'chronic_validation', context_block='History')
+
+        content = completion.call_args.kwargs['messages'][1]['content']
+        assert content == LLMService()._join_user_message('History', 'Today')
+
+    @pytest.mark.parametrize('model, expected', [
+        ('anthropic/claude-3-haiku-20240307', True),
+        ('claude-3-haiku-20240307', True),
+        ('openrouter/anthropic/claude-3-haiku', False),
+        ('bedrock/anthropic.claude-3-haiku-20240307-v1:0', False),
+        ('openai/gpt-4o-mini', False),
+    ])
+    def test_anthropic_key_only_for_anthropic_api(self, settings, model, expected, fake_response):
+        settings.ANTHROPIC_API_KEY = 'sk-ant-test'
+        settings.AI_MODEL_ROUTES = {'chronic_validation': {'model': model}}
+
+        with patch('api.llm_service._completion', return_value=fake_response()) as completion:
+            LLMService().generate_journal_response('Today', 'chronic_validation')
+
+        assert (completion.call_args.kwargs['api_key'] is not None) == expected
@@ -0,0 +1,80 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from api.models import User
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILING_DIR = tmp_path
+    settings.PROFILING_INTERVAL = 0.001
+    return tmp_path
+
+
+@pytest.fixture
+def staff_client(api_client, db):
+    staff = User.objects.create_user(
+        username='staff', email='staff@example.com', password='testpass123', is_staff=True
+    )
+    api_client.force_login(staff)
+    return api_client
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    """
+    Tests for opt-in request profiling.
+    """
+
+    def test_not_profiled_by_default(self, authenticated_client, profile_dir):
+        authenticated_client.get('/api/journal-entries/')
+
+        assert list(profile_dir.iterdir()) == []
+
+    def test_header_ignored_for_non_staff(self, authenticated_client, profile_dir):
+        authenticated_client.get('/api/journal-entries/', HTTP_X_PROFILE='1')
+
+        assert list(profile_dir.iterdir()) == []
+
+    def test_staff_header_writes_folded_profile(self, staff_client, profile_dir):
+        staff_client.get('/api/journal-entries/', HTTP_X_PROFILE='alloc')
+
+        folded = list(profile_dir.glob('journal-entry-list__none__*.folded'))
+        assert len(folded) == 1
+        assert len(list(profile_dir.glob('*.alloc.json'))) == 1
+        for line in folded[0].read_text().splitlines():
+            stack, count = line.rsplit(' ', 1)
+            assert int(count) > 0
+
+    def test_configured_view_labels_help_type(self, api_client, settings, profile_dir):
+        settings.PROFILING_VIEWS = ['journal-entry-list']
+
+        with patch('api.views.llm_service.generate_journal_response') as mock_llm:
+            mock_llm.return_value = {'response': 'Hi', 'tokens_used': 1, 'estimated_cost': 0.0}
+            api_client.post('/api/journal-entries/', {
+                'content': 'I feel anxious today',
+                'requested_help_type': 'acute_skills'
+            })
+
+        assert len(list(profile_dir.glob('journal-entry-list__acute_skills__*.folded'))) == 1
+
+
+class TestAggregateProfiles:
+    """
+    Tests for the aggregate_profiles management command.
+    """
+
+    def test_merges_and_filters(self, profile_dir):
+        (profile_dir / 'journal-entry-list__none__20260101T000000_1_0.folded').write_text('a;b 2\na;c 1\n')
+        (profile_dir / 'journal-entry-list__none__20260101T000001_1_1.folded').write_text('a;b 3\n')
+        (profile_dir / 'journal-entry-detail__none__20260101T000002_1_2.folded').write_text('x;y 9\n')
+        merged = profile_dir / 'merged.txt'
+        out = StringIO()
+
+        call_command('aggregate_profiles', '--view', 'journal-entry-list', '--out', str(merged), stdout=out)
+
+        assert merged.read_text() == 'a;b 5\na;c 1\n'
+        assert '2 requests, 6 samples' in out.getvalue()
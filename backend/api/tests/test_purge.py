@@ -0,0 +1,111 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.models import AIInteraction, JournalEntry, User, UserPreferences
+from api.purge import purge_user
+
+
+@pytest.fixture
+def long_history(user_with_preferences):
+    """
+    Ten entries, each with an AI interaction.
+    """
+    for i in range(10):
+        entry = JournalEntry.objects.create(user=user_with_preferences, content=f'Entry {i}')
+        AIInteraction.objects.create(journal_entry=entry, claude_response='Thanks', tokens_used=10)
+    return user_with_preferences
+
+
+@pytest.fixture
+def other_user(db):
+    other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+    JournalEntry.objects.create(user=other, content='Not mine to delete')
+    return other
+
+
+@pytest.mark.django_db
+class TestPurgeUser:
+    """
+    Tests for the batched user purge.
+    """
+
+    def test_deletes_user_and_data_in_batches(self, long_history, other_user):
+        reports = []
+
+        counts = purge_user(long_history.pk, batch_size=4, max_rate=0, report=lambda *args: reports.append(args))
+
+        assert counts['aiinteraction'] == 10
+        assert counts['journalentry'] == 10
+        assert counts['user'] == 1
+        assert counts['userpreferences'] == 1
+        assert reports == [
+            ('aiinteraction', 4), ('aiinteraction', 8), ('aiinteraction', 10),
+            ('journalentry', 4), ('journalentry', 8), ('journalentry', 10),
+        ]
+        assert not User.objects.filter(pk=long_history.pk).exists()
+        assert not UserPreferences.objects.filter(user_id=long_history.pk).exists()
+        assert JournalEntry.objects.filter(user=other_user).count() == 1
+
+    def test_interrupted_purge_resumes(self, long_history):
+        def fail_after_first_batch(model_name, deleted):
+            raise RuntimeError('connection lost')
+
+        with pytest.raises(RuntimeError):
+            purge_user(long_history.pk, batch_size=4, max_rate=0, report=fail_after_first_batch)
+        assert AIInteraction.objects.filter(journal_entry__user=long_history).count() == 6
+
+        counts = purge_user(long_history.pk, batch_size=4, max_rate=0)
+
+        assert counts['aiinteraction'] == 6
+        assert counts['journalentry'] == 10
+        assert not User.objects.filter(pk=long_history.pk).exists()
+
+    def test_rate_limit_sleeps_between_batches(self, long_history):
+        with patch('api.purge.time.sleep') as sleep:
+            purge_user(long_history.pk, batch_size=5, max_rate=10)
+
+        # 5 rows at 10 rows/s is about half a second per batch, four batches
+        assert sleep.call_count == 4
+        assert all(0.4 < call.args[0] <= 0.5 for call in sleep.call_args_list)
+
+
+@pytest.mark.django_db
+class TestAccountDeletion:
+    """
+    Tests for DELETE /api/account/ and the purge_users command.
+    """
+
+    def test_delete_account_schedules_purge(self, api_client, long_history):
+        api_client.force_login(long_history)
+
+        with patch('api.views.purge.start_purge') as start_purge:
+            response = api_client.delete('/api/account/')
+
+        assert response.status_code == 202
+        start_purge.assert_called_once_with(long_history.pk)
+        long_history.refresh_from_db()
+        assert not long_history.is_active
+        assert long_history.purge_requested_at is not None
+        assert api_client.get('/api/journal-entries/').status_code in (401, 403)
+
+    def test_requires_login(self, api_client):
+        assert api_client.delete('/api/account/').status_code == 401
+
+    def test_command_finishes_pending_purges(self, long_history, other_user):
+        User.objects.filter(pk=long_history.pk).update(purge_requested_at=timezone.now())
+        out = StringIO()
+
+        call_command('purge_users', pending=True, interactive=False, rate=0, stdout=out)
+
+        assert not User.objects.filter(pk=long_history.pk).exists()
+        assert User.objects.filter(pk=other_user.pk).exists()
+        assert 'Purged test@example.com' in out.getvalue()
+
+    def test_command_looks_up_users_by_email(self, long_history):
+        call_command('purge_users', user=[long_history.email], interactive=False, rate=0, stdout=StringIO())
+
+        assert not User.objects.filter(pk=long_history.pk).exists()
@@ -0,0 +1,100 @@
+import logging
+
+import pytest
+from django.db import connection
+
+from api.models import JournalEntry, User
+from mindfulcompanion import querystats
+
+
+@pytest.fixture
+def query_stats(settings):
+    """
+    Turns on QueryStatsMiddleware with empty counters.
+    """
+    settings.QUERY_STATS = True
+    settings.MIDDLEWARE = ['mindfulcompanion.middleware.QueryStatsMiddleware', *settings.MIDDLEWARE]
+    querystats.reset_stats()
+    yield settings
+    querystats.reset_stats()
+
+
+@pytest.fixture
+def staff_client(api_client, user):
+    User.objects.filter(pk=user.pk).update(is_staff=True)
+    api_client.force_login(user)
+    return api_client
+
+
+class TestFingerprint:
+    """
+    Tests for SQL normalization.
+    """
+
+    def test_literals_and_in_lists_collapse(self):
+        one = 'SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'a\' LIMIT 21'
+        other = 'SELECT *  FROM t\nWHERE id IN (%s) AND name = \'it\'\'s\' LIMIT 5'
+
+        assert querystats.normalize(one) == 'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?'
+        assert querystats.fingerprint(one) == querystats.fingerprint(other)
+
+    def test_different_statements_differ(self):
+        assert querystats.fingerprint('SELECT a FROM t') != querystats.fingerprint('SELECT b FROM t')
+
+
+@pytest.mark.django_db
+class TestQueryStats:
+    """
+    Tests for per-view aggregation, slow query logging and the staff report.
+    """
+
+    def test_aggregates_per_view_and_fingerprint(self, query_stats, authenticated_client, multiple_journal_entries):
+        authenticated_client.get('/api/journal-entries/')
+        authenticated_client.get('/api/journal-entries/')
+
+        stats = querystats.get_stats()
+        view = stats['views']['journal-entry-list']
+
+        assert view['requests'] == 2
+        assert view['queries'] >= 2
+        assert view['queries_per_request'] == view['queries'] / 2
+        listing = [f for f in stats['fingerprints'] if 'api_journalentry' in f['statement']]
+        assert listing and listing[0]['views']['journal-entry-list'] >= 2
+
+    def test_slow_query_logged_with_plan(self, query_stats, authenticated_client, journal_entry, caplog):
+        query_stats.QUERY_SLOW_MS = 0
+
+        with caplog.at_level(logging.WARNING, logger='mindfulcompanion.querystats'):
+            authenticated_client.get(f'/api/journal-entries/{journal_entry.id}/')
+
+        slow = [r for r in caplog.records if r.getMessage().startswith('slow_query')]
+        assert slow
+        assert all(r.view == 'journal-entry-detail' for r in slow)
+        plans = [r.plan for r in slow if r.plan]
+        assert plans and ('SEARCH' in plans[0] or 'Scan' in plans[0])
+
+    def test_explain_leaves_the_capture_alone(self, query_stats, journal_entry):
+        query_stats.QUERY_SLOW_MS = 0
+
+        with connection.execute_wrapper(querystats.capture):
+            list(JournalEntry.objects.filter(pk=journal_entry.pk))
+
+        statements = [f['statement'] for f in querystats.get_stats()['fingerprints']]
+        assert not any('EXPLAIN' in statement for statement in statements)
+
+    def test_report_requires_staff(self, api_client, user):
+        api_client.force_login(user)
+
+        assert api_client.get('/api/metrics/queries/').status_code == 403
+
+    def test_report_and_reset(self, query_stats, staff_client, journal_entry):
+        staff_client.get('/api/journal-entries/')
+
+        data = staff_client.get('/api/metrics/queries/?top=1').json()
+
+        assert data['enabled'] is True
+        assert len(data['fingerprints']) == 1
+        assert 'journal-entry-list' in data['views']
+
+        assert staff_client.delete('/api/metrics/queries/').status_code == 204
+        assert querystats.get_stats()['fingerprints'] == []
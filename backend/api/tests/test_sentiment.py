@@ -0,0 +1,109 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from api import sentiment
+from api.llm_service import LLMService
+from api.models import JournalEntry
+
+
+class TestScoring:
+    """
+    Tests for the lexicon scorer.
+    """
+
+    def test_polarity(self):
+        positive, _ = sentiment.score('Such a wonderful, happy day. I feel grateful.')
+        negative, _ = sentiment.score('I feel hopeless and exhausted.')
+
+        assert 0 < positive <= 1
+        assert -1 <= negative < 0
+
+    def test_negation_flips_sentiment(self):
+        assert sentiment.score('I am not happy')[0] < 0
+
+    def test_themes_ranked_by_hits(self):
+        _, themes = sentiment.score('My boss moved the deadline and the meeting ran late. Slept badly.')
+
+        assert themes == ['work', 'sleep']
+
+    def test_batch_matches_single(self):
+        texts = ['Great run this morning', '', 'Lonely and sad, no friends around', 'Exam stress']
+
+        assert sentiment.score_many(texts) == [sentiment.score(text) for text in texts]
+
+    def test_describe_trend(self):
+        points = [(-0.6, ['work']), (-0.5, ['work', 'sleep']), (0.3, ['sleep']), (0.5, [])]
+
+        summary = sentiment.describe_trend(points)
+
+        assert 'last 4 entries' in summary
+        assert 'improving' in summary
+        assert 'Recurring themes: work, sleep.' in summary
+        assert sentiment.describe_trend(points[:2]) is None
+
+
+@pytest.mark.django_db
+class TestMoodTrend:
+    """
+    Tests for stored scores, the mood_trend endpoint and the prompt summary.
+    """
+
+    def test_scored_on_save(self, journal_entry):
+        journal_entry.refresh_from_db()
+
+        assert (journal_entry.sentiment, journal_entry.themes) == sentiment.score(journal_entry.content)
+
+    def test_endpoint_returns_series_oldest_first(self, authenticated_client, user, backdated_entry):
+        backdated_entry(user, 'Awful day, so anxious about work', days_ago=3)
+        backdated_entry(user, 'A calm and happy walk', days_ago=1)
+        backdated_entry(user, 'Long ago and sad', days_ago=90)
+
+        response = authenticated_client.get('/api/journal-entries/mood_trend/?days=30')
+
+        assert response.status_code == 200
+        points = response.json()['points']
+        assert len(points) == 2
+        assert points[0]['sentiment'] < 0 < points[1]['sentiment']
+        assert points[0]['themes'] == ['work', 'anxiety']
+
+    def test_endpoint_rejects_bad_days(self, authenticated_client):
+        response = authenticated_client.get('/api/journal-entries/mood_trend/?days=soon')
+
+        assert response.status_code == 400
+
+    def test_endpoint_requires_login(self, api_client):
+        response = api_client.get('/api/journal-entries/mood_trend/')
+
+        assert response.status_code in (401, 403)
+
+    @patch('api.views.llm_service.generate_journal_response')
+    def test_trend_summary_passed_for_chronic(self, mock_llm, authenticated_client, user, backdated_entry):
+        for day in range(1, 5):
+            backdated_entry(user, 'Stressed about the deadline at work', days_ago=day)
+        mock_llm.return_value = {'response': 'Hi', 'tokens_used': 1, 'estimated_cost': 0.0}
+
+        authenticated_client.post('/api/journal-entries/', {
+            'content': 'Work deadline again', 'requested_help_type': 'chronic_validation'
+        })
+
+        summary = mock_llm.call_args.kwargs['trend_summary']
+        assert 'mostly negative' in summary
+        assert 'work' in summary
+
+    def test_trend_summary_in_user_message(self):
+        message = LLMService()._build_user_message('Today', None, 'Mood has been improving.')
+
+        assert message.index('Mood has been improving.') < message.index("TODAY'S JOURNAL ENTRY")
+
+    def test_backfill_command(self, user, backdated_entry):
+        backdated_entry(user, 'Happy and proud', days_ago=2)
+        JournalEntry.objects.update(sentiment=None, themes=[])
+
+        call_command('backfill_sentiment', stdout=StringIO())
+
+        entry = JournalEntry.objects.get()
+        assert entry.sentiment > 0
+        assert entry.themes == ['self_worth']
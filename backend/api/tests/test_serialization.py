@@ -0,0 +1,93 @@
+import datetime
+import decimal
+import json
+from io import BytesIO
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.models import JournalEntry
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from api.serializers import JournalEntryListSerializer, serialize_entry_list
+
+
+@pytest.mark.django_db
+class TestFastListSerialization:
+    """
+    The .values() fast path must match JournalEntryListSerializer exactly.
+    """
+
+    def test_matches_serializer(self, user, multiple_journal_entries):
+        JournalEntry.objects.create(user=user, title=None, content='x' * 151)
+        JournalEntry.objects.create(user=user, title='Exact', content='y' * 150)
+        queryset = JournalEntry.objects.filter(user=user)
+
+        expected = JournalEntryListSerializer(queryset, many=True).data
+
+        assert serialize_entry_list(queryset) == expected
+
+    def test_matches_serializer_sliced(self, user, multiple_journal_entries):
+        new_entry = JournalEntry.objects.create(
+            user=user,
+            content='New entry',
+            requested_help_type='chronic_validation'
+        )
+        context = new_entry.get_context_entries()
+
+        assert serialize_entry_list(context) == JournalEntryListSerializer(context, many=True).data
+
+    def test_context_entries_without_context(self, authenticated_client, journal_entry):
+        """
+        Acute entries have no context; the endpoint returns an empty list.
+        """
+        response = authenticated_client.get(f'/api/journal-entries/{journal_entry.id}/context_entries/')
+
+        assert response.status_code == 200
+        assert response.data['actual_entries_count'] == 0
+        assert response.data['entries'] == []
+
+
+class TestORJSON:
+    """
+    The orjson renderer/parser are byte-for-byte drop-ins for DRF's.
+    """
+
+    PAYLOAD = {
+        'id': 12,
+        'title': 'Ünïcode \u2028 line sep \u2029 "quoted" \\ \n\t\x01',
+        'estimated_cost': 0.00001,
+        'big_cost': 12345678901234567.0,
+        'tokens_used': 500,
+        'created_at': datetime.datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=datetime.timezone.utc),
+        'api_cost': decimal.Decimal('0.0025'),
+        'nested': {'cost': 1e-07, 'none': None, 'flag': True},
+        'entries': [{'id': 1, 'title': None}, {'id': 2, 'title': '🙂'}],
+        'points': [{'s': 1e-05}, {'s': 0.5, 'scores': (2.5e-06, 3.0)}],
+    }
+
+    def test_renderer_matches_json_renderer(self):
+        assert ORJSONRenderer().render(self.PAYLOAD) == JSONRenderer().render(self.PAYLOAD)
+
+    def test_renderer_floats_inside_lists(self):
+        rendered = ORJSONRenderer().render({'points': [{'s': 1e-05}]})
+
+        assert rendered == JSONRenderer().render({'points': [{'s': 1e-05}]}) == b'{"points":[{"s":1e-05}]}'
+
+    def test_renderer_indent_falls_back(self):
+        rendered = ORJSONRenderer().render(self.PAYLOAD, 'application/json; indent=4')
+
+        assert rendered == JSONRenderer().render(self.PAYLOAD, 'application/json; indent=4')
+
+    def test_parser_matches_json_parser(self):
+        body = json.dumps({'content': 'Héllo', 'n': [1, 2.5, None]}).encode()
+
+        parsed = ORJSONParser().parse(BytesIO(body))
+
+        assert parsed == JSONParser().parse(BytesIO(body))
+
+    def test_parser_rejects_invalid_json(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"content": '))
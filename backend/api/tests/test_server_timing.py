@@ -0,0 +1,102 @@
+import re
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from api import llm_service as llm_service_module
+from api.llm_service import llm_service
+from mindfulcompanion import timing
+
+
+@pytest.fixture
+def staff_client(api_client, user):
+    user.is_staff = True
+    user.save()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.mark.django_db
+class TestServerTimingHeader:
+    """
+    Tests for ServerTimingMiddleware.
+    """
+
+    def test_list_reports_db_and_serialize(self, staff_client, journal_entry):
+        response = staff_client.get('/api/journal-entries/')
+        header = response['Server-Timing']
+
+        assert re.search(r'db;dur=[\d.]+;desc="\d+ queries"', header)
+        assert 'serialize;dur=' in header
+        assert re.search(r'total;dur=[\d.]+$', header)
+
+    def test_304_still_has_header(self, staff_client, journal_entry):
+        etag = staff_client.get('/api/journal-entries/')['ETag']
+
+        response = staff_client.get('/api/journal-entries/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert 'total;dur=' in response['Server-Timing']
+
+    def test_hidden_from_anonymous_and_regular_users(self, api_client, authenticated_client, journal_entry):
+        assert 'Server-Timing' not in api_client.get('/api/csrf/')
+        assert 'Server-Timing' not in authenticated_client.get('/api/journal-entries/')
+
+    def test_sent_to_everyone_with_debug(self, api_client, settings):
+        settings.DEBUG = True
+
+        assert 'total;dur=' in api_client.get('/api/csrf/')['Server-Timing']
+
+
+class TestPhaseRecording:
+    """
+    Tests for phase recording outside the middleware.
+    """
+
+    def test_noop_outside_request(self):
+        with timing.timed('prompt'):
+            pass
+        timing.record('db', 1.0)
+
+        assert timing.current() is None
+
+    def test_llm_phases(self):
+        """
+        A streamed completion records prompt, llm_ttfb and llm.
+        """
+        assembled = MagicMock()
+        assembled.choices[0].message.content = 'Hello'
+        assembled.usage.prompt_tokens = 10
+        assembled.usage.completion_tokens = 5
+        assembled.usage.total_tokens = 15
+
+        timings, token = timing.start()
+        try:
+            with patch('litellm.completion', return_value=iter(['chunk-1', 'chunk-2'])), \
+                    patch('litellm.stream_chunk_builder', return_value=assembled) as builder:
+                result = llm_service.generate_journal_response('Today was hard', 'acute_validation')
+        finally:
+            timing.stop(token)
+
+        assert result['response'] == 'Hello'
+        assert builder.call_args.args[0] == ['chunk-1', 'chunk-2']
+        assert {'prompt', 'llm_ttfb', 'llm'} <= set(timings.phases)
+        assert timings.phases['llm_ttfb'][0] <= timings.phases['llm'][0]
+
+    def test_untimed_completion_does_not_stream(self, settings):
+        settings.OVERLOAD_SHEDDING = False
+
+        with patch('litellm.completion', return_value='response') as completion:
+            assert llm_service_module._completion(model='m', messages=[]) == 'response'
+
+        assert 'stream' not in completion.call_args.kwargs
+
+    def test_empty_stream_raises(self):
+        timings, token = timing.start()
+        try:
+            with patch('litellm.completion', return_value=iter([])), \
+                    patch('litellm.stream_chunk_builder', return_value=None):
+                with pytest.raises(RuntimeError, match='Empty completion stream'):
+                    llm_service_module._completion(model='m', messages=[])
+        finally:
+            timing.stop(token)
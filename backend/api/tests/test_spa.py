@@ -0,0 +1,83 @@
+import gzip
+
+import pytest
+from django.test import RequestFactory
+
+from mindfulcompanion import spa
+from mindfulcompanion.middleware import ImmutableAssetsWhiteNoiseMiddleware
+
+
+@pytest.fixture
+def frontend_dist(settings, tmp_path):
+    """
+    A fake Vite build with a precompressed index.html.
+    """
+    html = b'<!doctype html><div id="root"></div>'
+    (tmp_path / 'index.html').write_bytes(html)
+    (tmp_path / 'index.html.gz').write_bytes(gzip.compress(html))
+    settings.FRONTEND_DIST = tmp_path
+    spa._index = None
+    yield tmp_path
+    spa._index = None
+
+
+class TestSpaIndex:
+    """
+    Tests for the cached index.html view.
+    """
+
+    def test_serves_index_with_etag(self, frontend_dist):
+        response = spa.spa_index_view(RequestFactory().get('/profile'))
+
+        assert response.status_code == 200
+        assert response.content == (frontend_dist / 'index.html').read_bytes()
+        assert response['ETag']
+        assert 'no-cache' in response['Cache-Control']
+
+    def test_not_modified(self, frontend_dist):
+        etag = spa.spa_index_view(RequestFactory().get('/'))['ETag']
+
+        response = spa.spa_index_view(RequestFactory().get('/', HTTP_IF_NONE_MATCH=etag))
+
+        assert response.status_code == 304
+
+    def test_precompressed_variant(self, frontend_dist):
+        response = spa.spa_index_view(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, deflate'))
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content) == (frontend_dist / 'index.html').read_bytes()
+        assert 'Accept-Encoding' in response['Vary']
+
+    def test_reads_file_once(self, frontend_dist):
+        spa.spa_index_view(RequestFactory().get('/'))
+        (frontend_dist / 'index.html').write_bytes(b'changed')
+
+        response = spa.spa_index_view(RequestFactory().get('/'))
+
+        assert response.content != b'changed'
+
+
+class TestImmutableAssets:
+    """
+    Vite's hashed files are cached for a year; everything else is not immutable.
+    """
+
+    @pytest.mark.parametrize('url, expected', [
+        ('/assets/index-BxY3kZ9a.js', True),
+        ('/assets/index-D_a-1x2Y.css', True),
+        ('/favicon.ico', False),
+        ('/vite.svg', False),
+        ('/assets/logo.svg', False),
+    ])
+    def test_vite_hashed_assets(self, url, expected):
+        middleware = ImmutableAssetsWhiteNoiseMiddleware(lambda request: None)
+
+        assert middleware.immutable_file_test('', url) is expected
+
+    def test_one_year_max_age(self):
+        middleware = ImmutableAssetsWhiteNoiseMiddleware(lambda request: None)
+        headers = {}
+
+        middleware.add_cache_headers(headers, '', '/assets/index-BxY3kZ9a.js')
+
+        assert headers['Cache-Control'] == 'max-age=31536000, public, immutable'
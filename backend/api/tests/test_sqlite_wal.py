@@ -0,0 +1,62 @@
+import pytest
+from django.db import connection, transaction
+
+from api.models import JournalEntry
+from mindfulcompanion.db.sqlite_wal import base as sqlite_wal
+
+pytestmark = pytest.mark.skipif(
+    connection.settings_dict['ENGINE'] != 'mindfulcompanion.db.sqlite_wal',
+    reason='SQLite production mode only'
+)
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSqliteWal:
+    """
+    Tests for the tuned SQLite backend.
+    """
+
+    def test_pragmas_applied_per_connection(self):
+        connection.close()
+        connection.ensure_connection()
+
+        assert pragma('synchronous') == 1   # NORMAL
+        assert pragma('cache_size') == -64_000
+        assert pragma('temp_store') == 2    # MEMORY
+        assert pragma('busy_timeout') == 5000
+
+    def test_transactions_begin_immediate(self, user):
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture), transaction.atomic():
+            JournalEntry.objects.create(user=user, content='Written under the write lock')
+
+        assert statements[0] == 'BEGIN IMMEDIATE'
+
+    def test_write_lock_held_for_the_transaction(self, user):
+        with transaction.atomic():
+            assert sqlite_wal._write_lock.locked()
+            with transaction.atomic():
+                JournalEntry.objects.create(user=user, content='Nested savepoint')
+        assert not sqlite_wal._write_lock.locked()
+
+        with pytest.raises(ValueError), transaction.atomic():
+            raise ValueError('rolled back')
+        assert not sqlite_wal._write_lock.locked()
+
+    def test_autocommit_reads_skip_the_lock(self, user):
+        sqlite_wal._write_lock.acquire()
+        try:
+            assert JournalEntry.objects.filter(user=user).count() == 0
+        finally:
+            sqlite_wal._write_lock.release()
@@ -0,0 +1,30 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+
+class TestStartupProfile:
+    """
+    Tests for the startup_profile management command and lazy LLM loading.
+    """
+
+    def test_reports_imports_and_first_response(self):
+        out = StringIO()
+
+        call_command('startup_profile', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+
+        assert report['status'] == '200 OK'
+        assert report['first_response_s'] >= report['ready_s'] > 0
+        assert any(m['module'] == 'api.views' for m in report['modules'])
+
+    def test_llm_stack_not_loaded_for_csrf(self):
+        """
+        Serving /api/csrf/ must not pull in litellm.
+        """
+        out = StringIO()
+
+        call_command('startup_profile', '--json', stdout=out)
+
+        assert json.loads(out.getvalue())['llm_loaded_before_response'] is False
@@ -14,9 +14,15 @@ router.register(r'journal-entries', views.JournalEntryViewSet, basename='journal
 # GET    /api/journal-entries/{id}/context_entries/ -> custom action
 
 urlpatterns = [
+    path('bootstrap/', views.bootstrap_view, name='bootstrap'),
     path('csrf/', views.csrf_token_view, name='csrf_token'),
     path('user/', views.user_info_view, name='user_info'),
     path('logout/', views.logout_view, name='api_logout'),
+    path('account/', views.delete_account_view, name='delete_account'),
+    path('metrics/db-pool/', views.db_pool_metrics_view, name='db_pool_metrics'),
+    path('metrics/cache/', views.cache_metrics_view, name='cache_metrics'),
+    path('metrics/queries/', views.query_metrics_view, name='query_metrics'),
+    path('metrics/logging/', views.log_metrics_view, name='log_metrics'),
 
     path('', include(router.urls)),
 ]
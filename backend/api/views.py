@@ -1,10 +1,18 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
 from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.contrib.auth import logout as django_logout
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
-from .models import JournalEntry, AIInteraction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from mindfulcompanion import log, profiling, querystats
+from . import history, overload, purge
+from .cache import UserCache, get_stats as get_cache_stats
+from .models import User, UserPreferences, JournalEntry, AIInteraction
 from .llm_service import llm_service
 
 # DRF imports
@@ -13,9 +21,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import ValidationError
-from .serializers import JournalEntrySerializer, JournalEntryListSerializer
+from .serializers import JournalEntrySerializer, JournalEntryListSerializer, serialize_entry_list
 
+from datetime import datetime, time, timedelta
+from functools import partial, wraps
 import logging
+import zoneinfo
 
 logger = logging.getLogger(__name__)
 
@@ -40,16 +51,88 @@ def user_info_view(request):
     if not request.user.is_authenticated:
         return JsonResponse({'error': 'Not authenticated'}, status=401)
 
-    user = request.user
     return JsonResponse({
-        'user': {
-            'id': user.id,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'date_joined': user.date_joined.isoformat()
+        'user': _user_payload(request.user)
+    })
+
+
+def _user_payload(user):
+    return {
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'date_joined': user.date_joined.isoformat()
+    }
+
+
+@never_cache
+@ensure_csrf_cookie
+def bootstrap_view(request):
+    """
+    Everything the SPA needs on a cold load in one response: CSRF token, user,
+    preferences, whether today's entry exists and the current month's entries.
+    Costs three queries for a signed-in user beyond authentication, none for
+    anonymous visitors.
+    """
+    data = {
+        'csrfToken': get_token(request),
+        'user': None,
+        'preferences': None,
+        'today_entry_exists': False,
+        'calendar': None,
+    }
+
+    if not request.user.is_authenticated:
+        return JsonResponse(data)
+
+    user = request.user
+    user_cache = UserCache(user.pk) if settings.JOURNAL_CACHE else None
+
+    def load_preferences():
+        # {} rather than None so "no preferences" is cacheable too
+        return UserPreferences.objects.filter(user=user).values('user_timezone', 'preferred_name').first() or {}
+
+    preferences = (user_cache.get_or_set('preferences', load_preferences) if user_cache else load_preferences()) or None
+
+    # Month boundaries follow the user's timezone so the calendar matches what they see
+    try:
+        user_tz = zoneinfo.ZoneInfo(preferences['user_timezone']) if preferences else timezone.get_current_timezone()
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        user_tz = timezone.get_current_timezone()
+    now = timezone.localtime(timezone.now(), user_tz)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+
+    def load_journal_state():
+        month_entries = JournalEntry.objects.filter(
+            user=user,
+            created_at__gte=month_start,
+            created_at__lt=next_month_start
+        )
+        return {
+            # Same rule as _validate_one_entry_per_day
+            'today_entry_exists': JournalEntry.objects.filter(
+                user=user,
+                created_at__date=timezone.now().date()
+            ).exists(),
+            'calendar': {
+                'year': now.year,
+                'month': now.month,
+                'entries': serialize_entry_list(month_entries),
+            },
         }
+
+    # Keyed by both days the answer depends on: today (UTC) and the user's month
+    journal_state_name = f'bootstrap:{timezone.now().date()}:{now:%Y-%m}'
+    data.update(
+        user_cache.get_or_set(journal_state_name, load_journal_state) if user_cache else load_journal_state()
+    )
+    data.update({
+        'user': _user_payload(user),
+        'preferences': preferences,
     })
+    return JsonResponse(data)
 
 
 @require_http_methods(["POST"])
@@ -69,6 +152,103 @@ def logout_view(request):
     return response
 
 
+@require_http_methods(["DELETE"])
+def delete_account_view(request):
+    """
+    Delete the signed-in user's account and all of their journal data.
+    The account is deactivated and logged out right away; the rows are
+    removed in batches in the background (api.purge).
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    user = request.user
+    User.objects.filter(pk=user.pk).update(is_active=False, purge_requested_at=timezone.now())
+    django_logout(request)
+    purge.start_purge(user.pk)
+
+    response = JsonResponse({'message': 'Account scheduled for deletion'}, status=202)
+    response.delete_cookie('sessionid')
+    response.delete_cookie('csrftoken')
+    return response
+
+
+def staff_json_required(view):
+    """
+    Answers anyone but a logged-in staff user with a JSON 403
+    (the metrics endpoints).
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated or not request.user.is_staff:
+            return JsonResponse({'error': 'Staff access required'}, status=403)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+@staff_json_required
+def db_pool_metrics_view(request):
+    """
+    Returns database connection pool metrics for the serving process.
+    Staff only; empty when the pooled backend is not enabled.
+    """
+
+    # Imported here so psycopg_pool stays off the startup path when pooling is off
+    from mindfulcompanion.db.postgresql_pool.base import get_pool_stats
+
+    return JsonResponse({'pools': get_pool_stats()})
+
+
+@staff_json_required
+def cache_metrics_view(request):
+    """
+    Returns per-user cache hit/miss counts for the serving process.
+    Staff only.
+    """
+
+    return JsonResponse({
+        'enabled': settings.JOURNAL_CACHE,
+        'backend': settings.CACHES[settings.JOURNAL_CACHE_ALIAS]['BACKEND'],
+        'stats': get_cache_stats(),
+    })
+
+
+@staff_json_required
+def log_metrics_view(request):
+    """
+    Returns log queue depth and records dropped because the queue was full,
+    per async log handler of the serving process. Staff only.
+    """
+
+    return JsonResponse({'handlers': log.get_stats()})
+
+
+@require_http_methods(["GET", "DELETE"])
+@staff_json_required
+def query_metrics_view(request):
+    """
+    Returns query counts and latency per SQL fingerprint (worst total time
+    first, ?top=N to limit) and per view for the serving process, with the
+    latest EXPLAIN plan of each slow statement. DELETE resets the counters.
+    Staff only; empty unless QUERY_STATS is on.
+    """
+
+    if request.method == 'DELETE':
+        querystats.reset_stats()
+        return HttpResponse(status=204)
+
+    try:
+        top = int(request.GET.get('top', 50))
+    except ValueError:
+        return JsonResponse({'error': 'top must be an integer'}, status=400)
+
+    return JsonResponse({
+        'enabled': settings.QUERY_STATS,
+        'slow_ms': settings.QUERY_SLOW_MS,
+        **querystats.get_stats(top=top),
+    })
+
+
 class JournalEntryViewSet(viewsets.ModelViewSet):
     """
     ViewSet for journal entry CRUD operations.
@@ -106,6 +286,74 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
         """
         return JournalEntry.objects.filter(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        """
+        List entries, honoring conditional GET headers.
+        """
+        return self._conditional_response(request, self._list_response, 'list')
+
+    def _list_response(self):
+        # Same payload as JournalEntryListSerializer, built from .values() rows
+        return Response(serialize_entry_list(self.filter_queryset(self.get_queryset())))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Get a single entry, honoring conditional GET headers.
+        """
+        return self._conditional_response(
+            request, partial(super().retrieve, request, *args, **kwargs), 'entry', kwargs.get('pk')
+        )
+
+    def _conditional_response(self, request, build_response, *etag_parts):
+        """
+        Answer If-None-Match / If-Modified-Since with a 304 before running the
+        real query and serialization. Validators come from the user's
+        journal_updated_at stamp, which api.signals bumps on every journal write.
+        """
+        stamp = self._journal_stamp(request.user)
+        version = int(stamp.timestamp() * 1_000_000) if stamp else 0
+        etag = '"' + '-'.join(str(part) for part in (request.user.pk, version, *etag_parts)) + '"'
+        # Last-Modified only has second precision; clients that send ETags get the exact answer
+        last_modified = int((stamp or request.user.date_joined).timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self._cached_response(request, build_response, etag_parts)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Entries are private; let the browser keep them but always revalidate
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def _journal_stamp(self, user):
+        # Read fresh: request.user may come from the auth cache
+        return User.objects.filter(pk=user.pk).values_list('journal_updated_at', flat=True).first()
+
+    def _cached_response(self, request, build_response, name_parts):
+        """
+        Serve the response body from the user's cache namespace when
+        JOURNAL_CACHE is on; only successful responses are stored. The name
+        is built from the ETag parts, so anything the body depends on besides
+        the journal (the date for mood_trend, 'trend:30:2026-10-19') must be
+        one of them.
+        """
+        if not settings.JOURNAL_CACHE:
+            return build_response()
+
+        user_cache = UserCache(request.user.pk)
+        name = ':'.join(str(part) for part in name_parts)
+        data = user_cache.get(name)
+        if data is not None:
+            return Response(data)
+
+        response = build_response()
+        if response.status_code == status.HTTP_200_OK:
+            user_cache.set(name, response.data)
+        return response
+
     def create(self, request, *args, **kwargs):
         """
         Create a new journal entry with optional AI response.
@@ -114,6 +362,7 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
         content = request.data.get('content', '').strip()
         title = request.data.get('title', '').strip()
         help_type = request.data.get('requested_help_type')
+        profiling.tag(help_type=help_type)
 
         if not content:
             return Response(
@@ -145,7 +394,7 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            logger.info(f"Generating AI response for anonymous user with help_type={help_type}")
+            logger.info("Generating AI response for anonymous user with help_type=%s", help_type)
             
             ai_result = llm_service.generate_journal_response(
                 current_entry_content=content,
@@ -163,7 +412,7 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"Error generating AI response for anonymous user: {str(e)}")
+            logger.error("Error generating AI response for anonymous user: %s", e)
             return Response(
                 {'error': f'Failed to generate AI response: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -178,6 +427,9 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
         validation_error = self._validate_one_entry_per_day(user)
         if validation_error:
             return validation_error
+
+        # Taken before the entry is saved, since saving it changes the journal stamp
+        prepared = self._take_prepared_context(user, help_type)
         
         # Create the journal entry
         journal_entry = JournalEntry.objects.create(
@@ -193,7 +445,7 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
         # Generate AI response
-        return self._generate_and_save_ai_response(journal_entry, help_type, user)
+        return self._generate_and_save_ai_response(journal_entry, help_type, user, prepared)
 
 
     def _validate_one_entry_per_day(self, user):
@@ -216,50 +468,43 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
         return None
 
 
-    def _generate_and_save_ai_response(self, journal_entry, help_type, user):
+    def _generate_and_save_ai_response(self, journal_entry, help_type, user, prepared=None):
         """
         Generate AI response using Claude and save to database.
         Returns Response with entry data and AI response.
+        Under load (api.overload) chronic/max responses are cut down or
+        deferred, and the response says so in 'degraded'.
         """
-        try:
-            logger.info(f"Generating AI response for user={user.id}, entry={journal_entry.id}, help_type={help_type}")
-            
-            # Get context entries based on help type
-            context_entries = self._get_context_for_entry(journal_entry)
-            
-            # Get user's preferred name if available
-            user_name = self._get_user_preferred_name(user)
-            
-            # Call LLM service
-            ai_result = llm_service.generate_journal_response(
-                current_entry_content=journal_entry.content,
-                help_type=help_type,
-                context_entries=context_entries,
-                user_name=user_name
+        degradation = overload.controller.plan(help_type)
+
+        if degradation and degradation['deferred']:
+            # update(): an edit through save() would drop the user's cached history
+            journal_entry.ai_deferred_at = timezone.now()
+            JournalEntry.objects.filter(pk=journal_entry.pk).update(ai_deferred_at=journal_entry.ai_deferred_at)
+            overload.defer(
+                partial(self._generate_deferred, journal_entry, help_type, user), f'entry={journal_entry.id}'
             )
-            
-            # Save AI interaction to database
-            AIInteraction.objects.create(
-                journal_entry=journal_entry,
-                claude_response=ai_result['response'],
-                context_entries_count=len(context_entries) if context_entries else 0,
-                tokens_used=ai_result['tokens_used'],
-                api_cost=ai_result['estimated_cost']
-            )
-            
-            logger.info(f"AI interaction saved: tokens={ai_result['tokens_used']}, cost=${ai_result['estimated_cost']:.6f}")
-            
+            response_data = self.get_serializer(journal_entry).data
+            response_data['ai_deferred'] = True
+            response_data['degraded'] = degradation
+            return Response(response_data, status=status.HTTP_201_CREATED)
+
+        try:
+            ai_result = self._generate_ai_interaction(journal_entry, help_type, user, prepared, degradation)
+
             # Return the entry with AI response
             serializer = self.get_serializer(journal_entry)
             response_data = serializer.data
             response_data['ai_response'] = ai_result['response']
             response_data['tokens_used'] = ai_result['tokens_used']
             response_data['estimated_cost'] = ai_result['estimated_cost']
+            if degradation:
+                response_data['degraded'] = degradation
             
             return Response(response_data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            logger.error(f"Error generating AI response: {str(e)}", exc_info=True)
+            logger.error("Error generating AI response: %s", e, exc_info=True)
             
             # Entry was saved, but AI failed - return entry without AI response
             serializer = self.get_serializer(journal_entry)
@@ -269,17 +514,81 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
             return Response(response_data, status=status.HTTP_201_CREATED)
 
 
-    def _get_context_for_entry(self, journal_entry):
+    def _generate_ai_interaction(self, journal_entry, help_type, user, prepared=None, degradation=None):
+        """
+        Call the LLM for an entry and save the AIInteraction.
+        Returns the LLMService result.
+        """
+        logger.info("Generating AI response for user=%s, entry=%s, help_type=%s", user.id, journal_entry.id, help_type)
+        
+        # Get user's preferred name if available
+        user_name = self._get_user_preferred_name(user)
+        max_tokens = degradation['max_tokens'] if degradation else None
+
+        if prepared is not None and degradation is None:
+            # History was rendered by the prepare endpoint; only today's entry is new
+            context_count = prepared['context_count']
+            ai_result = llm_service.generate_journal_response(
+                current_entry_content=journal_entry.content,
+                help_type=help_type,
+                user_name=user_name,
+                context_block=prepared['context_block']
+            )
+        else:
+            # Get context entries based on help type (fewer under load)
+            context_entries = self._get_context_for_entry(journal_entry, degradation)
+            context_count = len(context_entries) if context_entries else 0
+
+            # Short mood/theme trend for help types that look at history
+            trend_summary = self._get_trend_summary(journal_entry) if context_entries else None
+
+            # Call LLM service
+            ai_result = llm_service.generate_journal_response(
+                current_entry_content=journal_entry.content,
+                help_type=help_type,
+                context_entries=context_entries,
+                user_name=user_name,
+                trend_summary=trend_summary,
+                max_tokens=max_tokens
+            )
+        
+        # Save AI interaction to database
+        AIInteraction.objects.create(
+            journal_entry=journal_entry,
+            claude_response=ai_result['response'],
+            context_entries_count=context_count,
+            tokens_used=ai_result['tokens_used'],
+            api_cost=ai_result['estimated_cost'],
+            model=ai_result.get('model', '')
+        )
+        
+        logger.info("AI interaction saved: tokens=%s, cost=$%.6f", ai_result['tokens_used'], ai_result['estimated_cost'])
+        return ai_result
+
+
+    def _generate_deferred(self, journal_entry, help_type, user):
+        """
+        A deferred response, run by api.overload once pressure drops below
+        deferral; whatever lighter degradation still applies is used.
+        """
+        self._generate_ai_interaction(journal_entry, help_type, user, degradation=overload.controller.plan(help_type))
+
+
+    def _get_context_for_entry(self, journal_entry, degradation=None):
         """
         Get previous journal entries for AI context based on help type.
         Returns list of dicts or None if no context needed.
         """
-        context_window_size = journal_entry.get_context_window_size()
+        context_window_size = overload.shrink_window(journal_entry.get_context_window_size(), degradation)
         
         if context_window_size == 0:
             return None
+
+        if settings.JOURNAL_CACHE:
+            # Previous entries come pre-rendered from the per-user history cache
+            return history.get_context_entries(journal_entry, context_window_size)
         
-        context_queryset = journal_entry.get_context_entries()
+        context_queryset = journal_entry.get_context_entries(context_window_size)
         return [
             {
                 'created_at': entry.created_at,
@@ -290,6 +599,40 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
         ]
 
 
+    def _get_trend_summary(self, journal_entry):
+        """
+        Describe the mood trend over the entries leading up to this one
+        (including it). Returns None if there's too little history.
+        """
+        # api.sentiment pulls in numpy; keep it off the startup path
+        from . import sentiment
+
+        points = list(
+            JournalEntry.objects.filter(user=journal_entry.user, created_at__lte=journal_entry.created_at)
+            .order_by('-created_at')
+            .values_list('sentiment', 'themes')[:sentiment.TREND_ENTRIES]
+        )
+        return sentiment.describe_trend(points[::-1])
+
+    def _prepared_key(self, user, help_type):
+        return f'prepared:{user.pk}:{help_type}'
+
+    def _take_prepared_context(self, user, help_type):
+        """
+        The context block prepare() cached for this help type, or None if there
+        isn't one or the journal has changed since. Each block is used once.
+        """
+        cache = caches[settings.JOURNAL_CACHE_ALIAS]
+        key = self._prepared_key(user, help_type)
+        prepared = cache.get(key)
+        if prepared is None:
+            return None
+
+        cache.delete(key)
+        if prepared['stamp'] != self._journal_stamp(user):
+            return None
+        return prepared
+
     def _get_user_preferred_name(self, user):
         """
         Get user's preferred name from preferences if available.
@@ -309,13 +652,99 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
         This returns the previous entries that would be included when
         sending this entry to Claude for AI response.
         """
-        entry = self.get_object()
-        context_entries = entry.get_context_entries()
+        return self._conditional_response(
+            request, self._context_entries_response, 'context', pk
+        )
 
-        serializer = JournalEntryListSerializer(context_entries, many=True)
+    def _context_entries_response(self):
+        entry = self.get_object()
+        entries = serialize_entry_list(entry.get_context_entries())
 
         return Response({
             'context_window_size': entry.get_context_window_size(),
-            'actual_entries_count': context_entries.count(),
-            'entries': serializer.data
+            'actual_entries_count': len(entries),
+            'entries': entries
+        })
+
+    @action(detail=False, methods=['post'])
+    def prepare(self, request):
+        """
+        Render the context block for a chronic_*/max_* entry while the user is
+        still writing, so the create that follows only adds today's entry.
+
+        URL: POST /api/journal-entries/prepare/
+        Body: {"requested_help_type": "chronic_validation", "content": "draft so far"}
+
+        The draft (optional) is what context ranking compares past entries to.
+        The block is kept for PREPARE_CACHE_TIMEOUT seconds and dropped as soon
+        as the journal changes.
+        """
+        help_type = request.data.get('requested_help_type')
+        draft = JournalEntry(
+            user=request.user,
+            content=(request.data.get('content') or '').strip(),
+            requested_help_type=help_type,
+            created_at=timezone.now()
+        )
+        if not draft.get_context_window_size():
+            raise ValidationError({'requested_help_type': 'Only chronic_* and max_* help types use past entries.'})
+
+        # Stamp first: a write that lands while the block is built makes it stale
+        stamp = self._journal_stamp(request.user)
+        context_entries = self._get_context_for_entry(draft)
+        # Covers the previous entries only; the draft isn't scored yet
+        trend_summary = self._get_trend_summary(draft) if context_entries else None
+        context_block = llm_service._build_context_block(context_entries, trend_summary)
+
+        caches[settings.JOURNAL_CACHE_ALIAS].set(self._prepared_key(request.user, help_type), {
+            'stamp': stamp,
+            'context_block': context_block,
+            'context_count': len(context_entries),
+        }, settings.PREPARE_CACHE_TIMEOUT)
+
+        if settings.LLM_PROMPT_CACHE_PREWARM:
+            llm_service.prewarm(help_type, context_block, self._get_user_preferred_name(request.user))
+
+        return Response({
+            'help_type': help_type,
+            'context_entries_count': len(context_entries),
+            'expires_in': settings.PREPARE_CACHE_TIMEOUT
+        })
+
+    @action(detail=False, methods=['get'])
+    def mood_trend(self, request):
+        """
+        Per-entry mood score and themes over time, oldest first.
+
+        URL: GET /api/journal-entries/mood_trend/?days=30
+        """
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), 365)
+        except ValueError:
+            raise ValidationError({'days': 'Must be a whole number of days.'})
+
+        # The window starts at a day boundary, so the body only changes with
+        # the date (or the journal) and the validators can say the same
+        today = timezone.localdate()
+        return self._conditional_response(
+            request, partial(self._mood_trend_response, days, today), 'trend', days, today
+        )
+
+    def _mood_trend_response(self, days, today):
+        from . import sentiment
+
+        since = timezone.make_aware(datetime.combine(today - timedelta(days=days), time.min))
+        points = list(
+            self.get_queryset()
+            .filter(created_at__gte=since, sentiment__isnull=False)
+            .order_by('created_at')
+            .values('id', 'created_at', 'sentiment', 'themes')
+        )
+        scores = [point['sentiment'] for point in points]
+
+        return Response({
+            'days': days,
+            'average': round(sum(scores) / len(scores), 3) if scores else None,
+            'summary': sentiment.describe_trend([(point['sentiment'], point['themes']) for point in points]),
+            'points': points
         })
@@ -0,0 +1,8 @@
+"""
+Performance benchmarks for the backend. Run from backend/, e.g.
+python -m benchmarks.bench_serialization
+python -m benchmarks.bench_micro --out bench/micro.json
+
+benchmarks.harness holds the shared timing, JSON results and regression
+comparison helpers.
+"""
@@ -0,0 +1,143 @@
+"""
+Per-user workload against the configured database, for comparing SQLite
+production mode with PostgreSQL.
+
+Each simulated session is one user's visit: list, open the latest entry,
+its context and the mood trend, then write an entry and edit its title.
+Sessions run on --threads threads, like gunicorn's thread workers, against
+users seeded by generate_data.
+
+    DATABASE_URL=sqlite:////tmp/bench.sqlite3 python -m benchmarks.bench_database --out bench/sqlite.json
+    DATABASE_URL=postgres://... python -m benchmarks.bench_database --baseline bench/sqlite.json
+
+The SQLite test database is a file next to the configured one, so WAL and
+the pragmas apply as they would in production.
+"""
+
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindfulcompanion.settings')
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from api.models import JournalEntry, User  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    DEFAULT_THRESHOLD, compare, load_results, print_comparison, print_results,
+    save_results, summarize,
+)
+
+PREFIX = 'dbbench'
+
+
+def _session(user, samples, lock):
+    """
+    One user's visit; per-request latencies (µs) are added to `samples`.
+    """
+    client = APIClient()
+    client.force_authenticate(user=user)
+    timings = {}
+
+    def timed(name, request):
+        started = time.perf_counter()
+        response = request()
+        timings[name] = (time.perf_counter() - started) * 1_000_000
+        assert response.status_code < 400, (name, response.status_code)
+        return response
+
+    entries = timed('list', lambda: client.get('/api/journal-entries/')).data
+    latest = entries[0]['id']
+    timed('retrieve', lambda: client.get(f'/api/journal-entries/{latest}/'))
+    timed('context', lambda: client.get(f'/api/journal-entries/{latest}/context_entries/'))
+    timed('mood_trend', lambda: client.get('/api/journal-entries/mood_trend/?days=30'))
+    created = timed('create', lambda: client.post(
+        '/api/journal-entries/', {'content': 'Benchmark entry', 'requested_help_type': 'save_only'}, format='json'
+    )).data
+    timed('update', lambda: client.patch(
+        f'/api/journal-entries/{created["id"]}/', {'title': 'Edited'}, format='json'
+    ))
+    timings['session'] = sum(timings.values())
+
+    with lock:
+        for name, value in timings.items():
+            samples.setdefault(name, []).append(value)
+
+
+def _run_session(user, samples, lock):
+    try:
+        _session(user, samples, lock)
+    finally:
+        # Each pool thread has its own connection
+        connection.close()
+
+
+def run(users, entries_per_user, threads, rounds):
+    call_command('generate_data', users=users, entries_per_user=entries_per_user,
+                 prefix=PREFIX, seed=users, stdout=io.StringIO())
+    accounts = list(User.objects.filter(username__startswith=f'{PREFIX}-'))
+
+    samples, lock = {}, threading.Lock()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        # Every round writes today's entry again, so clear the previous round's first
+        JournalEntry.objects.filter(user__in=accounts, created_at__date=timezone.now().date()).delete()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda user: _run_session(user, samples, lock), accounts))
+    elapsed = time.perf_counter() - started
+
+    results = {f'workload.{name}': summarize(values) for name, values in samples.items()}
+    throughput = round(len(accounts) * rounds / elapsed, 1)
+    return results, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--entries-per-user', type=int, default=60)
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent sessions, like gunicorn --threads')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--out', help='Write results JSON here')
+    parser.add_argument('--baseline', help='Compare against this results JSON (e.g. the other database)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    from django.test.utils import setup_test_environment
+
+    if connection.vendor == 'sqlite':
+        # A file rather than the default in-memory test database
+        name = str(connection.settings_dict['NAME'])
+        connection.settings_dict['TEST']['NAME'] = f'{name}.bench' if name != ':memory:' else '/tmp/bench.sqlite3'
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results, throughput = run(args.users, args.entries_per_user, args.threads, args.rounds)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f'{connection.vendor}: {throughput} sessions/s with {args.threads} threads\n')
+    print_results(results)
+    if args.out:
+        extra = {'vendor': connection.vendor, 'threads': args.threads, 'sessions_per_second': throughput}
+        print(f'\nSaved {save_results(args.out, results, **extra)}')
+    if args.baseline:
+        rows, regressions = compare(results, load_results(args.baseline), args.threshold)
+        print(f'\nAgainst {args.baseline}:')
+        print_comparison(rows, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Per-worker memory of gunicorn with and without preload_app.
+
+Starts gunicorn with gunicorn.conf.py twice (GUNICORN_PRELOAD=True/False)
+against a throwaway SQLite database, sends a few requests so the workers
+touch their lazy imports, lets the LLM warm-up finish, then reads
+/proc/<pid>/smaps_rollup (Linux) for the master and every worker:
+
+    rss      resident pages, shared ones counted in full
+    pss      proportional share: shared pages divided among their users
+    shared   pages also mapped by another process (copy-on-write from the master)
+    private  pages only this process has
+
+The total PSS is what the instance actually uses.
+
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --workers 4 --out bench/memory.json
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from benchmarks.harness import save_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+PATHS = ('/api/csrf/', '/api/user/', '/api/journal-entries/', '/api/bootstrap/')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def smaps(pid):
+    """
+    Memory of one process in MB, from /proc/<pid>/smaps_rollup.
+    """
+    values = {}
+    for line in Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines():
+        name, _, rest = line.partition(':')
+        if name in FIELDS:
+            values[name] = int(rest.split()[0]) / 1024
+    return {
+        'rss': round(values['Rss'], 1),
+        'pss': round(values['Pss'], 1),
+        'shared': round(values['Shared_Clean'] + values['Shared_Dirty'], 1),
+        'private': round(values['Private_Clean'] + values['Private_Dirty'], 1),
+    }
+
+
+def _children(pid):
+    return [int(child) for child in Path(f'/proc/{pid}/task/{pid}/children').read_text().split()]
+
+
+def _get(url):
+    try:
+        urllib.request.urlopen(url, timeout=10).read()
+    except urllib.error.HTTPError:
+        pass  # 401s still load the view stack
+
+
+def run(preload, workers, threads, settle, database_url):
+    port = _free_port()
+    env = {
+        **os.environ,
+        'DATABASE_URL': database_url,
+        'GUNICORN_PRELOAD': str(preload),
+        'WEB_CONCURRENCY': str(workers),
+        'GUNICORN_THREADS': str(threads),
+        'PORT': str(port),
+        'ALLOWED_HOSTS': '127.0.0.1,localhost',
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'mindfulcompanion.wsgi:application'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                _get(f'{base}/api/csrf/')
+                break
+            except OSError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.2)
+
+        # Enough requests that every worker serves some
+        for _ in range(workers * 5):
+            for path in PATHS:
+                _get(base + path)
+        time.sleep(settle)
+
+        return {
+            'master': smaps(server.pid),
+            'workers': [smaps(pid) for pid in _children(server.pid)],
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def print_report(mode, report):
+    print(f'\n{mode}')
+    print(f'  {"process":<10}{"rss":>10}{"pss":>10}{"shared":>10}{"private":>10}  (MB)')
+    rows = [('master', report['master'])] + [(f'worker {i}', stats) for i, stats in enumerate(report['workers'], 1)]
+    for name, stats in rows:
+        print(f'  {name:<10}{stats["rss"]:>10.1f}{stats["pss"]:>10.1f}{stats["shared"]:>10.1f}{stats["private"]:>10.1f}')
+    print(f'  {"total pss":<10}{report["total_pss"]:>20.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--settle', type=float, default=8.0,
+                        help='Seconds to wait after the requests (background LLM import without preload)')
+    parser.add_argument('--out', help='Write results JSON here')
+    args = parser.parse_args()
+
+    if not Path('/proc/self/smaps_rollup').exists():
+        sys.exit('Needs Linux /proc/<pid>/smaps_rollup')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f'sqlite:///{tmp}/bench.sqlite3'
+        subprocess.run(
+            [sys.executable, 'manage.py', 'migrate_on_start'],
+            cwd=BACKEND_DIR, env={**os.environ, 'DATABASE_URL': database_url}, check=True, stdout=subprocess.DEVNULL,
+        )
+        memory = {}
+        for mode, preload in (('preload', True), ('no_preload', False)):
+            report = run(preload, args.workers, args.threads, args.settle, database_url)
+            report['total_pss'] = round(report['master']['pss'] + sum(w['pss'] for w in report['workers']), 1)
+            memory[mode] = report
+            print_report(mode, report)
+
+    saved = memory['no_preload']['total_pss'] - memory['preload']['total_pss']
+    print(f'\npreload_app saves {saved:.1f} MB PSS with {args.workers} workers')
+    if args.out:
+        print(f'Saved {save_results(args.out, {}, workers=args.workers, threads=args.threads, memory=memory)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Micro-benchmarks for the hot paths of journal entry creation and reads:
+prompt building, cost calculation, serializers and the per-entry queries.
+
+    python -m benchmarks.bench_micro --rows 1000 10000 100000 --out bench/micro.json
+    python -m benchmarks.bench_micro --baseline bench/micro.json    # exits 1 on regression
+
+The same cases run under pytest (smaller sizes) when the file is named
+explicitly; set BENCHMARK_OUTPUT to save the results:
+
+    BENCHMARK_OUTPUT=bench/micro.json pytest benchmarks/bench_micro.py --no-cov
+"""
+
+import argparse
+import os
+import sys
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindfulcompanion.settings')
+django.setup()
+
+import pytest  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.llm_service import LLMService  # noqa: E402
+from api.models import AIInteraction, JournalEntry, User  # noqa: E402
+from api.serializers import JournalEntryListSerializer, JournalEntrySerializer  # noqa: E402
+from api.views import JournalEntryViewSet  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    DEFAULT_THRESHOLD, compare, load_results, measure, print_comparison,
+    print_results, save_results,
+)
+
+HELP_TYPES = [
+    'acute_validation', 'acute_skills', 'chronic_validation',
+    'chronic_education', 'max_validation', 'max_assessment',
+]
+ENTRY_CONTENT = 'Today I noticed my thoughts racing before the meeting, so I tried box breathing. ' * 40
+
+
+def make_entries(count, with_ai=True):
+    """
+    Unsaved entries with their AI interaction pre-cached, as select_related
+    would leave them, so serializer timings exclude the database.
+    """
+    now = timezone.now()
+    entries = []
+    for i in range(count):
+        entry = JournalEntry(
+            id=i + 1,
+            title=f'Entry {i + 1}',
+            content=ENTRY_CONTENT,
+            requested_help_type=HELP_TYPES[i % len(HELP_TYPES)],
+            created_at=now - timedelta(days=i),
+        )
+        entry._state.fields_cache['ai_interaction'] = AIInteraction(
+            id=i + 1,
+            journal_entry=entry,
+            claude_response='It sounds like you handled a stressful moment with real care. ' * 20,
+            context_entries_count=7,
+            tokens_used=1200,
+            api_cost=0.0123,
+            created_at=entry.created_at,
+        ) if with_ai else None
+        entries.append(entry)
+    return entries
+
+
+def bench_prompts(repeat=5):
+    service = LLMService()
+    context = [
+        {'created_at': entry.created_at, 'title': entry.title, 'content': entry.content}
+        for entry in make_entries(30, with_ai=False)
+    ]
+
+    results = {}
+    for help_type in HELP_TYPES:
+        results[f'prompt.system.{help_type}'] = measure(
+            lambda: service._build_system_prompt(help_type, 'Sam'), repeat, number=1000
+        )
+    results['prompt.user_message.30_large_entries'] = measure(
+        lambda: service._build_user_message(ENTRY_CONTENT, context), repeat, number=100
+    )
+    results['prompt.calculate_cost'] = measure(
+        lambda: service._calculate_cost(18_000, 1_500), repeat, number=10_000
+    )
+    return results
+
+
+def bench_serializers(rows, repeat=3):
+    results = {}
+    renderer = JSONRenderer()
+    for count in rows:
+        entries = make_entries(count)
+        results[f'serializer.detail.{count}_rows'] = measure(
+            lambda: renderer.render(JournalEntrySerializer(entries, many=True).data), repeat
+        )
+        results[f'serializer.list.{count}_rows'] = measure(
+            lambda: renderer.render(JournalEntryListSerializer(entries, many=True).data), repeat
+        )
+    return results
+
+
+def seed_history(username='bench', count=60):
+    """
+    A user with `count` past entries and a max_assessment entry on top.
+    """
+    user, _ = User.objects.get_or_create(username=username, defaults={'email': f'{username}@example.com'})
+    JournalEntry.objects.filter(user=user).delete()
+    now = timezone.now()
+    entries = JournalEntry.objects.bulk_create([
+        JournalEntry(user=user, title=f'Entry {i + 1}', content=ENTRY_CONTENT, requested_help_type='chronic_validation')
+        for i in range(count)
+    ])
+    # created_at is auto_now_add, so backdate after the insert
+    for i, entry in enumerate(entries):
+        JournalEntry.objects.filter(pk=entry.pk).update(created_at=now - timedelta(days=i + 1))
+    latest = JournalEntry.objects.create(user=user, content=ENTRY_CONTENT, requested_help_type='max_assessment')
+    return user, latest
+
+
+def bench_queries(repeat=5):
+    user, latest = seed_history()
+    viewset = JournalEntryViewSet()
+    return {
+        'query.get_context_entries.max_assessment': measure(
+            lambda: list(latest.get_context_entries()), repeat, number=50
+        ),
+        'query.validate_one_entry_per_day': measure(
+            lambda: viewset._validate_one_entry_per_day(user), repeat, number=50
+        ),
+    }
+
+
+def run(rows, repeat):
+    results = {}
+    results.update(bench_prompts(repeat))
+    results.update(bench_serializers(rows, max(1, repeat // 2)))
+    results.update(bench_queries(repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--out', help='Write results JSON here')
+    parser.add_argument('--baseline', help='Compare against this results JSON')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Slowdown (fraction of the baseline median) that counts as a regression')
+    args = parser.parse_args()
+
+    # The query benchmarks write rows, so run them against a throwaway test database
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = run(args.rows, args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print_results(results)
+    if args.out:
+        print(f'\nSaved {save_results(args.out, results)}')
+    if args.baseline:
+        rows, regressions = compare(results, load_results(args.baseline), args.threshold)
+        print(f'\nAgainst {args.baseline}:')
+        print_comparison(rows, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+# pytest entry points: smaller sizes, results collected into BENCHMARK_OUTPUT
+
+_collected = {}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def _save_collected():
+    yield
+    if os.getenv('BENCHMARK_OUTPUT') and _collected:
+        save_results(os.environ['BENCHMARK_OUTPUT'], _collected)
+
+
+def test_prompt_building():
+    results = bench_prompts(repeat=3)
+    _collected.update(results)
+    assert all(stats['median_us'] > 0 for stats in results.values())
+
+
+def test_serializers():
+    results = bench_serializers([1_000], repeat=1)
+    _collected.update(results)
+    assert results['serializer.list.1000_rows']['median_us'] < results['serializer.detail.1000_rows']['median_us']
+
+
+@pytest.mark.django_db
+def test_queries():
+    results = bench_queries(repeat=3)
+    _collected.update(results)
+    assert set(results) == {'query.get_context_entries.max_assessment', 'query.validate_one_entry_per_day'}
+
+
+if __name__ == '__main__':
+    main()
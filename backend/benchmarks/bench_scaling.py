@@ -0,0 +1,170 @@
+"""
+API latency and query plans as the database grows.
+
+For each tier (USERSxENTRIES_PER_USER) the generate_data command fills a test
+database, then list, retrieve, context and create are timed through the full
+Django stack for a sample of users, and EXPLAIN output is captured for the
+queries behind them.
+
+    python -m benchmarks.bench_scaling --tiers 100x30 1000x100 --out bench/scaling.json
+    DATABASE_URL=postgres://... python -m benchmarks.bench_scaling --tiers 10000x1000 --keepdb
+
+Tiers are cumulative: each one adds users on top of the previous tier's rows.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindfulcompanion.settings')
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from api.models import JournalEntry, User  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    DEFAULT_THRESHOLD, compare, load_results, print_comparison, print_results,
+    save_results, summarize,
+)
+
+PREFIX = 'synthetic'
+
+
+def parse_tier(value):
+    try:
+        users, entries = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected USERSxENTRIES, got {value!r}')
+    return users, entries
+
+
+def _explain(queryset):
+    options = {'analyze': True, 'buffers': True} if connection.vendor == 'postgresql' else {}
+    return queryset.explain(**options)
+
+
+def _timed_requests(client, users, request):
+    samples = []
+    for user in users:
+        client.force_authenticate(user=user)
+        started = time.perf_counter()
+        response = request(client, user)
+        samples.append((time.perf_counter() - started) * 1_000_000)
+        assert response.status_code < 400, response.status_code
+    return summarize(samples)
+
+
+def measure_tier(sample_size):
+    """
+    Time the journal endpoints for `sample_size` generated users.
+    """
+    users = list(User.objects.filter(username__startswith=f'{PREFIX}-').order_by('?')[:sample_size])
+    latest = {
+        user.pk: JournalEntry.objects.filter(user=user).order_by('-created_at').values_list('pk', flat=True).first()
+        for user in users
+    }
+    users = [user for user in users if latest[user.pk]]
+    if not users:
+        raise SystemExit('No generated users with entries; is the tier empty?')
+
+    # Create needs a free day; today's generated entries move back a year
+    JournalEntry.objects.filter(user__in=users, created_at__date=timezone.now().date()).update(
+        created_at=timezone.now() - timedelta(days=365)
+    )
+
+    client = APIClient()
+    results = {
+        'list': _timed_requests(client, users, lambda c, u: c.get('/api/journal-entries/')),
+        'retrieve': _timed_requests(client, users, lambda c, u: c.get(f'/api/journal-entries/{latest[u.pk]}/')),
+        'context': _timed_requests(
+            client, users, lambda c, u: c.get(f'/api/journal-entries/{latest[u.pk]}/context_entries/')
+        ),
+        'create': _timed_requests(client, users, lambda c, u: c.post(
+            '/api/journal-entries/', {'content': 'Benchmark entry', 'requested_help_type': 'save_only'}
+        )),
+    }
+    JournalEntry.objects.filter(user__in=users, content='Benchmark entry').delete()
+
+    user = users[0]
+    entry = JournalEntry.objects.get(pk=latest[user.pk])
+    entry.requested_help_type = 'max_assessment'
+    plans = {
+        'list': _explain(JournalEntry.objects.filter(user=user).order_by('-created_at')),
+        'retrieve': _explain(JournalEntry.objects.filter(user=user, pk=entry.pk)),
+        'context': _explain(entry.get_context_entries()),
+        'create_one_per_day_check': _explain(
+            JournalEntry.objects.filter(user=user, created_at__date=timezone.now().date())
+        ),
+    }
+    return results, plans
+
+
+def run(tiers, sample_size):
+    results, plans = {}, {}
+    generated = 0
+    for users, per_user in tiers:
+        tier = f'{users}x{per_user}'
+        started = time.monotonic()
+        call_command(
+            'generate_data', users=users - generated, entries_per_user=per_user,
+            prefix=PREFIX, seed=users, stdout=io.StringIO()
+        )
+        generated = max(generated, users)
+        print(f'{tier}: generated in {time.monotonic() - started:.1f}s '
+              f'({JournalEntry.objects.count():,} entries total)')
+
+        tier_results, plans[tier] = measure_tier(sample_size)
+        for name, stats in tier_results.items():
+            results[f'{tier}.{name}'] = stats
+    return results, plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tiers', type=parse_tier, nargs='+', default=[(100, 30), (1000, 100)],
+                        help='USERSxENTRIES_PER_USER, smallest first')
+    parser.add_argument('--sample', type=int, default=20, help='Users timed per tier')
+    parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs')
+    parser.add_argument('--plans', action='store_true', help='Print query plans')
+    parser.add_argument('--out', help='Write results and plans JSON here')
+    parser.add_argument('--baseline', help='Compare against this results JSON')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=args.keepdb)
+    try:
+        if args.keepdb:
+            User.objects.filter(username__startswith=f'{PREFIX}-').delete()
+        results, plans = run(sorted(args.tiers), args.sample)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+
+    print()
+    print_results(results)
+    if args.plans:
+        for tier, tier_plans in plans.items():
+            for name, plan in tier_plans.items():
+                print(f'\n-- {tier} {name}\n{plan}')
+    if args.out:
+        print(f'\nSaved {save_results(args.out, results, plans=plans)}')
+    if args.baseline:
+        rows, regressions = compare(results, load_results(args.baseline), args.threshold)
+        print(f'\nAgainst {args.baseline}:')
+        print_comparison(rows, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-row cost of the journal list payload: DRF serializer + JSONRenderer
+versus the .values() fast path + ORJSONRenderer.
+
+    python -m benchmarks.bench_serialization --rows 10000
+"""
+
+import argparse
+import os
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindfulcompanion.settings')
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.models import JournalEntry  # noqa: E402
+from api.renderers import ORJSONRenderer  # noqa: E402
+from api.serializers import (  # noqa: E402
+    CONTENT_PREVIEW_LENGTH, JournalEntryListSerializer, serialize_entry_rows,
+)
+
+
+def make_entries(count):
+    now = timezone.now()
+    content = 'Today I noticed my thoughts racing before the meeting. ' * 20
+    return [
+        JournalEntry(
+            id=i + 1,
+            title=f'Entry {i + 1}',
+            content=content,
+            requested_help_type='chronic_validation',
+            created_at=now - timedelta(days=i),
+        )
+        for i in range(count)
+    ]
+
+
+def as_rows(entries):
+    # What .values() hands the fast path (content truncated in SQL)
+    return [
+        {
+            'id': e.id,
+            'title': e.title,
+            'content_head': e.content[:CONTENT_PREVIEW_LENGTH + 1],
+            'requested_help_type': e.requested_help_type,
+            'created_at': e.created_at,
+        }
+        for e in entries
+    ]
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(rows, repeat):
+    entries = make_entries(rows)
+    values_rows = as_rows(entries)
+
+    def before():
+        return JSONRenderer().render(JournalEntryListSerializer(entries, many=True).data)
+
+    def after():
+        return ORJSONRenderer().render(serialize_entry_rows(values_rows))
+
+    assert before() == after(), 'fast path output differs from the serializer'
+
+    results = {}
+    for name, fn in (('serializer+json', before), ('values+orjson', after)):
+        seconds = best_of(repeat, fn)
+        results[name] = seconds / rows * 1_000_000
+        print(f'{name:>16}: {results[name]:8.2f} us/row  ({seconds * 1000:.1f} ms for {rows} rows)')
+    print(f'{"speedup":>16}: {results["serializer+json"] / results["values+orjson"]:8.1f}x')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Timing, JSON results and regression checks shared by the benchmark modules.
+
+A results file looks like
+
+    {"meta": {...}, "results": {"<name>": {"median_us": ..., "min_us": ..., ...}}}
+
+and compare() flags every benchmark whose median got slower than the
+baseline by more than the given fraction.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_THRESHOLD = 0.20
+
+
+def measure(fn, repeat=5, number=1):
+    """
+    Time fn() `number` times per round for `repeat` rounds.
+    Returns per-call timings in microseconds.
+    """
+    fn()  # warm caches, lazy imports, query compilation
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number * 1_000_000)
+    return summarize(rounds, number)
+
+
+def summarize(samples_us, number=1):
+    """
+    Stats for already-collected per-call timings in microseconds.
+    """
+    return {
+        'median_us': round(statistics.median(samples_us), 3),
+        'min_us': round(min(samples_us), 3),
+        'max_us': round(max(samples_us), 3),
+        'repeat': len(samples_us),
+        'number': number,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(path, results, **extra):
+    """
+    Write results plus run metadata; extra keys (e.g. query plans) are stored
+    alongside but ignored by compare().
+    """
+    payload = {
+        **extra,
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+    return path
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text())['results']
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns (name, baseline_us, current_us, change) for every benchmark present
+    in both runs, and the subset that regressed by more than `threshold`.
+    """
+    rows = []
+    for name in sorted(current.keys() & baseline.keys()):
+        before = baseline[name]['median_us']
+        after = current[name]['median_us']
+        change = (after - before) / before if before else 0.0
+        rows.append((name, before, after, change))
+    regressions = [row for row in rows if row[3] > threshold]
+    return rows, regressions
+
+
+def print_results(results, stream=sys.stdout):
+    width = max((len(name) for name in results), default=0)
+    for name, stats in results.items():
+        stream.write(f'{name:<{width}}  {stats["median_us"]:>14,.2f} us  (min {stats["min_us"]:,.2f})\n')
+
+
+def print_comparison(rows, threshold, stream=sys.stdout):
+    width = max((len(row[0]) for row in rows), default=0)
+    for name, before, after, change in rows:
+        flag = '  REGRESSION' if change > threshold else ''
+        stream.write(f'{name:<{width}}  {before:>14,.2f} -> {after:>14,.2f} us  {change:+7.1%}{flag}\n')
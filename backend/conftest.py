@@ -4,6 +4,7 @@ from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
+from types import SimpleNamespace
 
 @pytest.fixture
 def api_client():
@@ -93,4 +94,32 @@ def multiple_journal_entries(user):
         entry.refresh_from_db()
         entries.append(entry)
 
-    return entries
\ No newline at end of file
+    return entries
+
+@pytest.fixture
+def backdated_entry():
+    """
+    Creates a chronic_validation entry dated `days_ago` days back
+    (created_at is auto_now_add, so it's updated after the insert).
+    """
+    def create(user, content, days_ago):
+        entry = JournalEntry.objects.create(user=user, content=content, requested_help_type='chronic_validation')
+        JournalEntry.objects.filter(pk=entry.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return entry
+    return create
+
+@pytest.fixture
+def fake_response():
+    """
+    Builds a LiteLLM-shaped completion response for patching api.llm_service._completion.
+    """
+    def build(text='Hello', prompt_tokens=1000, completion_tokens=200):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+    return build
@@ -10,7 +10,7 @@ until pg_isready -h "$POSTGRES_HOST" -p "$POSTGRES_PORT" -U "$POSTGRES_USER"; do
 done
 
 echo "PostgreSQL is up - running migrations"
-python manage.py migrate --noinput
+python manage.py migrate_on_start
 
 echo "Starting Gunicorn..."
-exec gunicorn --bind 0.0.0.0:8000 --workers 3 mindfulcompanion.wsgi:application
+exec gunicorn -c gunicorn.conf.py mindfulcompanion.wsgi:application
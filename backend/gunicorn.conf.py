@@ -0,0 +1,142 @@
+"""
+Gunicorn configuration (gunicorn -c gunicorn.conf.py mindfulcompanion.wsgi:application).
+
+The app is imported once in the master (preload_app) and workers fork from
+it, so Django, allauth, DRF and litellm pages are shared copy-on-write
+instead of imported per worker. `python -m benchmarks.bench_memory` shows
+the per-worker RSS and shared pages with and without it.
+
+Workers and threads follow the container's CPU and memory limits (cgroup v2
+or v1, else the host): two workers per CPU, fewer if GUNICORN_WORKER_MEMORY_MB
+each on top of GUNICORN_BASE_MEMORY_MB doesn't fit, and GUNICORN_THREADS_PER_CPU
+threads per CPU split between them, since requests mostly wait on the LLM.
+SQLite (DATABASE_URL=sqlite:...) gets one worker: it has a single writer.
+WEB_CONCURRENCY and GUNICORN_THREADS override the computed counts.
+
+Fork safety: the master closes its DB connections and pools before forking
+and imports litellm up front; each worker then drops the pools and LLM HTTP
+clients it inherited (post_fork). mindfulcompanion.log.AsyncHandler restarts
+its listener thread in each worker by itself.
+"""
+
+import gc
+import math
+import os
+import sys
+from pathlib import Path
+
+# bench_memory measured ~36 MB private per idle preloaded worker and ~210 MB for
+# the master and shared pages; the worker figure leaves room for requests in flight
+GUNICORN_WORKER_MEMORY_MB = int(os.getenv('GUNICORN_WORKER_MEMORY_MB', '100'))
+GUNICORN_BASE_MEMORY_MB = int(os.getenv('GUNICORN_BASE_MEMORY_MB', '220'))
+GUNICORN_THREADS_PER_CPU = int(os.getenv('GUNICORN_THREADS_PER_CPU', '8'))
+
+
+def _read(path):
+    try:
+        return Path(path).read_text().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit():
+    """
+    CPUs available to this container: the cgroup quota if there is one.
+    """
+    quota = _read('/sys/fs/cgroup/cpu.max')  # v2: '<quota> <period>' or 'max <period>'
+    if quota and not quota.startswith('max'):
+        limit, period = quota.split()
+        return int(limit) / int(period)
+
+    limit, period = _read('/sys/fs/cgroup/cpu/cpu.cfs_quota_us'), _read('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    if limit and period and int(limit) > 0:
+        return int(limit) / int(period)
+
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+
+def memory_limit_mb():
+    """
+    The container's memory limit in MB, or None when unlimited/unknown.
+    """
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        value = _read(path)
+        # v1 reports "unlimited" as a number near 2**63
+        if value and value.isdigit() and int(value) < 1 << 60:
+            return int(value) // (1024 * 1024)
+    return None
+
+
+def worker_count(cpus, memory_mb, sqlite=False):
+    if sqlite:
+        return 1
+    by_cpu = max(1, round(cpus * 2))
+    if memory_mb is None:
+        return by_cpu
+    return max(1, min(by_cpu, (memory_mb - GUNICORN_BASE_MEMORY_MB) // GUNICORN_WORKER_MEMORY_MB))
+
+
+def thread_count(cpus, workers):
+    return max(2, math.ceil(cpus * GUNICORN_THREADS_PER_CPU / workers))
+
+
+_cpus = cpu_limit()
+_sqlite = os.getenv('DATABASE_URL', '').startswith('sqlite')
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+workers = int(os.getenv('WEB_CONCURRENCY') or worker_count(_cpus, memory_limit_mb(), _sqlite))
+threads = int(os.getenv('GUNICORN_THREADS') or thread_count(_cpus, workers))
+worker_class = 'gthread'
+# For settings.OVERLOAD_INFLIGHT_STEPS; set before the app is preloaded
+raw_env = [f'GUNICORN_WORKER_THREADS={threads}']
+# Heartbeat files on tmpfs; the container's overlay filesystem can stall them
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def _close_pools():
+    # Only when the pooled backend is in use; importing it would pull in psycopg_pool
+    if 'mindfulcompanion.db.postgresql_pool.base' in sys.modules:
+        from mindfulcompanion.db.postgresql_pool.base import close_pools
+        close_pools()
+
+
+def when_ready(server):
+    """
+    Master, after the preloaded app is imported and before the first fork.
+    """
+    if not server.cfg.preload_app:
+        return
+
+    from django.conf import settings
+    from django.db import connections
+
+    if settings.LLM_WARMUP:
+        # In the master, so workers share it (and don't fork mid-import)
+        from api.llm_service import warm_up
+        warm_up(background=False)
+
+    # Nothing open for the workers to inherit
+    connections.close_all()
+    _close_pools()
+
+    # Move everything imported so far out of the collector's reach, so
+    # collections in the workers don't write to (and copy) those pages
+    gc.collect()
+    gc.freeze()
+    server.log.info('Preloaded app; forking %s workers x %s threads', server.cfg.workers, server.cfg.threads)
+
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+
+    from api.llm_service import reset_after_fork
+
+    # Pools keyed to the master's pid are dropped without closing its sockets
+    _close_pools()
+    reset_after_fork()
+
+
+def worker_exit(server, worker):
+    _close_pools()
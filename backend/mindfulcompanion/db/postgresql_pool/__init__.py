@@ -0,0 +1,6 @@
+"""
+PostgreSQL backend that borrows connections from an in-process psycopg pool.
+
+Set ENGINE to 'mindfulcompanion.db.postgresql_pool' and configure the pool
+under DATABASES[alias]['OPTIONS']['pool'].
+"""
@@ -0,0 +1,177 @@
+"""
+Pooled PostgreSQL database backend.
+
+Django's stock backend opens one connection per thread and, with
+conn_health_checks, pings it before every request. This backend instead
+borrows connections from a bounded psycopg_pool.ConnectionPool shared by all
+threads of the process and hands them back when Django closes the connection
+at the end of each request. Idle connections are verified by a background
+thread, so nothing on the request path waits on a health-check round trip.
+
+Pool settings live in DATABASES[alias]['OPTIONS']['pool'], see
+DEFAULT_POOL_OPTIONS. Keep CONN_MAX_AGE at 0 so every request returns its
+connection to the pool.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.utils.asyncio import async_unsafe
+from psycopg_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_POOL_OPTIONS = {
+    'min_size': 1,
+    'max_size': 4,
+    'timeout': 10.0,          # seconds a request may wait for a free connection
+    'max_idle': 300.0,        # Neon suspends idle computes after ~5 minutes
+    'max_lifetime': 3600.0,
+    'check_interval': 30.0,   # seconds between background health checks
+}
+
+# (alias, dbname, pid) -> _PooledConnections. The pid makes forked workers
+# build their own pool instead of sharing sockets inherited from the parent.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class _PooledConnections:
+    """
+    A ConnectionPool plus the thread that health-checks its idle connections.
+    """
+
+    def __init__(self, alias, conn_params, options):
+        options = {**DEFAULT_POOL_OPTIONS, **options}
+        self.alias = alias
+        self.check_interval = options.pop('check_interval')
+        self.health_checks = 0
+        self.health_check_errors = 0
+        self.last_health_check_ms = None
+
+        self.pool = ConnectionPool(
+            kwargs=conn_params,
+            name=alias,
+            open=True,
+            **options
+        )
+
+        self._stop = threading.Event()
+        self._checker = threading.Thread(
+            target=self._run_health_checks,
+            name=f'db-pool-health-{alias}',
+            daemon=True
+        )
+        self._checker.start()
+
+    def _run_health_checks(self):
+        while not self._stop.wait(self.check_interval):
+            started = time.monotonic()
+            try:
+                # Tests every idle connection and replaces the broken ones
+                self.pool.check()
+            except Exception as e:
+                self.health_check_errors += 1
+                logger.warning("Database pool health check failed for alias=%s: %s", self.alias, e)
+            self.health_checks += 1
+            self.last_health_check_ms = round((time.monotonic() - started) * 1000, 2)
+
+    def close(self):
+        self._stop.set()
+        self.pool.close()
+
+    def get_stats(self):
+        stats = self.pool.get_stats()
+        stats.update({
+            'health_checks': self.health_checks,
+            'health_check_errors': self.health_check_errors,
+            'last_health_check_ms': self.last_health_check_ms,
+        })
+        return stats
+
+
+def _get_pool(alias, conn_params, options):
+    key = (alias, conn_params.get('dbname'), os.getpid())
+    pooled = _pools.get(key)
+    if pooled is None:
+        with _pools_lock:
+            pooled = _pools.get(key)
+            if pooled is None:
+                pooled = _PooledConnections(alias, conn_params, options)
+                _pools[key] = pooled
+    return pooled.pool
+
+
+def get_pool_stats():
+    """
+    Returns pool metrics for this process, keyed by database alias.
+    """
+    pid = os.getpid()
+    return {
+        alias: pooled.get_stats()
+        for (alias, _dbname, key_pid), pooled in list(_pools.items())
+        if key_pid == pid
+    }
+
+
+def close_pools():
+    """
+    Close every pool owned by this process (e.g. on worker shutdown).
+    Pools inherited from a parent process are dropped without closing, since
+    their sockets still belong to the parent.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        for key, pooled in list(_pools.items()):
+            if key[2] == pid:
+                pooled.close()
+            del _pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL wrapper whose connect/close borrow from and return to a pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = None
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        # The test runner's "no database" connection is short-lived; don't pool it
+        if self.alias == NO_DB_ALIAS:
+            self._pool = None
+            return super().get_new_connection(conn_params)
+
+        options = self.settings_dict['OPTIONS']
+        self._pool = _get_pool(self.alias, conn_params, options.get('pool', {}))
+        connection = self._pool.getconn()
+
+        isolation_level = options.get('isolation_level')
+        if isolation_level is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            self.isolation_level = IsolationLevel(isolation_level)
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None or self._pool is None:
+            return super()._close()
+
+        # putconn rolls back any open transaction and discards broken connections
+        with self.wrap_database_errors:
+            pool, self._pool = self._pool, None
+            pool.putconn(self.connection)
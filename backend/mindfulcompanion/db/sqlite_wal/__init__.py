@@ -0,0 +1,6 @@
+"""
+SQLite backend tuned for single-node production use (WAL, BEGIN IMMEDIATE).
+
+Selected automatically for sqlite DATABASE_URLs; pragmas are configured under
+DATABASES[alias]['OPTIONS']['pragmas'].
+"""
@@ -0,0 +1,196 @@
+"""
+Structured, non-blocking logging (wired up by settings.LOGGING).
+
+Request threads only filter and enqueue: AsyncHandler puts each record on a
+bounded in-memory queue and a background listener thread formats and writes
+it. As with the stdlib QueueHandler, the logging thread resolves the message
+(%-interpolation) and traceback text before enqueueing, so later changes to
+the arguments can't reach the line and no frames are kept alive; JSON
+encoding and I/O happen on the listener. If the queue fills up because the
+sink is stalled, records are dropped and counted rather than blocking a
+request (get_stats(), GET /api/metrics/logging/).
+
+Every record carries the id of the request it was logged under
+(RequestIdMiddleware binds it; X-Request-ID is honored and echoed back), so
+a view's lines and LLMService's lines for the same request can be joined.
+Anything passed with `extra=` becomes a top-level field of the JSON line.
+
+SamplingFilter keeps a fraction of INFO-and-below records per logger
+(LOG_SAMPLING); warnings and errors are always kept.
+"""
+
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import weakref
+from datetime import datetime, timezone
+
+_request_id = contextvars.ContextVar('request_id', default='-')
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+# Plain traceback text for AsyncHandler.prepare, whatever the sink's formatter
+_exception_formatter = logging.Formatter()
+_handlers = weakref.WeakSet()
+
+
+def bind_request_id(value):
+    return _request_id.set(value)
+
+
+def unbind_request_id(token):
+    _request_id.reset(token)
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def _extras(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Stamps the current request id on the record. Runs on the thread that
+    logged it, before the record leaves for the listener.
+    """
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep `rate` (0-1) of INFO-and-below records from the loggers in `rates`,
+    matched by name or by the nearest configured parent.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+
+    def filter(self, record):
+        if not self.rates or record.levelno > logging.INFO:
+            return True
+        name = record.name
+        while name:
+            if name in self.rates:
+                return random.random() < self.rates[name]
+            name = name.rpartition('.')[0]
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger, request_id, message, any
+    extra= fields and, for exceptions, the formatted traceback.
+    """
+
+    def format(self, record):
+        line = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': record.getMessage(),
+            **_extras(record),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line['exc'] = record.exc_text
+        return json.dumps(line, default=str)
+
+
+class PlainFormatter(logging.Formatter):
+    """
+    Human-readable lines for local development, extras appended as key=value.
+    """
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record):
+        record.request_id = getattr(record, 'request_id', '-')
+        text = super().format(record)
+        extras = ' '.join(f'{key}={json.dumps(value, default=str)}' for key, value in _extras(record).items())
+        return f'{text} {extras}' if extras else text
+
+
+class AsyncHandler(logging.handlers.QueueHandler):
+    """
+    Queue in front of a StreamHandler that a listener thread drains.
+    'formatter' in the handler config applies to the writing handler.
+    """
+
+    def __init__(self, stream=None, maxsize=10_000):
+        super().__init__(None)
+        self.target = logging.StreamHandler(stream)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._start()
+        _handlers.add(self)
+
+    def _start(self):
+        self._pid = os.getpid()
+        # A fresh queue too: the parent's may have been locked mid-put at fork
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = logging.handlers.QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Like the stdlib QueueHandler, but without running the sink's formatter
+        # here: only the message and traceback text are resolved
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            # Forked (gunicorn --preload): the listener thread stayed in the parent
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._start()
+        super().emit(record)
+
+    def close(self):
+        # Drains what's queued before the process exits (logging.shutdown)
+        if self._pid == os.getpid() and self.listener._thread is not None:
+            self.listener.stop()
+        self.target.close()
+        super().close()
+
+
+def get_stats():
+    """
+    Queue depth and dropped-record count of each AsyncHandler in this process.
+    """
+    return [
+        {'queued': handler.queue.qsize(), 'maxsize': handler.maxsize, 'dropped': handler.dropped}
+        for handler in list(_handlers)
+    ]
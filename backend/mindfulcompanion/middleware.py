@@ -1,4 +1,29 @@
+import logging
+import random
+import re
+import time
+import uuid
+import zlib
+from contextlib import ExitStack
+
+import brotli
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import connections
 from django.http import HttpResponsePermanentRedirect
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import log, profiling, querystats, timing
+from .spa import is_vite_hashed_asset
+
+logger = logging.getLogger(__name__)
 
 
 class WwwRedirectMiddleware:
@@ -14,3 +39,340 @@ class WwwRedirectMiddleware:
                 f"{request.scheme}://{host[4:]}{request.get_full_path()}"
             )
         return self.get_response(request)
+
+
+# Accepted from X-Request-ID as is; anything else gets a fresh id
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    """
+    Bind a request id for mindfulcompanion.log: the caller's X-Request-ID
+    (e.g. from the load balancer) if it looks sane, otherwise a new one.
+    Echoed back in the response's X-Request-ID.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.headers.get('X-Request-ID', '')
+        request.id = incoming if _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = log.bind_request_id(request.id)
+        try:
+            response = self.get_response(request)
+        finally:
+            log.unbind_request_id(token)
+        response['X-Request-ID'] = request.id
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Per-request phase breakdown as one structured log line, and as a
+    Server-Timing header for staff (or with DEBUG): the timings and query
+    counts aren't for every client. DB time and query count come from
+    connection.execute_wrapper; other phases (prompt, llm_ttfb, llm,
+    serialize) are recorded by the code that runs them via
+    mindfulcompanion.timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings, token = timing.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self._time_query))
+                response = self.get_response(request)
+        finally:
+            timing.stop(token)
+
+        total_ms = timings.total_ms()
+        if settings.DEBUG or getattr(getattr(request, 'user', None), 'is_staff', False):
+            response['Server-Timing'] = self._header(timings, total_ms)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info('request_timing %s %s %s', request.method, request.path, response.status_code, extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 2),
+                'phases': {
+                    name: {'ms': round(ms, 2), 'count': count}
+                    for name, (ms, count) in timings.phases.items()
+                },
+            })
+        return response
+
+    @staticmethod
+    def _time_query(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            timing.record('db', time.perf_counter() - started)
+
+    @staticmethod
+    def _header(timings, total_ms):
+        metrics = []
+        for name, (ms, count) in timings.phases.items():
+            metric = f'{name};dur={ms:.1f}'
+            if name == 'db':
+                metric += f';desc="{count} queries"'
+            metrics.append(metric)
+        metrics.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(metrics)
+
+
+class QueryStatsMiddleware:
+    """
+    Feeds every query a request runs into mindfulcompanion.querystats,
+    labelled with the view that ran it. Queries before URL resolution
+    (session and auth lookups) are counted under '-'.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = querystats.bind_view(None)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(querystats.capture))
+                response = self.get_response(request)
+        finally:
+            querystats.unbind_view(token)
+        querystats.record_request(request.resolver_match.view_name if request.resolver_match else '-')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        querystats.bind_view(request.resolver_match.view_name if request.resolver_match else view_func.__name__)
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in sampling profiler for live traffic (see mindfulcompanion.profiling).
+
+    A request is profiled when any of these hold:
+    - its view name is in PROFILING_VIEWS
+    - it wins the 1-in-PROFILING_SAMPLE_RATE draw (0 disables sampling)
+    - a staff user sends 'X-Profile: 1' ('X-Profile: alloc' adds tracemalloc)
+    Must come after AuthenticationMiddleware for the staff header check.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            profiling.end(profile, request._profile_token)
+            try:
+                path = profile.write(settings.PROFILING_DIR)
+                logger.info("Wrote request profile %s", path)
+            except OSError as e:
+                logger.warning("Could not write request profile: %s", e)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name if request.resolver_match else view_func.__name__
+        header = request.META.get('HTTP_X_PROFILE')
+
+        track_allocations = settings.PROFILING_TRACEMALLOC
+        if header and request.user.is_staff:
+            track_allocations = track_allocations or header == 'alloc'
+        elif not (
+            view_name in settings.PROFILING_VIEWS
+            or (settings.PROFILING_SAMPLE_RATE and random.randrange(settings.PROFILING_SAMPLE_RATE) == 0)
+        ):
+            return None
+
+        request._profile, request._profile_token = profiling.begin(
+            view_name, settings.PROFILING_INTERVAL, track_allocations
+        )
+        return None
+
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'application/x-ndjson')
+
+
+def _negotiate_encoding(accept_encoding):
+    """
+    'br' or 'gzip' (brotli preferred) if the Accept-Encoding header allows it, else None.
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+
+    wildcard = accepted.get('*', 0.0)
+    best = None
+    for coding in ('br', 'gzip'):
+        quality = accepted.get(coding, wildcard)
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (coding, quality)
+    return best[0] if best else None
+
+
+def _compressor(encoding):
+    """
+    Returns (compress(chunk) -> bytes flushed so far, finish() -> trailing bytes).
+    Each chunk is flushed so streamed events reach the client as they're written.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+class CompressionMiddleware:
+    """
+    Brotli or gzip for API responses, negotiated from Accept-Encoding.
+
+    Only paths under COMPRESSION_PATH_PREFIX are touched (WhiteNoise serves
+    precompressed static files). Bodies under COMPRESSION_MIN_SIZE stay as they
+    are; streaming responses (event streams, exports) are compressed chunk by
+    chunk. Responses from requests that issued a CSRF token are never
+    compressed, so the token can't be recovered through compressed sizes (BREACH).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if not self._is_candidate(request, response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = _negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compress, finish = _compressor(encoding)
+        if response.streaming:
+            response.streaming_content = self._compress_stream(response.streaming_content, compress, finish)
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content) + finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The representation changed, so a strong ETag would now be wrong
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _is_candidate(request, response):
+        if not request.path.startswith(settings.COMPRESSION_PATH_PREFIX):
+            return False
+        if response.has_header('Content-Encoding') or response.status_code in (204, 206, 304):
+            return False
+        if getattr(response, 'is_async', False):
+            return False
+        if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+            return False
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return False
+        return response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+    @staticmethod
+    def _compress_stream(chunks, compress, finish):
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compress(chunk)
+            if data:
+                yield data
+        yield finish()
+
+
+class ImmutableAssetsWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also treats Vite's hashed /assets/* files as immutable,
+    with a one-year max-age for all immutable files.
+    """
+    FOREVER = 365 * 24 * 60 * 60
+
+    def immutable_file_test(self, path, url):
+        return is_vite_hashed_asset(url) or super().immutable_file_test(path, url)
+
+
+def _user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """Drop a user from the auth cache; called from api.signals on every user write/login/logout."""
+    caches[settings.AUTH_CACHE_ALIAS].delete(_user_cache_key(user_id))
+
+
+def get_cached_user(request):
+    """
+    django.contrib.auth.get_user, but the user row comes from the shared cache.
+
+    A cached user is only trusted when the session's auth hash still matches it;
+    anything else (password changed, fallback secrets, flushing) is handed to
+    Django's own get_user against a fresh row.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    cache = caches[settings.AUTH_CACHE_ALIAS]
+    key = _user_cache_key(user_id)
+    user = cache.get(key)
+
+    if user is not None:
+        session_hash = request.session.get(auth.HASH_SESSION_KEY)
+        if session_hash and constant_time_compare(session_hash, user.get_session_auth_hash()):
+            return user
+        cache.delete(key)
+
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, user, settings.AUTH_CACHE_TIMEOUT)
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Drop-in for AuthenticationMiddleware that resolves request.user through
+    get_cached_user. Pair with the cached_db session engine so neither the
+    session nor the user costs a query on a warm request.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+
+        def get_user():
+            if not hasattr(request, '_cached_user'):
+                request._cached_user = get_cached_user(request)
+            return request._cached_user
+
+        request.user = SimpleLazyObject(get_user)
@@ -0,0 +1,163 @@
+"""
+On-demand profiling of live requests, driven by ProfilingMiddleware.
+
+A profiled request gets a StackSampler: a daemon thread that snapshots the
+request thread's stack every PROFILING_INTERVAL seconds via
+sys._current_frames(). Samples are written in the collapsed/folded format
+("outer;inner;leaf count" per line) that flamegraph.pl, speedscope and
+inferno read directly. With allocation tracking on, a tracemalloc snapshot
+diff is written next to it.
+
+Files are named '<view>__<help_type>__<timestamp>_<pid>_<seq>.folded' so
+`manage.py aggregate_profiles` can filter and merge them by label.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_sequence = itertools.count()
+_tracemalloc_lock = threading.Lock()
+
+_UNSAFE_LABEL_CHARS = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def label_slug(value):
+    """
+    Filename-safe form of a label ('admin:index' -> 'admin-index').
+    """
+    return _UNSAFE_LABEL_CHARS.sub('-', value)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    # Keep paths short and stable across hosts: site-packages/x/y.py -> x/y.py
+    for marker in ('site-packages' + os.sep, 'dist-packages' + os.sep):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+
+
+class StackSampler:
+    """
+    Statistical profiler for one thread.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+
+class RequestProfile:
+    """
+    Sampler + optional tracemalloc snapshot + labels for one profiled request.
+    """
+
+    def __init__(self, view_name, interval, track_allocations):
+        self.labels = {'view': view_name, 'help_type': 'none'}
+        self.sampler = StackSampler(threading.get_ident(), interval)
+        self.track_allocations = False
+        self.allocations = None
+        self._baseline = None
+
+        if track_allocations:
+            # tracemalloc is process-wide; only the first concurrent profile owns it
+            with _tracemalloc_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self.track_allocations = True
+            if self.track_allocations:
+                self._baseline = tracemalloc.take_snapshot()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.sampler.start()
+
+    def stop(self):
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+
+        if self.track_allocations:
+            snapshot = tracemalloc.take_snapshot()
+            with _tracemalloc_lock:
+                tracemalloc.stop()
+            self.allocations = snapshot.compare_to(self._baseline, 'lineno')
+
+    def write(self, directory):
+        """
+        Write the .folded stacks (and .alloc.json) and return the .folded path.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        view, help_type = label_slug(self.labels['view']), label_slug(self.labels['help_type'])
+        stem = f'{view}__{help_type}__{time.strftime("%Y%m%dT%H%M%S")}_{os.getpid()}_{next(_sequence)}'
+
+        path = directory / f'{stem}.folded'
+        path.write_text(''.join(f'{stack} {count}\n' for stack, count in self.sampler.samples.items()))
+
+        if self.allocations is not None:
+            (directory / f'{stem}.alloc.json').write_text(json.dumps({
+                'labels': {'view': view, 'help_type': help_type},
+                'elapsed_ms': round(self.elapsed * 1000, 2),
+                'top': [
+                    {
+                        'location': str(stat.traceback[0]),
+                        'size_diff': stat.size_diff,
+                        'count_diff': stat.count_diff,
+                    }
+                    for stat in self.allocations[:50]
+                ],
+            }, indent=2))
+        return path
+
+
+def begin(view_name, interval, track_allocations=False):
+    profile = RequestProfile(view_name, interval, track_allocations)
+    token = _current.set(profile)
+    profile.start()
+    return profile, token
+
+
+def end(profile, token):
+    profile.stop()
+    _current.reset(token)
+
+
+def tag(**labels):
+    """
+    Attach labels (e.g. help_type) to the current request's profile, if any.
+    """
+    profile = _current.get()
+    if profile is not None:
+        profile.labels.update({key: str(value) for key, value in labels.items() if value})
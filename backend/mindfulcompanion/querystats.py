@@ -0,0 +1,215 @@
+"""
+Per-process SQL statistics, collected by QueryStatsMiddleware.
+
+Every query a request runs goes through connection.execute_wrapper and is
+reduced to a fingerprint: literals and IN lists become '?' and whitespace is
+collapsed, so "WHERE id IN (%s, %s)" and "WHERE id IN (%s)" count as one
+statement. Counts and latency are kept per fingerprint and per view
+(resolver view name, e.g. 'journal-entry-list').
+
+A query slower than QUERY_SLOW_MS is logged with its EXPLAIN plan (SELECTs
+only, at most once per fingerprint every QUERY_EXPLAIN_INTERVAL seconds, so
+a slow statement on a hot path doesn't double its own load). The latest
+plan is kept with the fingerprint for the staff report.
+"""
+
+import contextvars
+import functools
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Past this many fingerprints new statements are counted under OTHER, so
+# dynamically built SQL can't grow the table without bound
+MAX_FINGERPRINTS = 500
+OTHER = 'other'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)', re.IGNORECASE)
+_PLACEHOLDER = re.compile(r'%s|\?')
+_WHITESPACE = re.compile(r'\s+')
+
+_view = contextvars.ContextVar('query_stats_view', default=None)
+
+_fingerprints = {}
+_views = {}
+_stats_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=2048)
+def normalize(sql):
+    """
+    SQL with literals, placeholders and IN lists replaced by '?'.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    """
+    Short stable id for a statement's normalized form.
+    """
+    return hashlib.blake2b(normalize(sql).encode(), digest_size=6).hexdigest()
+
+
+def bind_view(name):
+    return _view.set(name)
+
+
+def unbind_view(token):
+    _view.reset(token)
+
+
+def _new_entry(statement):
+    return {'statement': statement, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow': 0,
+            'views': {}, 'plan': None, 'explained_at': None}
+
+
+def _new_view():
+    return {'requests': 0, 'queries': 0, 'total_ms': 0.0, 'slow': 0, 'fingerprints': set()}
+
+
+def record_request(view):
+    """
+    Count a finished request so the report can show queries per request.
+    """
+    with _stats_lock:
+        _views.setdefault(view, _new_view())['requests'] += 1
+
+
+def _record(sql, elapsed_ms, slow):
+    """
+    Add one execution; returns True when its plan is due to be captured.
+    """
+    key = fingerprint(sql)
+    view = _view.get() or '-'
+    with _stats_lock:
+        entry = _fingerprints.get(key)
+        if entry is None:
+            if len(_fingerprints) >= MAX_FINGERPRINTS:
+                key = OTHER
+                entry = _fingerprints.setdefault(OTHER, _new_entry(None))
+            else:
+                entry = _fingerprints[key] = _new_entry(normalize(sql))
+        entry['count'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        entry['views'][view] = entry['views'].get(view, 0) + 1
+
+        per_view = _views.setdefault(view, _new_view())
+        per_view['queries'] += 1
+        per_view['total_ms'] += elapsed_ms
+        per_view['fingerprints'].add(key)
+
+        if not slow:
+            return False
+        entry['slow'] += 1
+        per_view['slow'] += 1
+        now = time.monotonic()
+        if key == OTHER or (
+            entry['explained_at'] is not None and now - entry['explained_at'] < settings.QUERY_EXPLAIN_INTERVAL
+        ):
+            return False
+        entry['explained_at'] = now
+        return True
+
+
+def _explain(connection, sql, params):
+    """
+    The plan as text, run on a cursor outside the execute wrappers.
+    """
+    if sql.lstrip()[:6].upper() != 'SELECT':
+        return None
+    if connection.vendor == 'postgresql' and connection.in_atomic_block:
+        # A failed EXPLAIN would abort the caller's transaction
+        return None
+    # sqlite3's cursor isn't a context manager
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        rows = cursor.fetchall()
+    except Exception as e:
+        # e.g. a statement the backend can't EXPLAIN; the query itself succeeded
+        logger.debug('EXPLAIN failed: %s', e)
+        return None
+    finally:
+        cursor.close()
+    return '\n'.join(' '.join(str(col) for col in row) for row in rows)
+
+
+def capture(execute, sql, params, many, context):
+    """
+    execute_wrapper hook: time the query, record it, log it with its plan if slow.
+    """
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    slow = elapsed_ms >= settings.QUERY_SLOW_MS
+    explain_due = _record(sql, elapsed_ms, slow)
+    if slow:
+        key, statement = fingerprint(sql), normalize(sql)
+        plan = None
+        if explain_due and settings.QUERY_EXPLAIN and not many:
+            plan = _explain(context['connection'], sql, params)
+            with _stats_lock:
+                if plan and key in _fingerprints:
+                    _fingerprints[key]['plan'] = plan
+        logger.warning('slow_query %.1fms %s', elapsed_ms, statement, extra={
+            'fingerprint': key,
+            'view': _view.get() or '-',
+            'db_ms': round(elapsed_ms, 2),
+            'sql': statement,
+            'plan': plan,
+        })
+    return result
+
+
+def get_stats(top=None):
+    """
+    Fingerprints by total time (the worst first) and per-view totals.
+    """
+    with _stats_lock:
+        fingerprints = [
+            {
+                'fingerprint': key,
+                'statement': entry['statement'],
+                'count': entry['count'],
+                'total_ms': round(entry['total_ms'], 2),
+                'mean_ms': round(entry['total_ms'] / entry['count'], 3),
+                'max_ms': round(entry['max_ms'], 2),
+                'slow': entry['slow'],
+                'views': dict(entry['views']),
+                'plan': entry['plan'],
+            }
+            for key, entry in _fingerprints.items()
+        ]
+        views = {
+            name: {
+                'requests': stats['requests'],
+                'queries': stats['queries'],
+                'queries_per_request': round(stats['queries'] / stats['requests'], 1) if stats['requests'] else None,
+                'total_ms': round(stats['total_ms'], 2),
+                'slow': stats['slow'],
+                'distinct_statements': len(stats['fingerprints']),
+            }
+            for name, stats in _views.items()
+        }
+    fingerprints.sort(key=lambda entry: entry['total_ms'], reverse=True)
+    return {'fingerprints': fingerprints[:top] if top else fingerprints, 'views': views}
+
+
+def reset_stats():
+    with _stats_lock:
+        _fingerprints.clear()
+        _views.clear()
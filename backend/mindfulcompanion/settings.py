@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import json
+import math
 import os
 import sys
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 import dj_database_url
 
@@ -34,6 +37,81 @@ SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-FALLBACK-KEY-FOR-DEV-ONLY-
 
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
 AI_MODEL = os.getenv('AI_MODEL', 'anthropic/claude-3-sonnet-20240229')
+AI_FALLBACK_MODEL = os.getenv('AI_FALLBACK_MODEL') or None  # tried once if the routed model fails
+
+# Per help type: model, max_tokens (shared budget for adaptive thinking + response
+# text) and fallback. AI_MODEL_ROUTES='{"max_assessment": {"model": "..."}}' overrides
+# individual keys; help types not listed use AI_MODEL / 2048 / AI_FALLBACK_MODEL.
+AI_MODEL_ROUTES = {
+    'acute_validation': {'model': AI_MODEL, 'max_tokens': 2048, 'fallback': AI_FALLBACK_MODEL},
+    'acute_skills': {'model': AI_MODEL, 'max_tokens': 2048, 'fallback': AI_FALLBACK_MODEL},
+    'chronic_validation': {'model': AI_MODEL, 'max_tokens': 2048, 'fallback': AI_FALLBACK_MODEL},
+    'chronic_education': {'model': AI_MODEL, 'max_tokens': 2048, 'fallback': AI_FALLBACK_MODEL},
+    'max_validation': {'model': AI_MODEL, 'max_tokens': 4096, 'fallback': AI_FALLBACK_MODEL},
+    'max_assessment': {'model': AI_MODEL, 'max_tokens': 4096, 'fallback': AI_FALLBACK_MODEL},
+}
+for _help_type, _route in json.loads(os.getenv('AI_MODEL_ROUTES', '{}')).items():
+    AI_MODEL_ROUTES.setdefault(_help_type, {}).update(_route)
+
+# USD per million tokens as (input, output); 'default' covers unlisted models.
+# AI_MODEL_PRICING='{"provider/model": [1.0, 5.0]}' adds or overrides entries.
+AI_MODEL_PRICING = {
+    'anthropic/claude-3-haiku-20240307': (0.25, 1.25),
+    'anthropic/claude-3-5-haiku-20241022': (0.80, 4.00),
+    'anthropic/claude-3-sonnet-20240229': (3.00, 15.00),
+    'anthropic/claude-sonnet-4-5-20250929': (3.00, 15.00),
+    'anthropic/claude-3-opus-20240229': (15.00, 75.00),
+    'default': (3.00, 15.00),
+}
+AI_MODEL_PRICING.update(
+    (model, tuple(rates)) for model, rates in json.loads(os.getenv('AI_MODEL_PRICING', '{}')).items()
+)
+# Import the LLM stack in a background thread once the WSGI app is up
+LLM_WARMUP = os.getenv('LLM_WARMUP', 'True') == 'True'
+
+# CONTEXT_RANKING: chronic_*/max_* context is the most relevant of the last
+# CONTEXT_CANDIDATES entries (api.embeddings) instead of simply the newest
+CONTEXT_RANKING = os.getenv('CONTEXT_RANKING', 'True') == 'True'
+CONTEXT_CANDIDATES = int(os.getenv('CONTEXT_CANDIDATES', '365'))
+CONTEXT_RELEVANCE_WEIGHT = float(os.getenv('CONTEXT_RELEVANCE_WEIGHT', '0.6'))   # 0 = recency only
+CONTEXT_RECENCY_HALF_LIFE_DAYS = float(os.getenv('CONTEXT_RECENCY_HALF_LIFE_DAYS', '14'))
+
+# POST /api/journal-entries/prepare/ renders the context block while the user is
+# still writing and keeps it in JOURNAL_CACHE_ALIAS for PREPARE_CACHE_TIMEOUT
+# seconds (or until their journal changes); create then only adds today's entry.
+PREPARE_CACHE_TIMEOUT = int(os.getenv('PREPARE_CACHE_TIMEOUT', '300'))
+# LLM_PROMPT_CACHE: mark the context block as an Anthropic prompt-cache breakpoint.
+# LLM_PROMPT_CACHE_PREWARM: prepare also sends a 1-token request so the prefix
+# is already cached (for ~5 minutes) when the entry is submitted.
+LLM_PROMPT_CACHE = os.getenv('LLM_PROMPT_CACHE', 'False') == 'True'
+LLM_PROMPT_CACHE_PREWARM = os.getenv('LLM_PROMPT_CACHE_PREWARM', 'False') == 'True'
+
+# OVERLOAD_SHEDDING: degrade chronic_*/max_* responses while the provider is slow
+# (api.overload). The level is how many of the three steps the median time to
+# first chunk (seconds, over OVERLOAD_WINDOW) or the LLM calls in flight in this
+# process have reached: 1 shrinks context, 2 also caps max_tokens, 3 defers.
+OVERLOAD_SHEDDING = os.getenv('OVERLOAD_SHEDDING', 'False') == 'True'
+OVERLOAD_LATENCY_STEPS = [float(v) for v in os.getenv('OVERLOAD_LATENCY_STEPS', '4,8,15').split(',')]
+# In-flight steps default to 75% / 90% / all of the worker's other threads
+# (gunicorn.conf.py exports GUNICORN_WORKER_THREADS), so shedding starts only
+# once most of them are waiting on the LLM. Without it, latency alone decides.
+_worker_threads = int(os.getenv('GUNICORN_WORKER_THREADS') or 0)
+if os.getenv('OVERLOAD_INFLIGHT_STEPS'):
+    OVERLOAD_INFLIGHT_STEPS = [int(v) for v in os.getenv('OVERLOAD_INFLIGHT_STEPS').split(',')]
+elif _worker_threads > 1:
+    OVERLOAD_INFLIGHT_STEPS = [math.ceil((_worker_threads - 1) * share) for share in (0.75, 0.9, 1.0)]
+else:
+    OVERLOAD_INFLIGHT_STEPS = []
+OVERLOAD_WINDOW = int(os.getenv('OVERLOAD_WINDOW', '60'))
+OVERLOAD_CONTEXT_FACTOR = float(os.getenv('OVERLOAD_CONTEXT_FACTOR', '0.5'))
+OVERLOAD_MAX_TOKENS = int(os.getenv('OVERLOAD_MAX_TOKENS', '1024'))
+OVERLOAD_DEFER_POLL = float(os.getenv('OVERLOAD_DEFER_POLL', '5'))  # seconds between checks while deferring
+
+# Account/data purges (api.purge) delete child rows PURGE_BATCH_SIZE at a time,
+# at most PURGE_MAX_ROWS_PER_SECOND (0 = unthrottled) to spare the primary
+PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', '1000'))
+PURGE_MAX_ROWS_PER_SECOND = int(os.getenv('PURGE_MAX_ROWS_PER_SECOND', '5000'))
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DEBUG', 'True') == 'True'
 
@@ -84,6 +162,97 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
 ]
 
+# SERVER_TIMING: timing log line per request (db, prompt, llm, serialize), also sent as a
+# Server-Timing header to staff users (and to everyone with DEBUG)
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'True') == 'True'
+
+if SERVER_TIMING:
+    MIDDLEWARE.insert(1, 'mindfulcompanion.middleware.ServerTimingMiddleware')
+
+# QUERY_STATS: per-fingerprint and per-view query counts/latency (mindfulcompanion.querystats),
+# reported at /api/metrics/queries/. Queries over QUERY_SLOW_MS are logged with their EXPLAIN plan.
+QUERY_STATS = os.getenv('QUERY_STATS', 'False') == 'True'
+QUERY_SLOW_MS = float(os.getenv('QUERY_SLOW_MS', '100'))
+QUERY_EXPLAIN = os.getenv('QUERY_EXPLAIN', 'True') == 'True'
+QUERY_EXPLAIN_INTERVAL = int(os.getenv('QUERY_EXPLAIN_INTERVAL', '300'))  # seconds between plans per fingerprint
+
+if QUERY_STATS:
+    MIDDLEWARE.insert(1, 'mindfulcompanion.middleware.QueryStatsMiddleware')
+
+# COMPRESSION: brotli/gzip for /api/ responses (static files are precompressed by WhiteNoise)
+COMPRESSION = os.getenv('COMPRESSION', 'True') == 'True'
+COMPRESSION_PATH_PREFIX = '/api/'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '860'))  # bytes; smaller bodies gain little
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))  # 0-11; 4 suits dynamic responses
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+
+if COMPRESSION:
+    # Outside everything that reads or rewrites the body
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('corsheaders.middleware.CorsMiddleware'),
+        'mindfulcompanion.middleware.CompressionMiddleware'
+    )
+
+# Live request profiling (mindfulcompanion.profiling). Staff can always opt a
+# request in with 'X-Profile: 1'; these settings add sampled/always-on views.
+PROFILING_SAMPLE_RATE = int(os.getenv('PROFILING_SAMPLE_RATE', '0'))  # profile 1 in N requests
+PROFILING_VIEWS = [v for v in os.getenv('PROFILING_VIEWS', '').split(',') if v]  # e.g. journal-entry-list
+PROFILING_TRACEMALLOC = os.getenv('PROFILING_TRACEMALLOC', 'False') == 'True'
+PROFILING_INTERVAL = float(os.getenv('PROFILING_INTERVAL', '0.005'))  # seconds between stack samples
+PROFILING_DIR = Path(os.getenv('PROFILING_DIR', BASE_DIR / 'profiles'))
+
+MIDDLEWARE.insert(
+    MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
+    'mindfulcompanion.middleware.ProfilingMiddleware'
+)
+
+# CACHE_URL: the shared cache tier used by CACHED_AUTH and JOURNAL_CACHE.
+#   redis://host:6379/0 (or rediss://)    shared by every instance
+#   file:///dev/shm/mindfulcompanion       shared memory between one host's workers
+#   locmem:// (default)                    per process; dev and tests only
+CACHE_URL = urlparse(os.getenv('CACHE_URL', 'locmem://'))
+
+if CACHE_URL.scheme in ('redis', 'rediss'):
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL.geturl(),
+    }}
+elif CACHE_URL.scheme == 'file':
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_URL.path,
+    }}
+else:
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': CACHE_URL.netloc or 'mindfulcompanion',
+    }}
+CACHES['default']['KEY_PREFIX'] = os.getenv('CACHE_KEY_PREFIX', 'mc')
+
+# JOURNAL_CACHE: keep rendered journal reads, mood trends and bootstrap data per
+# user in JOURNAL_CACHE_ALIAS (api.cache). api.signals bumps the user's version
+# on every journal/preferences write; like CACHED_AUTH this needs a shared cache.
+JOURNAL_CACHE = os.getenv('JOURNAL_CACHE', 'False') == 'True'
+JOURNAL_CACHE_ALIAS = os.getenv('JOURNAL_CACHE_ALIAS', 'default')
+JOURNAL_CACHE_TIMEOUT = int(os.getenv('JOURNAL_CACHE_TIMEOUT', '600'))
+# The rendered history behind chronic/max prompts (api.history) is updated in
+# place on writes rather than versioned, so it can be kept much longer
+HISTORY_CACHE_TIMEOUT = int(os.getenv('HISTORY_CACHE_TIMEOUT', str(7 * 24 * 3600)))
+
+# CACHED_AUTH: serve sessions (write-through cached_db) and request.user from
+# AUTH_CACHE_ALIAS instead of two queries per request. The cache must be shared
+# by every worker/instance, or logouts and password changes only invalidate locally.
+CACHED_AUTH = os.getenv('CACHED_AUTH', 'False') == 'True'
+AUTH_CACHE_ALIAS = os.getenv('AUTH_CACHE_ALIAS', 'default')
+AUTH_CACHE_TIMEOUT = int(os.getenv('AUTH_CACHE_TIMEOUT', '300'))
+
+if CACHED_AUTH:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    SESSION_CACHE_ALIAS = AUTH_CACHE_ALIAS
+    MIDDLEWARE[MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware')] = (
+        'mindfulcompanion.middleware.CachedAuthenticationMiddleware'
+    )
+
 ROOT_URLCONF = 'mindfulcompanion.urls'
 ACCOUNT_SIGNUP_FIELDS = ['email*', 'password1*', 'password2*']
 ACCOUNT_EMAIL_VERIFICATION = 'mandatory'
@@ -119,7 +288,22 @@ if 'collectstatic' in sys.argv:
 else:
     DATABASE_URL = os.getenv('DATABASE_URL')
 
-    if DATABASE_URL:
+    # DB_POOL: share a bounded psycopg pool across worker threads instead of
+    # one persistent connection per thread; idle conns are checked off the request path
+    DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+
+    if DATABASE_URL and DB_POOL:
+        DATABASES = {
+            'default': dj_database_url.config(default=DATABASE_URL, engine='mindfulcompanion.db.postgresql_pool')
+            }
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '4')),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            'check_interval': float(os.getenv('DB_POOL_CHECK_INTERVAL', '30')),
+        }
+    elif DATABASE_URL:
         # conn_health_checks: Neon suspends idle computes; ping before reusing a pooled conn
         DATABASES = {
             'default': dj_database_url.config(default=DATABASE_URL, conn_max_age=600, conn_health_checks=True)
@@ -136,6 +320,21 @@ else:
             }
         }
 
+    # SQLite production mode for single-node installs (DATABASE_URL=sqlite:////data/db.sqlite3):
+    # WAL, tuned pragmas and serialized BEGIN IMMEDIATE writes (mindfulcompanion.db.sqlite_wal).
+    # SQLite has one writer at a time, so run a single gunicorn worker with more threads.
+    SQLITE_TUNED = os.getenv('SQLITE_TUNED', 'True') == 'True'
+
+    if SQLITE_TUNED and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES['default']['ENGINE'] = 'mindfulcompanion.db.sqlite_wal'
+        DATABASES['default'].setdefault('OPTIONS', {}).update({
+            'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', '5')),
+            'pragmas': {
+                'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+                'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-64000')),
+            },
+        })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -218,6 +417,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson drop-ins for the stock JSON renderer/parser (same bytes out)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # for development only
@@ -252,6 +461,55 @@ STORAGES = {
     'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage'},
 }
 
+# SPA_CACHE: production caching for the built app. Static files get hashed
+# manifest names, Vite's hashed assets and hashed static files are served as
+# immutable, and index.html is served from memory with an ETag (mindfulcompanion.spa).
+# The frontend_dist .br/.gz files come from `python -m whitenoise.compress` in the Dockerfile.
+SPA_CACHE = os.getenv('SPA_CACHE', 'False') == 'True'
+
+if SPA_CACHE:
+    STORAGES['staticfiles'] = {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'}
+    MIDDLEWARE[MIDDLEWARE.index('whitenoise.middleware.WhiteNoiseMiddleware')] = (
+        'mindfulcompanion.middleware.ImmutableAssetsWhiteNoiseMiddleware'
+    )
+
+# Logging (mindfulcompanion.log): records are queued and written as JSON lines
+# by a background thread, tagged with the request id (outermost middleware).
+#   LOG_FORMAT=plain                                   readable lines for local dev
+#   LOG_SAMPLING='{"mindfulcompanion.middleware": 0.1}'  keep 10% of that logger's INFO lines
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_SAMPLING = json.loads(os.getenv('LOG_SAMPLING', '{}'))
+
+MIDDLEWARE.insert(0, 'mindfulcompanion.middleware.RequestIdMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'mindfulcompanion.log.RequestIdFilter'},
+        'sampling': {'()': 'mindfulcompanion.log.SamplingFilter', 'rates': LOG_SAMPLING},
+    },
+    'formatters': {
+        'json': {'()': 'mindfulcompanion.log.JsonFormatter'},
+        'plain': {'()': 'mindfulcompanion.log.PlainFormatter'},
+    },
+    'handlers': {
+        'async': {
+            'class': 'mindfulcompanion.log.AsyncHandler',
+            'stream': 'ext://sys.stderr',
+            'formatter': LOG_FORMAT,
+            'filters': ['sampling', 'request_id'],
+        },
+    },
+    'root': {'handlers': ['async'], 'level': LOG_LEVEL},
+    'loggers': {
+        # Replace Django's default console/mail_admins handlers
+        'django': {'handlers': ['async'], 'level': 'INFO', 'propagate': False},
+        'django.server': {'handlers': ['async'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
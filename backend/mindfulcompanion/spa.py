@@ -0,0 +1,78 @@
+"""
+Serving the built React app (frontend_dist) when SPA_CACHE is on.
+
+- Vite's content-hashed files under /assets/ are marked immutable.
+- index.html is read once per process (plus the .br/.gz siblings produced by
+  `python -m whitenoise.compress` at build time) and served from memory with
+  an ETag, instead of going through the template engine on every route.
+"""
+
+import hashlib
+import re
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+# Vite names build output '<name>-<8 char base64url hash>.<ext>'
+VITE_HASHED_ASSET = re.compile(r'^/assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+
+_index_lock = threading.Lock()
+_index = None
+
+
+def is_vite_hashed_asset(url):
+    return bool(VITE_HASHED_ASSET.match(url))
+
+
+def _load_index():
+    """
+    Returns {'etag': ..., 'variants': {encoding: bytes}} for index.html.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                path = settings.FRONTEND_DIST / 'index.html'
+                body = path.read_bytes()
+                variants = {'identity': body}
+                for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+                    compressed = path.with_name(path.name + suffix)
+                    if compressed.exists():
+                        variants[encoding] = compressed.read_bytes()
+                _index = {
+                    'etag': '"' + hashlib.md5(body).hexdigest() + '"',
+                    'variants': variants,
+                }
+    return _index
+
+
+def _pick_encoding(request, variants):
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for encoding in ('br', 'gzip'):
+        if encoding in variants and re.search(rf'\b{encoding}\b', accepted):
+            return encoding
+    return 'identity'
+
+
+@require_safe
+def spa_index_view(request):
+    """
+    Catch-all for non-API routes: the cached index.html, revalidated by ETag.
+    """
+    index = _load_index()
+
+    response = get_conditional_response(request, etag=index['etag'])
+    if response is None:
+        encoding = _pick_encoding(request, index['variants'])
+        response = HttpResponse(index['variants'][encoding], content_type='text/html; charset=utf-8')
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = index['etag']
+    patch_vary_headers(response, ('Accept-Encoding',))
+    # index.html names the current hashed bundles, so it must always be revalidated
+    patch_cache_control(response, no_cache=True)
+    return response
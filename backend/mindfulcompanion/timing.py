@@ -0,0 +1,62 @@
+"""
+Per-request phase timings, collected by ServerTimingMiddleware.
+
+Code anywhere in the request wraps a phase with `timed('name')` (or calls
+`record`); outside a request both are no-ops. Timings live in a ContextVar,
+so concurrent threads never see each other's numbers.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Accumulated milliseconds and call counts per phase for one request.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    def add(self, name, seconds, count=1):
+        total, calls = self.phases.get(name, (0.0, 0))
+        self.phases[name] = (total + seconds * 1000, calls + count)
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start():
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def record(name, seconds):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def timed(name):
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
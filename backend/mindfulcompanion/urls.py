@@ -3,6 +3,8 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from django.views.generic import TemplateView
 
+from .spa import spa_index_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('allauth.urls')),
@@ -21,5 +23,5 @@ urlpatterns = [
 if settings.FRONTEND_DIST.exists():
     urlpatterns += [
         re_path(r'^(?!api/|admin/|accounts/|static/).*$',
-                TemplateView.as_view(template_name='index.html')),
+                spa_index_view if settings.SPA_CACHE else TemplateView.as_view(template_name='index.html')),
     ]
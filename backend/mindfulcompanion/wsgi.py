@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindfulcompanion.settings')
 
 application = get_wsgi_application()
+
+# Import litellm off the request path so /api/csrf/ etc. don't wait on it
+if settings.LLM_WARMUP:
+    from api.llm_service import warm_up
+    warm_up()
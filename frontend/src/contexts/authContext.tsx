@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useState, useEffect, type ReactNode } from 'react';
-import { checkAuthStatus, logout as logoutService } from '../services/authService';
+import { fetchBootstrap, logout as logoutService } from '../services/authService';
+import type { BootstrapData } from '../types';
 
 
 interface User {
@@ -14,6 +15,7 @@ interface AuthContextType {
     user: User | null;
     isLoggedIn: boolean;
     isLoading: boolean;
+    bootstrap: BootstrapData | null;
     login: (user: User) => void;
     logout: () => Promise<void>;
     updateUser: (user: User) => void;
@@ -39,15 +41,17 @@ interface AuthProviderProps {
 export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
     const [user, setUser] = useState<User | null>(null);
     const [isLoading, setIsLoading] = useState(true);
+    const [bootstrap, setBootstrap] = useState<BootstrapData | null>(null);
 
     // Check authentication status on app load
     useEffect(() => {
         const checkAuth = async () => {
             try {
-                const authData = await checkAuthStatus();
-                if (authData && authData.user) {
-                    setUser(authData.user);
+                const bootstrapData = await fetchBootstrap();
+                if (bootstrapData && bootstrapData.user) {
+                    setUser(bootstrapData.user);
                 }
+                setBootstrap(bootstrapData);
             } catch (error) {
                 console.error('Failed to check auth status:', error);
                 // User remains null, which means not logged in
@@ -67,10 +71,12 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         try {
             await logoutService();
             setUser(null);
+            setBootstrap(null);
         } catch (error) {
             console.error('Logout failed:', error);
             // Still clear local state even if server request fails
             setUser(null);
+            setBootstrap(null);
         }
     };
 
@@ -82,6 +88,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         user,
         isLoggedIn: !!user,
         isLoading,
+        bootstrap,
         login,
         logout,
         updateUser,
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { Ear, Sparkles, Sprout, Waves, Feather } from 'lucide-react';
 import type { HelpType } from '../types';
 import Header from '../components/Header';
@@ -6,7 +6,13 @@ import ContentModal from '../components/ContentModal';
 import Clouds from '../components/Clouds';
 import { useAuth } from '../contexts/authContext';
 import { createJournalEntry } from '../services/journalService'
-import { getAIResponse, getAIResponseWithSave } from '../services/llmService';
+import {
+  getAIResponse,
+  getAIResponseWithSave,
+  getContextWindowSize,
+  prepareContext,
+  waitForDeferredResponse,
+} from '../services/llmService';
 
 
 interface JournalPageProps {
@@ -34,6 +40,44 @@ const JournalPage: React.FC<JournalPageProps> = ({
   const [modalType, setModalType] = useState<'sample' | 'response' | 'default' | 'auth'>('default');
   const [showCopyButton, setShowCopyButton] = useState<boolean>(false);
   const [isSubmitting, setIsSubmitting] = useState<boolean>(false);
+  // Help types already prepared for this draft
+  const preparedTypes = useRef<Set<HelpType>>(new Set());
+  // Stops polling for a deferred response when the page goes away
+  const deferredPolling = useRef<AbortController | null>(null);
+
+  useEffect(() => () => deferredPolling.current?.abort(), []);
+
+  // Show a deferred AI response once the server has generated it
+  const awaitDeferredResponse = async (entryId: number, helpType: HelpType): Promise<void> => {
+    deferredPolling.current?.abort();
+    const controller = new AbortController();
+    deferredPolling.current = controller;
+
+    const interaction = await waitForDeferredResponse(entryId, controller.signal);
+    if (controller.signal.aborted) return;
+
+    if (interaction) {
+      setModalTitle(RESPONSE_TITLES[helpType] ?? 'From your companion');
+      setModalContent(interaction.claude_response);
+      setModalType('response');
+      setShowCopyButton(true);
+    } else {
+      setModalTitle('Still Working');
+      setModalContent('Your companion is taking longer than usual. Their response will appear with this entry in your journal once it is ready.');
+      setModalType('default');
+      setShowCopyButton(false);
+    }
+    setShowModal(true);
+  };
+
+  // Build the history context while the user hovers a chronic/max card, before they click
+  const handlePrepare = (helpType: HelpType): void => {
+    if (!isLoggedIn || !journalContent.trim() || getContextWindowSize(helpType) === 0) return;
+    if (preparedTypes.current.has(helpType)) return;
+
+    preparedTypes.current.add(helpType);
+    void prepareContext(helpType, journalContent);
+  };
 
   const handleSubmit = async (helpType: HelpType): Promise<void> => {
     setIsSubmitting(true);
@@ -77,6 +121,14 @@ const JournalPage: React.FC<JournalPageProps> = ({
               setModalType('response');
               setShowCopyButton(true); // Allow copying AI response
               setShowModal(true);
+            } else if ('ai_deferred' in response) {
+              // Server under load: the response is written a little later
+              setModalTitle('Entry Saved');
+              setModalContent('Your entry has been saved. Your companion is busy right now; their response will open here as soon as it is ready.');
+              setModalType('default');
+              setShowCopyButton(false);
+              setShowModal(true);
+              void awaitDeferredResponse(response.id, helpType);
             } else if ('ai_error' in response) {
               // Partial success: Entry saved but AI failed
               setModalTitle('Entry Saved (AI Error)');
@@ -105,6 +157,7 @@ const JournalPage: React.FC<JournalPageProps> = ({
       // Clear form after submission
       setJournalTitle('');
       setJournalContent('');
+      preparedTypes.current.clear();
 
     } catch (error) {
       console.error('Error submitting journal entry:', error);
@@ -255,6 +308,8 @@ const JournalPage: React.FC<JournalPageProps> = ({
           <button
             key={type}
             onClick={() => handleSubmit(type)}
+            onMouseEnter={() => handlePrepare(type)}
+            onFocus={() => handlePrepare(type)}
             disabled={!journalContent.trim() || isSubmitting}
             className="p-5 text-left bg-card rounded-2xl ring-1 ring-ink/5 shadow-soft hover:shadow-lift hover:-translate-y-0.5 transition-all cursor-pointer disabled:opacity-60 disabled:cursor-not-allowed disabled:hover:translate-y-0 disabled:hover:shadow-soft"
           >
@@ -1,8 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import Calendar from '../components/Calendar';
 import Header from '../components/Header';
 import ContentModal from '../components/ContentModal';
 import { getJournalEntries, getJournalEntry, deleteJournalEntry } from '../services/journalService';
+import { useAuth } from '../contexts/authContext';
 import type { JournalEntryListItem, JournalEntry } from '../types';
 
 interface ProfilePageProps {}
@@ -12,6 +13,9 @@ const ProfilePage: React.FC<ProfilePageProps> = ({}) => {
   const [isLoading, setIsLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [currentDate, setCurrentDate] = useState<Date>(new Date());
+  const { bootstrap, isLoading: isAuthLoading } = useAuth();
+  // Bootstrap entries are only fresh when this page is the cold-load route
+  const canUseBootstrap = useRef<boolean>(isAuthLoading);
 
   // modal state
   const [showModal, setShowModal] = useState<boolean>(false);
@@ -28,6 +32,18 @@ const ProfilePage: React.FC<ProfilePageProps> = ({}) => {
 
   useEffect(() => {
     const fetchEntries = async () => {
+    // First render of the current month can reuse the entries from app bootstrap
+    const calendar = bootstrap?.calendar;
+    if (canUseBootstrap.current && calendar &&
+        calendar.year === currentDate.getFullYear() &&
+        calendar.month === currentDate.getMonth() + 1) {
+      canUseBootstrap.current = false;
+      setEntries(filterEntriesByMonth(calendar.entries, currentDate));
+      setIsLoading(false);
+      return;
+    }
+    canUseBootstrap.current = false;
+
     try {
       setIsLoading(true);
       const allEntries = await getJournalEntries();
@@ -42,8 +58,10 @@ const ProfilePage: React.FC<ProfilePageProps> = ({}) => {
     }
     };
 
-    fetchEntries();
-  }, [currentDate]);
+    if (!isAuthLoading) {
+      fetchEntries();
+    }
+  }, [currentDate, isAuthLoading]);
 
   const handleMonthChange = (direction: 'prev' | 'next') => {
     setCurrentDate(prevDate => {
@@ -1,3 +1,5 @@
+import type { BootstrapData } from '../types';
+
 const BASE_URL = import.meta.env.VITE_API_BASE_URL || '';
 
 interface LoginCredentials {
@@ -32,7 +34,19 @@ interface CSRFResponse {
     csrfToken: string;
 }
 
+// Django sets the csrftoken cookie on /api/bootstrap/ and rotates it on login,
+// so reading it back avoids a round trip before every POST
+const readCSRFCookie = (): string | null => {
+    const match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+    return match ? decodeURIComponent(match[1]) : null;
+};
+
 export const getCSRFToken = async (): Promise<string> => {
+    const cookieToken = readCSRFCookie();
+    if (cookieToken) {
+        return cookieToken;
+    }
+
     try {
         const response = await fetch(`${BASE_URL}/api/csrf/`, {
             credentials: 'include',
@@ -132,6 +146,28 @@ export const loginWithGoogle = async (): Promise<void> => {
     window.location.href = `${BASE_URL}/accounts/google/login/?process=login`;
 };
 
+// One request on app load: CSRF cookie, user, preferences and this month's entries
+export const fetchBootstrap = async (): Promise<BootstrapData | null> => {
+    try {
+        const response = await fetch(`${BASE_URL}/api/bootstrap/`, {
+            credentials: 'include',
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! Status: ${response.status}`);
+        }
+
+        const data: BootstrapData = await response.json();
+        if (!data.user) {
+            removeToken();
+        }
+        return data;
+    } catch (error) {
+        console.error('Error fetching bootstrap data:', error);
+        return null;
+    }
+};
+
 // Check current authentication status
 export const checkAuthStatus = async (): Promise<AuthResponse | null> => {
     try {
@@ -1,5 +1,6 @@
 import { getCSRFToken } from './authService';
-import type { HelpType } from '../types';
+import { getJournalEntry } from './journalService';
+import type { AIInteraction, HelpType } from '../types';
 
 const BASE_URL = import.meta.env.VITE_API_BASE_URL;
 
@@ -14,6 +15,17 @@ export interface AIResponse {
   help_type: HelpType;
 }
 
+/*
+ * Present when the server was under load and cut the response down
+ * (shorter context, then lower max_tokens) or deferred it
+ */
+export interface Degradation {
+  level: number;
+  context_factor: number;
+  max_tokens: number | null;
+  deferred: boolean;
+}
+
 /*
  * Response from AI generation for authenticated users (includes entry data)
  */
@@ -26,6 +38,21 @@ export interface AIResponseWithEntry {
   ai_response: string;
   tokens_used: number;
   estimated_cost: number;
+  degraded?: Degradation;
+}
+
+/*
+ * Entry saved while the server was busy; the AI response is generated
+ * later and shows up as the entry's ai_interaction
+ */
+export interface AIDeferredResponse {
+  id: number;
+  title: string;
+  content: string;
+  requested_help_type: HelpType | null;
+  created_at: string;
+  ai_deferred: true;
+  degraded: Degradation;
 }
 
 /*
@@ -90,7 +117,7 @@ export const getAIResponseWithSave = async (
   content: string,
   helpType: HelpType,
   title?: string
-): Promise<AIResponseWithEntry | AIErrorResponse> => {
+): Promise<AIResponseWithEntry | AIDeferredResponse | AIErrorResponse> => {
   try {
     const csrfToken = await getCSRFToken();
     
@@ -121,6 +148,66 @@ export const getAIResponseWithSave = async (
   }
 };
 
+/*
+ * Poll a deferred entry until its AI response has been generated.
+ * Resolves with the interaction, or null once `timeoutMs` passes or `signal`
+ * is aborted. Unchanged polls are cheap: the entry endpoint answers 304.
+ */
+export const waitForDeferredResponse = async (
+  entryId: number,
+  signal?: AbortSignal,
+  intervalMs: number = 5000,
+  timeoutMs: number = 5 * 60 * 1000
+): Promise<AIInteraction | null> => {
+  const deadline = Date.now() + timeoutMs;
+
+  while (Date.now() < deadline && !signal?.aborted) {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    if (signal?.aborted) break;
+
+    try {
+      const entry = await getJournalEntry(entryId);
+      if (entry.ai_interaction) {
+        return entry.ai_interaction;
+      }
+    } catch (error) {
+      // Transient errors: keep polling until the deadline
+      console.error('Error polling for deferred response:', error);
+    }
+  }
+
+  return null;
+};
+
+/*
+ * Ask the backend to build the context for a chronic/max help type while the
+ * user is still writing, so the submit that follows is faster.
+ * Best effort: failures are logged and otherwise ignored.
+ */
+export const prepareContext = async (
+  helpType: HelpType,
+  draft: string
+): Promise<void> => {
+  try {
+    const csrfToken = await getCSRFToken();
+
+    await fetch(`${BASE_URL}/api/journal-entries/prepare/`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-CSRFToken': csrfToken,
+      },
+      credentials: 'include',
+      body: JSON.stringify({
+        content: draft,
+        requested_help_type: helpType,
+      }),
+    });
+  } catch (error) {
+    console.error('Error preparing context:', error);
+  }
+};
+
 /*
  * Check if a help type requires authentication
  * Acute types work for anonymous users, all others require login
@@ -25,6 +25,7 @@ export interface AIInteraction {
   context_entries_count: number;
   tokens_used: number | null;
   api_cost: string | null;
+  model: string;
   created_at: string;
 }
 
@@ -46,4 +47,27 @@ export interface CreateJournalEntryData {
 
 export interface User {
   isLoggedIn: boolean;
-}
\ No newline at end of file
+}
+
+export interface UserPreferences {
+  user_timezone: string;
+  preferred_name: string;
+}
+
+export interface BootstrapData {
+  csrfToken: string;
+  user: {
+    id: number;
+    email: string;
+    first_name: string;
+    last_name: string;
+    date_joined: string;
+  } | null;
+  preferences: UserPreferences | null;
+  today_entry_exists: boolean;
+  calendar: {
+    year: number;
+    month: number;
+    entries: JournalEntryListItem[];
+  } | null;
+}